@@ -7,26 +7,36 @@ from uuid import UUID
 
 from app.core.config import settings
 from app.core.security import verify_refresh_token, verify_token, verify_token_with_fallback
+from app.core.token_version import token_versions
+from app.core.revocation import revocation_list
 from app.models.user import User
+from app.schemas.user import CurrentUser
 from app.crud.user import user as user_crud
 from app.db.session import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+# アクセストークンが任意のエンドポイント用（トークンがない場合はNone）
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 async def get_current_user(
         token: str = Depends(oauth2_scheme),
         db: AsyncSession = Depends(get_db)
-        ) -> User:
+        ) -> CurrentUser:
     """
     アクセストークンからユーザーを取得する依存関数
     
+    ログアウトなどで無効化されたトークン（jti）は拒否する。
+    トークンがユーザー情報とトークンバージョン（ver）のクレームを含む場合は、
+    バージョンが最新であることだけを確認し、データベースは参照しない。
+    クレームを含まない旧形式のトークンの場合はデータベースからユーザーを取得する。
+    
     Args:
         token: JWTアクセストークン
         db: データベースセッション
         
     Returns:
-        User: 認証されたユーザー
+        CurrentUser: 認証されたユーザー
         
     Raises:
         HTTPException: トークンが無効な場合
@@ -50,18 +60,36 @@ async def get_current_user(
             
     except (JWTError, ValidationError):
         raise credentials_exception
+    
+    # ログアウトなどで個別に無効化されたトークン
+    if await revocation_list.is_revoked(payload.get("jti")):
+        raise credentials_exception
+    
+    if "ver" in payload:
+        # パスワード変更・権限や状態の変更・削除の後に発行されたトークンでなければ無効
+        if payload["ver"] < await token_versions.get(user_id):
+            raise credentials_exception
+        try:
+            return CurrentUser(
+                id=user_id,
+                username=payload["username"],
+                is_admin=payload["is_admin"],
+                is_active=payload["is_active"],
+            )
+        except (KeyError, ValidationError):
+            raise credentials_exception
         
-    # ユーザーをデータベースから取得
+    # 旧形式のトークンの場合はユーザーをデータベースから取得
     user = await user_crud.get_by_id(db, id=UUID(user_id))
     
     if user is None:
         raise credentials_exception
         
-    return user
+    return CurrentUser.model_validate(user)
 
 async def get_current_admin_user(
-        current_user: User = Depends(get_current_user)
-        ) -> User:
+        current_user: CurrentUser = Depends(get_current_user)
+        ) -> CurrentUser:
     """
     現在のユーザーが管理者であることを確認する依存関数
     
@@ -69,7 +97,7 @@ async def get_current_admin_user(
         current_user: 認証されたユーザー
         
     Returns:
-        User: 管理者権限を持つユーザー
+        CurrentUser: 管理者権限を持つユーザー
         
     Raises:
         HTTPException: ユーザーが管理者でない場合
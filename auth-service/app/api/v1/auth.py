@@ -1,28 +1,45 @@
+import json
 import uuid
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, List, Literal, Optional
 from datetime import timedelta
 from uuid import UUID
 from jose import JWTError, jwt
-from pydantic import ValidationError
+from pydantic import ValidationError, TypeAdapter
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
-from app.crud.user import user
-from app.db.session import get_db
-from app.schemas.user import AdminUserCreate, UserCreate, UserUpdate, PasswordUpdate, AdminPasswordUpdate, User as UserResponse, Token, RefreshToken
+from app.crud.user import user, UsernameAlreadyExistsError
+from app.db.session import get_db, AsyncSessionLocal
+from app.schemas.user import AdminUserCreate, UserCreate, UserUpdate, PasswordUpdate, AdminPasswordUpdate, User as UserResponse, Token, RefreshToken, RefreshSession, SessionRevokeResult, CurrentUser, UserPublic, UserBatchRequest, UserImportRequest, UserImportRowResult, UserImportResult
 from app.core.security import (
-    verify_password, 
-    create_access_token, 
+    verify_password_async, 
+    verify_password_and_update_async,
+    create_user_access_token, 
     create_refresh_token, 
     verify_refresh_token,
     revoke_refresh_token,
-    verify_token_with_fallback
+    rotate_refresh_token,
+    list_refresh_sessions,
+    revoke_all_refresh_tokens,
+    verify_token_with_fallback,
+    revoke_access_token,
+    password_hash_pool,
+    token_verification_stats
 )
 from app.core.config import settings
-from app.api.deps import validate_refresh_token, get_current_user, get_current_admin_user
+from app.core.keys import key_manager, KeyLoadError
+from app.core.worker_pool import WorkerPoolFullError
+from app.core.token_version import token_versions
+from app.core.user_cache import user_cache
+from app.core.username_filter import username_filter
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursorError
+from app.core.rate_limit import check_login_rate_limit, login_ip_limiter, login_username_limiter
+from app.core.revocation import revocation_list
+from app.api.deps import get_current_user, get_current_admin_user, oauth2_scheme, optional_oauth2_scheme
 from app.core.logging import get_request_logger, app_logger
 from app.models.user import User
 
@@ -43,17 +60,15 @@ async def register_user(
     logger = get_request_logger(request)
     logger.info(f"一般ユーザー登録リクエスト: {user_in.username}")
     
-    # ユーザー名の重複チェック
-    existing_user = await user.get_by_username(db, username=user_in.username)
-    if existing_user:
+    # ユーザー作成（ユーザー名の重複はINSERTの際にデータベースで検出する）
+    try:
+        new_user = await user.create(db, user_in)
+    except UsernameAlreadyExistsError:
         logger.warning(f"ユーザー登録失敗: ユーザー名 '{user_in.username}' は既に使用されています")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="このユーザー名は既に登録されています。"
         )
-    
-    # ユーザー作成
-    new_user = await user.create(db, user_in)
     if not new_user:
         logger.error(f"ユーザー登録失敗: '{user_in.username}' の作成中にエラーが発生しました")
         raise HTTPException(
@@ -69,7 +84,7 @@ async def register_user(
 async def admin_register_user(
     request: Request,
     user_in: AdminUserCreate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: CurrentUser = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
     ) -> Any:
     """
@@ -80,17 +95,15 @@ async def admin_register_user(
     logger = get_request_logger(request)
     logger.info(f"管理者によるユーザー登録リクエスト: {user_in.username}, 要求元={current_user.username}")
     
-    # ユーザー名の重複チェック
-    existing_user = await user.get_by_username(db, username=user_in.username)
-    if existing_user:
+    # ユーザー作成（ユーザー名の重複はINSERTの際にデータベースで検出する）
+    try:
+        new_user = await user.create(db, user_in)
+    except UsernameAlreadyExistsError:
         logger.warning(f"ユーザー登録失敗: ユーザー名 '{user_in.username}' は既に使用されています")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="このユーザー名は既に登録されています。"
         )
-    
-    # ユーザー作成
-    new_user = await user.create(db, user_in)
     if not new_user:
         logger.error(f"ユーザー登録失敗: '{user_in.username}' の作成中にエラーが発生しました")
         raise HTTPException(
@@ -102,6 +115,130 @@ async def admin_register_user(
     return new_user
 
 
+async def _import_rows(request: Request) -> AsyncIterator[Any]:
+    """
+    一括登録の入力を1行ずつ返す
+
+    Content-Typeが application/x-ndjson の場合はリクエストボディを受信しながら1行1ユーザーとして読み、
+    それ以外の場合は {"users": [...]} のJSONとして読む。
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/x-ndjson"):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        body = UserImportRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False)
+        )
+    for row in body.users:
+        yield row
+
+_admin_user_create_adapter = TypeAdapter(AdminUserCreate)
+
+@router.post("/admin/users/import", response_model=UserImportResult)
+async def import_users(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+    ) -> Any:
+    """
+    管理者によるユーザーの一括登録エンドポイント
+    - {"users": [...]} のJSON、または1行1ユーザーのNDJSON（application/x-ndjson）を受け付ける
+    - 各行は /admin/register と同じ形式（username, password, is_admin）
+    - USER_IMPORT_MAX_ROWS 件を超える場合は1件も登録せずに413エラーを返す（全行を検証してから登録する）
+    - USER_IMPORT_BATCH_SIZE 件ごとにパスワードを並列にハッシュ化し、1回のINSERTで登録してコミットする
+    - 既に登録されているユーザー名は飛ばし、行ごとの結果を返す
+    - 2つ目以降のバッチで失敗した場合は、それまでにコミットした行の結果と、以降の行を error として返す
+    """
+    logger = get_request_logger(request)
+    logger.info(f"ユーザー一括登録リクエスト: 要求元={current_user.username}")
+    
+    results: List[UserImportRowResult] = []
+    seen: set = set()
+    rows: List[tuple] = []
+    
+    # 件数の上限を確認するまで登録しない
+    index = 0
+    async for row in _import_rows(request):
+        if index >= settings.USER_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"一度に登録できるのは{settings.USER_IMPORT_MAX_ROWS}件までです"
+            )
+        try:
+            if isinstance(row, bytes):
+                user_in = _admin_user_create_adapter.validate_json(row)
+            else:
+                user_in = _admin_user_create_adapter.validate_python(row)
+        except ValidationError as e:
+            results.append(UserImportRowResult(
+                index=index,
+                username=row.get("username") if isinstance(row, dict) else None,
+                status="invalid",
+                detail="; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()),
+            ))
+        else:
+            if user_in.username in seen:
+                results.append(UserImportRowResult(index=index, username=user_in.username, status="duplicate"))
+            else:
+                seen.add(user_in.username)
+                rows.append((index, user_in))
+        index += 1
+    
+    for start in range(0, len(rows), settings.USER_IMPORT_BATCH_SIZE):
+        batch = rows[start:start + settings.USER_IMPORT_BATCH_SIZE]
+        try:
+            created = await user.bulk_create(db, [user_in for _, user_in in batch])
+            # バッチごとにコミットし、一括登録の間トランザクションを開いたままにしない
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            if start == 0:
+                # まだ何も登録していないため、通常のエラーとして返す
+                raise
+            logger.error(f"ユーザー一括登録が中断されました: {start}件目以降は登録していません: {e}")
+            results.extend(
+                UserImportRowResult(index=index, username=user_in.username, status="error", detail="登録処理が中断されました")
+                for index, user_in in rows[start:]
+            )
+            break
+        for index, user_in in batch:
+            user_id = created.get(user_in.username)
+            results.append(UserImportRowResult(
+                index=index,
+                username=user_in.username,
+                status="created" if user_id is not None else "exists",
+                id=user_id,
+            ))
+    
+    results.sort(key=lambda result: result.index)
+    created_count = sum(1 for result in results if result.status == "created")
+    failed_count = sum(1 for result in results if result.status in ("invalid", "error"))
+    skipped_count = len(results) - created_count - failed_count
+    logger.info(
+        f"ユーザー一括登録完了: 登録={created_count}, スキップ={skipped_count}, 失敗={failed_count}, "
+        f"要求元={current_user.username}"
+    )
+    return UserImportResult(
+        created=created_count,
+        skipped=skipped_count,
+        failed=failed_count,
+        results=results,
+    )
+
+
 @router.post("/login", response_model=Token)
 async def login(
     request: Request,
@@ -114,8 +251,11 @@ async def login(
     logger = get_request_logger(request)
     logger.info(f"ログインリクエスト: ユーザー名={form_data.username}")
     
+    # 試行回数の制限（データベースの参照とパスワードの検証より前に判定する）
+    await check_login_rate_limit(request, form_data.username)
+    
     # ユーザー認証
-    db_user = await user.get_by_username(db, username=form_data.username)
+    db_user = await user.get_by_username(db, username=form_data.username, with_password=True)
     if not db_user:
         logger.warning(f"ログイン失敗: ユーザー名 '{form_data.username}' が存在しません")
         raise HTTPException(
@@ -124,8 +264,9 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # パスワード検証
-    if not verify_password(form_data.password, db_user.hashed_password):
+    # パスワード検証（ハッシュの方式・コストが現在の設定と異なる場合は新しいハッシュも作成する）
+    valid, new_hashed_password = await verify_password_and_update_async(form_data.password, db_user.hashed_password)
+    if not valid:
         logger.warning(f"ログイン失敗: ユーザー '{form_data.username}' のパスワードが不正です")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -133,12 +274,17 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # アクセストークン生成
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = await create_access_token(
-        data={"sub": str(db_user.id)},
-        expires_delta=access_token_expires
-    )
+    if new_hashed_password is not None:
+        # 再ハッシュに失敗してもログインは成功させる（次回のログインで再度試みる）
+        try:
+            if await user.rehash_password(db, db_user, new_hashed_password):
+                logger.info(f"パスワードハッシュを更新しました: ユーザーID={db_user.id}, 方式={settings.PASSWORD_HASH_SCHEME}")
+        except Exception as e:
+            logger.warning(f"パスワードハッシュの更新に失敗しました: ユーザーID={db_user.id}: {e}")
+            await db.rollback()
+    
+    # アクセストークン生成（認可に必要なユーザー情報とトークンバージョンを含める）
+    access_token = await create_user_access_token(db_user)
     
     # リフレッシュトークン生成
     refresh_token = await create_refresh_token(user_id=str(db_user.id))
@@ -165,31 +311,32 @@ async def refresh_token(
     logger.info("トークン更新リクエスト")
     
     try:
-        # リフレッシュトークンの検証
-        user_id = await validate_refresh_token(token_data.refresh_token)
+        # 古いリフレッシュトークンの消費と新しいリフレッシュトークンの発行を原子的に行う
+        # （同じトークンによる同時リクエストは1つしか成功しない）
+        rotated = await rotate_refresh_token(token_data.refresh_token)
+        if rotated is None:
+            logger.warning("トークン更新失敗: リフレッシュトークンが無効または使用済みです")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="リフレッシュトークンが無効です",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user_id, refresh_token = rotated
         
         # ユーザーの存在確認
         db_user = await user.get_by_id(db, id=UUID(user_id))
         if not db_user:
             logger.warning(f"トークン更新失敗: ユーザーID '{user_id}' が存在しません")
+            # 発行済みの新しいリフレッシュトークンも無効化する
+            await revoke_refresh_token(refresh_token)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="無効なユーザーです",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # 古いリフレッシュトークンを無効化
-        await revoke_refresh_token(token_data.refresh_token)
-        
-        # 新しいアクセストークンの生成
-        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = await create_access_token(
-            data={"sub": str(db_user.id)},
-            expires_delta=access_token_expires
-        )
-        
-        # 新しいリフレッシュトークンの生成
-        refresh_token = await create_refresh_token(user_id=str(db_user.id))
+        # 新しいアクセストークンの生成（権限や状態の変更を反映するため、データベースの最新の情報を使用）
+        access_token = await create_user_access_token(db_user)
         
         logger.info(f"トークン更新成功: ユーザーID={db_user.id}")
         
@@ -206,15 +353,20 @@ async def refresh_token(
 @router.post("/logout")
 async def logout(
     request: Request,
-    token_data: RefreshToken
+    token_data: RefreshToken,
+    access_token: Optional[str] = Depends(optional_oauth2_scheme)
     ) -> Any:
     """
     ログアウトしてリフレッシュトークンを無効化するエンドポイント
+    - Authorizationヘッダーでアクセストークンが指定された場合は、そのトークンも有効期限まで無効化する
     """
     logger = get_request_logger(request)
     logger.info("ログアウトリクエスト")
     
     try:
+        if access_token and await revoke_access_token(access_token):
+            logger.info("ログアウト: アクセストークンを無効化しました")
+        
         # リフレッシュトークンを無効化
         result = await revoke_refresh_token(token_data.refresh_token)
         
@@ -232,33 +384,113 @@ async def logout(
         raise
 
 
+async def _stream_users_ndjson() -> AsyncIterator[bytes]:
+    """全ユーザーを1行1ユーザーのNDJSONとして出力する"""
+    # レスポンスの送信中もデータベースを読むため、依存関係とは別のセッションを使用する
+    async with AsyncSessionLocal() as session:
+        async for row in user.stream_users(session, settings.USER_STREAM_BATCH_SIZE):
+            row["id"] = str(row["id"])
+            yield (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
     request: Request,
-    current_user: User = Depends(get_current_admin_user),
+    response: Response,
+    limit: int = Query(settings.USER_LIST_DEFAULT_LIMIT, ge=1, le=settings.USER_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
+    current_user: CurrentUser = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
     ) -> Any:
     """
     全ユーザーを取得するエンドポイント（管理者のみ）
+    - (created_at, id) の順で limit 件ずつ返す
+    - 次のページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定して続きを取得する
+    - format=ndjson の場合は全ユーザーを1行1ユーザーのNDJSONでストリーミングする（limit, cursor は無視する）
     """
     logger = get_request_logger(request)
-    logger.info(f"全ユーザー取得リクエスト: 要求元={current_user.username}")
+    logger.info(f"全ユーザー取得リクエスト: 要求元={current_user.username}, limit={limit}, format={format}")
+    
+    if format == "ndjson":
+        return StreamingResponse(_stream_users_ndjson(), media_type="application/x-ndjson")
     
-    users = await user.get_all_users(db)
+    after = None
+    if cursor is not None:
+        try:
+            after = decode_cursor(cursor)
+        except InvalidCursorError as e:
+            logger.warning(f"全ユーザー取得失敗: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="不正なカーソルです"
+            )
+    
+    # 次のページの有無を判定するため1件多く取得する
+    users = await user.get_users_page(db, limit + 1, after)
+    if len(users) > limit:
+        users = users[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(users[-1].created_at, users[-1].id)
     return users
 
+@router.post("/users/batch", response_model=List[UserPublic])
+async def get_users_batch(
+    request: Request,
+    batch_in: UserBatchRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+    ) -> Any:
+    """
+    複数のユーザーの公開情報を一括取得するエンドポイント（サービス間連携用）
+    - IDとユーザー名のみを返す
+    - 存在しないIDは結果に含まれない
+    """
+    logger = get_request_logger(request)
+    ids = list(dict.fromkeys(batch_in.ids))
+    logger.info(f"ユーザー一括取得リクエスト: 件数={len(ids)}, 要求元={current_user.username}")
+    
+    return await user.get_public_by_ids(db, ids)
+
 @router.get("/user/me", response_model=UserResponse)
-async def get_user_me(current_user: User = Depends(get_current_user)) -> Any:
+async def get_user_me(current_user: CurrentUser = Depends(get_current_user)) -> Any:
     """
     自分自身のユーザー情報を取得するエンドポイント
     """
     return current_user
 
+@router.get("/user/me/sessions", response_model=List[RefreshSession])
+async def get_my_sessions(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Any:
+    """
+    自分自身の有効なセッション（リフレッシュトークン）の一覧を取得するエンドポイント
+    - トークン本体は返さず、トークンから導出したセッションIDのみを返す
+    """
+    logger = get_request_logger(request)
+    logger.info(f"セッション一覧取得リクエスト: ユーザーID={current_user.id}")
+    
+    return await list_refresh_sessions(str(current_user.id))
+
+@router.post("/user/me/sessions/revoke", response_model=SessionRevokeResult)
+async def revoke_my_sessions(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user)
+) -> Any:
+    """
+    自分自身のすべてのセッション（リフレッシュトークン）を無効化するエンドポイント
+    """
+    logger = get_request_logger(request)
+    logger.info(f"全セッション無効化リクエスト: ユーザーID={current_user.id}")
+    
+    revoked = await revoke_all_refresh_tokens(str(current_user.id))
+    logger.info(f"全セッション無効化成功: ユーザーID={current_user.id}, 無効化数={revoked}")
+    return {"revoked": revoked}
+
 @router.get("/user/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: UUID,
     request: Request,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
@@ -295,7 +527,7 @@ async def update_user(
     user_id: UUID,
     user_in: UserUpdate,
     request: Request,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
@@ -333,9 +565,19 @@ async def update_user(
             detail="管理者権限を変更する権限がありません"
         )
     
+    # アクセストークンのクレームに含まれる情報が変わるかどうか
+    claims_changed = (
+        (user_in.username is not None and user_in.username != db_user.username)
+        or (user_in.is_admin is not None and user_in.is_admin != db_user.is_admin)
+        or (user_in.is_active is not None and user_in.is_active != db_user.is_active)
+    )
+    
     # ユーザー更新
     try:
         updated_user = await user.update(db, db_user, user_in)
+        if claims_changed:
+            # 古い情報を含む発行済みのアクセストークンを無効化
+            await token_versions.bump(str(updated_user.id))
         logger.info(f"ユーザー更新成功: ID={updated_user.id}, ユーザー名={updated_user.username}")
         return updated_user
     except IntegrityError:
@@ -356,7 +598,8 @@ async def update_user(
 async def update_password(
     request: Request,
     password_update: PasswordUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
+    token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
@@ -367,8 +610,17 @@ async def update_password(
     logger = get_request_logger(request)
     logger.info(f"パスワード更新リクエスト: ユーザーID={current_user.id}")
     
+    # パスワードハッシュはアクセストークンに含まれないため、データベースから取得
+    db_user = await user.get_by_id(db, id=current_user.id, with_password=True)
+    if not db_user:
+        logger.warning(f"パスワード更新失敗: ユーザーID '{current_user.id}' が存在しません")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="指定されたユーザーが見つかりません"
+        )
+    
     # 現在のパスワード確認
-    if not verify_password(password_update.current_password, current_user.hashed_password):
+    if not await verify_password_async(password_update.current_password, db_user.hashed_password):
         logger.warning(f"パスワード更新失敗: ユーザーID={current_user.id} - 現在のパスワードが不正")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -377,9 +629,16 @@ async def update_password(
     
     # パスワード更新
     try:
-        updated_user = await user.update_password(db, current_user, password_update.new_password)
-        logger.info(f"パスワード更新成功: ユーザーID={updated_user.id}")
+        updated_user = await user.update_password(db, db_user, password_update.new_password)
+        # 既存のセッションと発行済みのアクセストークンをすべて無効化
+        revoked = await revoke_all_refresh_tokens(str(updated_user.id))
+        await token_versions.bump(str(updated_user.id))
+        # トークンバージョンを確認しない検証側（他のサービス）でも、このリクエストのトークンは直ちに無効にする
+        await revoke_access_token(token)
+        logger.info(f"パスワード更新成功: ユーザーID={updated_user.id}, 無効化したセッション数={revoked}")
         return updated_user
+    except WorkerPoolFullError:
+        raise
     except Exception as e:
         logger.error(f"パスワード更新失敗: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -392,7 +651,7 @@ async def update_password(
 async def admin_update_password(
     request: Request,
     password_update: AdminPasswordUpdate,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: CurrentUser = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
@@ -416,8 +675,13 @@ async def admin_update_password(
     # パスワード更新
     try:
         updated_user = await user.update_password(db, db_user, password_update.new_password)
-        logger.info(f"パスワード更新成功: ユーザーID={updated_user.id}, 管理者={current_user.username}")
+        # 既存のセッションと発行済みのアクセストークンをすべて無効化
+        revoked = await revoke_all_refresh_tokens(str(updated_user.id))
+        await token_versions.bump(str(updated_user.id))
+        logger.info(f"パスワード更新成功: ユーザーID={updated_user.id}, 管理者={current_user.username}, 無効化したセッション数={revoked}")
         return updated_user
+    except WorkerPoolFullError:
+        raise
     except Exception as e:
         logger.error(f"パスワード更新失敗: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -430,7 +694,7 @@ async def admin_update_password(
 async def delete_user(
     user_id: UUID,
     request: Request,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: CurrentUser = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -439,15 +703,6 @@ async def delete_user(
     logger = get_request_logger(request)
     logger.info(f"ユーザー削除リクエスト: 対象ID={user_id}, 要求元={current_user.username}")
     
-    # 削除対象ユーザーの取得
-    db_user = await user.get_by_id(db, id=user_id)
-    if not db_user:
-        logger.warning(f"ユーザー削除失敗: ユーザーID '{user_id}' が存在しません")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="指定されたユーザーが見つかりません"
-        )
-    
     # 自分自身を削除しようとしていないか確認
     if str(current_user.id) == str(user_id):
         logger.warning(f"ユーザー削除失敗: ユーザー '{current_user.username}' が自分自身を削除しようとしています")
@@ -456,10 +711,28 @@ async def delete_user(
             detail="自分自身を削除することはできません"
         )
     
-    # ユーザー削除
+    # ユーザー削除（事前に読み込まず、DELETE ... RETURNING で存在を確認する）
     try:
-        await user.delete(db, db_user)
-        logger.info(f"ユーザー削除成功: ID={user_id}, ユーザー名={db_user.username}")
+        deleted_username = await user.delete_by_id(db, user_id)
+    except Exception as e:
+        logger.error(f"ユーザー削除失敗: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="ユーザー削除中にエラーが発生しました"
+        )
+    if deleted_username is None:
+        logger.warning(f"ユーザー削除失敗: ユーザーID '{user_id}' が存在しません")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="指定されたユーザーが見つかりません"
+        )
+    
+    try:
+        # 削除したユーザーのセッションと発行済みのアクセストークンをすべて無効化
+        # （アクセストークンの有効期限が過ぎればバージョンは不要になる）
+        revoked = await revoke_all_refresh_tokens(str(user_id))
+        await token_versions.bump(str(user_id), expire=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        logger.info(f"ユーザー削除成功: ID={user_id}, ユーザー名={deleted_username}, 無効化したセッション数={revoked}")
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     except Exception as e:
         logger.error(f"ユーザー削除失敗: {str(e)}", exc_info=True)
@@ -467,3 +740,98 @@ async def delete_user(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="ユーザー削除中にエラーが発生しました"
         )
+
+
+@router.get("/admin/users/{user_id}/sessions", response_model=List[RefreshSession])
+async def get_user_sessions(
+    user_id: UUID,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_admin_user)
+) -> Any:
+    """
+    指定したユーザーの有効なセッションの一覧を取得するエンドポイント（管理者のみ）
+    """
+    logger = get_request_logger(request)
+    logger.info(f"セッション一覧取得リクエスト: 対象ID={user_id}, 要求元={current_user.username}")
+    
+    return await list_refresh_sessions(str(user_id))
+
+
+@router.delete("/admin/users/{user_id}/sessions", response_model=SessionRevokeResult)
+async def revoke_user_sessions(
+    user_id: UUID,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_admin_user)
+) -> Any:
+    """
+    指定したユーザーのすべてのセッションを無効化するエンドポイント（管理者のみ）
+    """
+    logger = get_request_logger(request)
+    logger.info(f"全セッション無効化リクエスト: 対象ID={user_id}, 要求元={current_user.username}")
+    
+    revoked = await revoke_all_refresh_tokens(str(user_id))
+    logger.info(f"全セッション無効化成功: 対象ID={user_id}, 無効化数={revoked}")
+    return {"revoked": revoked}
+
+
+@router.get("/.well-known/jwks.json")
+async def get_jwks(response: Response) -> Any:
+    """
+    トークンの検証に使用できる公開鍵の一覧（JWKS）を取得するエンドポイント
+    - 鍵のローテーション中は新旧両方の公開鍵を返す
+    """
+    try:
+        jwks = key_manager.jwks()
+    except KeyLoadError as e:
+        app_logger.error(f"JWKSの生成に失敗しました: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="公開鍵を読み込めません"
+        )
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"
+    return jwks
+
+
+@router.post("/admin/keys/reload")
+async def reload_keys(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_admin_user)
+) -> Any:
+    """
+    署名鍵・検証鍵を再読み込みするエンドポイント（管理者のみ）
+    - 鍵ファイルの更新確認を待たずに、即座に新しい鍵を反映する
+    """
+    logger = get_request_logger(request)
+    logger.info(f"鍵の再読み込みリクエスト: 要求元={current_user.username}")
+    
+    try:
+        result = key_manager.reload()
+        logger.info(f"鍵の再読み込み成功: {result}")
+        return result
+    except KeyLoadError as e:
+        logger.error(f"鍵の再読み込み失敗: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="鍵の再読み込みに失敗しました"
+        )
+
+
+@router.get("/admin/metrics")
+async def get_metrics(
+    current_user: CurrentUser = Depends(get_current_admin_user)
+) -> Any:
+    """
+    内部コンポーネントの統計情報を取得するエンドポイント（管理者のみ）
+    """
+    return {
+        "password_hash_pool": password_hash_pool.stats(),
+        "token_verification": dict(token_verification_stats),
+        "token_versions": token_versions.stats(),
+        "user_cache": user_cache.stats(),
+        "username_filter": username_filter.stats(),
+        "revocation": revocation_list.stats(),
+        "login_rate_limit": {
+            "ip": login_ip_limiter.stats(),
+            "username": login_username_limiter.stats(),
+        },
+    }
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
-from typing import Optional, Literal
+from typing import Optional, Literal, List
 import os
 
 class Settings(BaseSettings):
@@ -32,14 +32,83 @@ class Settings(BaseSettings):
     # Redis設定
     REDIS_HOST: str = "auth_redis"
     REDIS_PORT: int = 6379
+    REDIS_MAX_CONNECTIONS: int = 20  # 接続プールの最大接続数
+    REDIS_POOL_TIMEOUT: float = 5.0  # 空き接続を待つ最大時間（秒）
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30  # アイドル接続のヘルスチェック間隔（秒）
     
     # トークン設定
     SECRET_KEY: str
-    ALGORITHM: str = "RS256"  # HS256からRS256に変更
+    ALGORITHM: str = "RS256"  # RS256 / ES256 / EdDSA（鍵は scripts/generate_keys.py で生成）
+    # JWTの署名・検証の実装（scripts/benchmark_jwt.py で比較できる。pyjwtにはPyJWTが必要）
+    JWT_BACKEND: Literal["jose", "pyjwt", "cryptography"] = "cryptography"
     PRIVATE_KEY_PATH: str = "keys/private.pem"  # 秘密鍵のパス
     PUBLIC_KEY_PATH: str = "keys/public.pem"   # 公開鍵のパス
+    KEY_RELOAD_CHECK_INTERVAL: float = 5.0  # 鍵ファイルの更新確認間隔（秒）
+    # 鍵のローテーション中に検証とJWKSの公開に使用する追加の公開鍵のパス（JSON配列で指定）
+    ADDITIONAL_PUBLIC_KEY_PATHS: List[str] = []
+    JWKS_CACHE_MAX_AGE: int = 300  # JWKSエンドポイントのCache-Controlのmax-age（秒）
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # HS256（SECRET_KEY）で署名された旧形式のトークンを受け付けるか
+    # GET /auth/admin/metrics の legacy_hs256 が0になったらFalseにする
+    LEGACY_HS256_ENABLED: bool = True
+    # トークンバージョン（ver クレーム）のプロセス内キャッシュ
+    TOKEN_VERSION_CACHE_TTL: float = 5.0  # 他プロセスでの無効化が反映されるまでの最大秒数
+    TOKEN_VERSION_CACHE_MAX_SIZE: int = 10000
+    
+    # ユーザーキャッシュ設定
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_LOCAL_TTL: float = 30.0  # プロセス内キャッシュの有効期間（秒）
+    USER_CACHE_LOCAL_MAX_SIZE: int = 10000
+    USER_CACHE_REDIS_TTL: int = 300  # Redisキャッシュの有効期間（秒）
+    
+    # 登録済みユーザー名のBloomフィルタ（存在しないユーザー名のデータベースへの問い合わせを省く）
+    USERNAME_FILTER_ENABLED: bool = True
+    USERNAME_FILTER_CAPACITY: int = 1000000  # 想定するユーザー数（メモリ使用量は約10バイト/件）
+    USERNAME_FILTER_FALSE_POSITIVE_RATE: float = 0.01
+    USERNAME_FILTER_REBUILD_INTERVAL: float = 900.0  # 定期的な再構築の間隔（秒、0で無効）
+    
+    # 無効化したアクセストークン（jti）のプロセス内フィルタ設定
+    # 無効にした場合も無効化は行われるが、検証のたびにRedisに問い合わせる
+    REVOCATION_FILTER_ENABLED: bool = True
+    REVOCATION_FILTER_CAPACITY: int = 100000  # 想定する有効期限内の無効化済みトークン数
+    REVOCATION_FILTER_FALSE_POSITIVE_RATE: float = 0.001
+    REVOCATION_FILTER_REBUILD_INTERVAL: float = 300.0  # 定期的な再構築の間隔（秒、0で無効）
+    
+    # ユーザー情報の一括取得（POST /auth/users/batch）で指定できるIDの最大数
+    USER_BATCH_MAX_IDS: int = 500
+    # ユーザー一覧（GET /auth/users）の1ページの件数
+    USER_LIST_DEFAULT_LIMIT: int = 100
+    USER_LIST_MAX_LIMIT: int = 1000
+    # NDJSONでの全件出力時に1回にデータベースから取得する行数
+    USER_STREAM_BATCH_SIZE: int = 500
+    # ユーザーの一括登録（POST /auth/admin/users/import）
+    USER_IMPORT_MAX_ROWS: int = 100000  # 1リクエストで登録できる最大件数
+    USER_IMPORT_BATCH_SIZE: int = 500  # 1回のINSERTで登録する件数
+    
+    # ログインの試行回数制限（パスワードの検証の前に判定する）
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_WINDOW: float = 60.0  # スライディングウィンドウの長さ（秒）
+    LOGIN_RATE_LIMIT_PER_IP: int = 100  # ウィンドウ内のIPアドレスごとの上限回数
+    LOGIN_RATE_LIMIT_PER_USERNAME: int = 10  # ウィンドウ内のユーザー名ごとの上限回数
+    LOGIN_RATE_LIMIT_LOCAL_MAX_SIZE: int = 10000  # プロセス内に記録する拒否中のキーの最大数
+    # X-Forwarded-For をクライアントのIPアドレスとして信頼するか（リバースプロキシの背後でのみ有効にする）
+    TRUST_PROXY_HEADERS: bool = False
+    
+    # パスワードハッシュ用ワーカープール設定
+    PASSWORD_HASH_POOL_TYPE: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_POOL_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32  # 上限を超えた場合は503を返す
+    
+    # パスワードハッシュの方式とコスト（scripts/calibrate_password_hash.py で計測して決める）
+    # 現在の設定と異なる方式・コストのハッシュは、ログイン成功時に新しい設定でハッシュし直す
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2"] = "bcrypt"
+    BCRYPT_ROUNDS: int = 12  # コスト係数（1増やすと計算時間は約2倍）
+    ARGON2_TIME_COST: int = 2  # 反復回数
+    ARGON2_MEMORY_COST: int = 19456  # 使用メモリ（KiB）
+    ARGON2_PARALLELISM: int = 1  # 並列度（CPUの割り当て以下にする）
     
     @property
     def DATABASE_URL(self) -> str:
@@ -0,0 +1,319 @@
+import base64
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    PublicFormat,
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jose import jwk
+from jose.backends.base import Key
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+# EdDSAをjoseに登録する
+from app.core import eddsa  # noqa: F401
+
+
+class KeyLoadError(RuntimeError):
+    """鍵の読み込みまたはパースに失敗した場合の例外"""
+
+
+# 非対称鍵の署名アルゴリズムと対応する鍵の種類（JWKのkty）
+ASYMMETRIC_ALGORITHMS = {
+    "RS256": "RSA",
+    "RS384": "RSA",
+    "RS512": "RSA",
+    "ES256": "EC",
+    "ES384": "EC",
+    "ES512": "EC",
+    "EdDSA": "OKP",
+}
+
+# 楕円曲線ごとのECDSAのアルゴリズム
+_EC_ALGORITHMS = {"P-256": "ES256", "P-384": "ES384", "P-521": "ES512"}
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _int_to_b64url(value: int, length: Optional[int] = None) -> str:
+    length = length or max(1, (value.bit_length() + 7) // 8)
+    return _b64url(value.to_bytes(length, "big"))
+
+
+def public_key_to_jwk(public_key: Any) -> Dict[str, str]:
+    """
+    公開鍵をJWK（RFC 7517）の必須メンバーのみの辞書に変換する
+
+    Args:
+        public_key: cryptographyの公開鍵オブジェクト（RSA, EC, Ed25519）
+
+    Returns:
+        Dict[str, str]: JWKの必須メンバー
+
+    Raises:
+        KeyLoadError: 未対応の鍵の種類の場合
+    """
+    if isinstance(public_key, rsa.RSAPublicKey):
+        numbers = public_key.public_numbers()
+        return {"kty": "RSA", "n": _int_to_b64url(numbers.n), "e": _int_to_b64url(numbers.e)}
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        crv = {"secp256r1": "P-256", "secp384r1": "P-384", "secp521r1": "P-521"}.get(public_key.curve.name)
+        if crv is None:
+            raise KeyLoadError(f"未対応の楕円曲線です: {public_key.curve.name}")
+        size = (public_key.curve.key_size + 7) // 8
+        numbers = public_key.public_numbers()
+        return {"kty": "EC", "crv": crv, "x": _int_to_b64url(numbers.x, size), "y": _int_to_b64url(numbers.y, size)}
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        raw = public_key.public_bytes(Encoding.Raw, PublicFormat.Raw)
+        return {"kty": "OKP", "crv": "Ed25519", "x": _b64url(raw)}
+    raise KeyLoadError(f"未対応の鍵の種類です: {type(public_key).__name__}")
+
+
+def key_algorithm(jwk_members: Dict[str, str]) -> str:
+    """
+    鍵に使用する署名アルゴリズムを返す
+
+    設定のアルゴリズムが鍵の種類に合う場合はそれを、合わない場合は鍵の種類の標準のアルゴリズムを返す。
+
+    Args:
+        jwk_members: public_key_to_jwk で得たJWKの必須メンバー
+
+    Returns:
+        str: 署名アルゴリズム
+    """
+    if ASYMMETRIC_ALGORITHMS.get(settings.ALGORITHM) == jwk_members["kty"]:
+        if jwk_members["kty"] != "EC" or _EC_ALGORITHMS[jwk_members["crv"]] == settings.ALGORITHM:
+            return settings.ALGORITHM
+    if jwk_members["kty"] == "EC":
+        return _EC_ALGORITHMS[jwk_members["crv"]]
+    return {"RSA": "RS256", "OKP": "EdDSA"}[jwk_members["kty"]]
+
+
+def jwk_thumbprint(jwk_members: Dict[str, str]) -> str:
+    """
+    JWKのサムプリント（RFC 7638, SHA-256）を計算する
+
+    Args:
+        jwk_members: public_key_to_jwk で得たJWKの必須メンバー
+
+    Returns:
+        str: base64urlエンコードされたサムプリント（kidとして使用する）
+    """
+    canonical = json.dumps(jwk_members, sort_keys=True, separators=(",", ":"))
+    return _b64url(hashlib.sha256(canonical.encode("utf-8")).digest())
+
+
+@dataclass
+class _CachedKey:
+    """パース済みの鍵とその読み込み元の情報"""
+    path: str
+    mtime: Optional[float]
+    pem: bytes
+    key: Any
+    loaded_at: float
+    checked_at: float
+    # 公開鍵のJWK（必須メンバーのみ）とそのサムプリント
+    jwk: Dict[str, str] = field(default_factory=dict)
+    kid: str = ""
+    # アルゴリズムごとのjoseのKeyオブジェクト
+    jose_keys: Dict[str, Key] = field(default_factory=dict)
+
+
+class KeyManager:
+    """
+    JWTの署名鍵・検証鍵をキャッシュして管理するクラス
+
+    PEMファイルの読み込みとパースは初回のみ行い、以降はパース済みの鍵オブジェクトを再利用する。
+    ファイルの更新時刻(mtime)が変わった場合、または reload() が呼ばれた場合にのみ再読み込みする。
+    mtimeの確認は KEY_RELOAD_CHECK_INTERVAL 秒に1回までに抑える。
+
+    鍵には公開鍵のJWKサムプリントをkidとして割り当てる。鍵のローテーション中は
+    ADDITIONAL_PUBLIC_KEY_PATHS の公開鍵も検証とJWKSの公開に使用する。
+    """
+
+    def __init__(self):
+        self._private: Optional[_CachedKey] = None
+        self._public: Optional[_CachedKey] = None
+        self._additional: Dict[str, _CachedKey] = {}
+
+    def _load(
+        self,
+        cached: Optional[_CachedKey],
+        path: str,
+        env_name: str,
+        loader: Callable[[bytes], Any],
+    ) -> _CachedKey:
+        now = time.monotonic()
+
+        # パスが変わっていない場合は一定間隔でのみmtimeを確認する
+        if cached is not None and cached.path == path:
+            if now - cached.checked_at < settings.KEY_RELOAD_CHECK_INTERVAL:
+                return cached
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                mtime = None
+            cached.checked_at = now
+            if mtime == cached.mtime:
+                return cached
+
+        try:
+            with open(path, "rb") as f:
+                mtime = os.fstat(f.fileno()).st_mtime
+                pem = f.read()
+        except FileNotFoundError:
+            # 開発環境では環境変数から直接読み込む選択肢も
+            pem = os.environ.get(env_name, "").encode("utf-8")
+            mtime = None
+
+        if not pem:
+            raise KeyLoadError(f"鍵が見つかりません: {path}")
+
+        try:
+            key = loader(pem)
+        except ValueError as e:
+            raise KeyLoadError(f"鍵のパースに失敗しました: {path}: {e}") from e
+
+        # 秘密鍵の場合は対応する公開鍵からkidを求める
+        public_key = key.public_key() if hasattr(key, "public_key") else key
+        jwk_members = public_key_to_jwk(public_key)
+        kid = jwk_thumbprint(jwk_members)
+
+        logger.info(f"鍵を読み込みました: {path} (kid={kid})")
+        return _CachedKey(
+            path=path,
+            mtime=mtime,
+            pem=pem,
+            key=key,
+            loaded_at=time.time(),
+            checked_at=now,
+            jwk=jwk_members,
+            kid=kid,
+        )
+
+    def _private_entry(self) -> _CachedKey:
+        self._private = self._load(
+            self._private,
+            settings.PRIVATE_KEY_PATH,
+            "PRIVATE_KEY",
+            lambda pem: load_pem_private_key(pem, password=None),
+        )
+        return self._private
+
+    def _public_entry(self) -> _CachedKey:
+        self._public = self._load(
+            self._public,
+            settings.PUBLIC_KEY_PATH,
+            "PUBLIC_KEY",
+            load_pem_public_key,
+        )
+        return self._public
+
+    def _additional_entries(self) -> List[_CachedKey]:
+        entries = {}
+        for path in settings.ADDITIONAL_PUBLIC_KEY_PATHS:
+            try:
+                entries[path] = self._load(self._additional.get(path), path, "", load_pem_public_key)
+            except KeyLoadError as e:
+                # 追加の鍵が読めなくても現在の鍵での検証は継続する
+                logger.error(f"追加の公開鍵の読み込みに失敗しました: {e}")
+        self._additional = entries
+        return list(entries.values())
+
+    @staticmethod
+    def _jose_key(entry: _CachedKey, algorithm: str) -> Key:
+        jose_key = entry.jose_keys.get(algorithm)
+        if jose_key is None:
+            jose_key = jwk.construct(entry.pem, algorithm)
+            entry.jose_keys[algorithm] = jose_key
+        return jose_key
+
+    @property
+    def private_key(self) -> Any:
+        """パース済みの秘密鍵（cryptographyの鍵オブジェクト）"""
+        return self._private_entry().key
+
+    @property
+    def public_key(self) -> Any:
+        """パース済みの公開鍵（cryptographyの鍵オブジェクト）"""
+        return self._public_entry().key
+
+    @property
+    def signing_kid(self) -> str:
+        """署名に使用する鍵のkid"""
+        return self._private_entry().kid
+
+    def get_signing_key(self, algorithm: Optional[str] = None) -> Key:
+        """署名に使用するjoseのKeyオブジェクトを取得する"""
+        return self._jose_key(self._private_entry(), algorithm or settings.ALGORITHM)
+
+    def get_verification_key(self, algorithm: Optional[str] = None, kid: Optional[str] = None) -> Optional[Key]:
+        """
+        検証に使用するjoseのKeyオブジェクトを取得する
+
+        Args:
+            algorithm: アルゴリズム（指定がない場合は設定値）
+            kid: トークンのヘッダーのkid（指定がない場合は現在の公開鍵）
+
+        Returns:
+            Optional[Key]: kidに対応する鍵。該当する鍵がない場合はNone
+        """
+        algorithm = algorithm or settings.ALGORITHM
+        entry = self._public_entry()
+        if kid is not None and kid != entry.kid:
+            entry = next((e for e in self._additional_entries() if e.kid == kid), None)
+        # 鍵の種類に合わないアルゴリズムでは検証しない
+        if entry is None or ASYMMETRIC_ALGORITHMS.get(algorithm) != entry.jwk["kty"]:
+            return None
+        return self._jose_key(entry, algorithm)
+
+    def jwks(self) -> Dict[str, List[Dict[str, str]]]:
+        """
+        検証に使用できる公開鍵の一覧をJWKS形式で返す
+
+        Returns:
+            Dict[str, List[Dict[str, str]]]: 現在の公開鍵と追加の公開鍵のJWKS
+        """
+        entries = [self._public_entry()]
+        entries += [e for e in self._additional_entries() if e.kid != entries[0].kid]
+        return {
+            "keys": [
+                {**entry.jwk, "kid": entry.kid, "use": "sig", "alg": key_algorithm(entry.jwk)}
+                for entry in entries
+            ]
+        }
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        キャッシュを破棄して鍵を強制的に再読み込みする
+
+        Returns:
+            Dict[str, Any]: 読み込んだ鍵のパスと読み込み時刻
+        """
+        self._private = None
+        self._public = None
+        self._additional = {}
+        private_entry = self._private_entry()
+        public_entry = self._public_entry()
+        return {
+            "private_key_path": private_entry.path,
+            "private_key_loaded_at": private_entry.loaded_at,
+            "public_key_path": public_entry.path,
+            "public_key_loaded_at": public_entry.loaded_at,
+            "kid": private_entry.kid,
+            "additional_kids": [entry.kid for entry in self._additional_entries()],
+        }
+
+
+# アプリケーション全体で共有する鍵マネージャー
+key_manager = KeyManager()
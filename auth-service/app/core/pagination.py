@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """ページネーションのカーソルが不正な場合の例外"""
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """
+    キーセットページネーションのカーソルを作成する
+
+    Args:
+        created_at: ページの最後の行の作成日時
+        id: ページの最後の行のID
+
+    Returns:
+        str: URLセーフなBase64でエンコードしたカーソル
+    """
+    raw = json.dumps([created_at.isoformat(), str(id)], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    キーセットページネーションのカーソルを復元する
+
+    Args:
+        cursor: encode_cursor で作成したカーソル
+
+    Returns:
+        Tuple[datetime, UUID]: 前のページの最後の行の (作成日時, ID)
+
+    Raises:
+        InvalidCursorError: カーソルが不正な場合
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        # UUID() は文字列以外では AttributeError などを送出するため、先に型を確認する
+        if not isinstance(created_at, str) or not isinstance(id, str):
+            raise TypeError("カーソルの値が文字列ではありません")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"不正なカーソルです: {cursor}") from e
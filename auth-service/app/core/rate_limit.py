@@ -0,0 +1,187 @@
+import hashlib
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+from app.core.redis_client import redis_manager
+
+# ログイン試行回数のRedisキー
+# login_rate:{名前}:{キー} -> 試行時刻（ミリ秒）をスコアとするソート済みセット
+LOGIN_RATE_PREFIX = "login_rate:"
+
+# スライディングウィンドウでの試行の記録と判定を1回の往復で行うLuaスクリプト
+# KEYS[1]: キー
+# ARGV[1]: 現在時刻（ミリ秒）, ARGV[2]: ウィンドウ（ミリ秒）, ARGV[3]: 上限回数, ARGV[4]: メンバー
+# 戻り値: 上限に達している場合は再試行までのミリ秒、許可した場合は0
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return math.max(1, tonumber(oldest[2]) + window - now)
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return 0
+"""
+
+
+class RateLimitExceededError(Exception):
+    """試行回数が上限に達している場合の例外"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"'{name}' の試行回数が上限に達しています（{retry_after:.1f}秒後に再試行可能）")
+
+
+class SlidingWindowLimiter:
+    """
+    Redisのソート済みセットによるスライディングウィンドウ方式の試行回数制限
+
+    window 秒間の試行が limit 回に達したキーは、最も古い試行がウィンドウから外れるまで拒否する。
+    拒否したキーは解除される時刻までプロセス内に記録し、その間はRedisに問い合わせずに拒否する。
+    Redisの障害時は制限せずに許可する。
+    """
+
+    def __init__(self, name: str, limit: int, window: float, local_max_size: int):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.local_max_size = local_max_size
+        self._blocked: "OrderedDict[str, float]" = OrderedDict()
+
+        # 統計情報
+        self._allowed = 0
+        self._rejected = 0
+        self._local_rejected = 0
+        self._errors = 0
+
+    def _key(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return f"{LOGIN_RATE_PREFIX}{self.name}:{digest}"
+
+    def _local_retry_after(self, key: str) -> Optional[float]:
+        blocked_until = self._blocked.get(key)
+        if blocked_until is None:
+            return None
+        remaining = blocked_until - time.time()
+        if remaining <= 0:
+            del self._blocked[key]
+            return None
+        return remaining
+
+    def _block_locally(self, key: str, retry_after: float) -> None:
+        self._blocked[key] = time.time() + retry_after
+        self._blocked.move_to_end(key)
+        while len(self._blocked) > self.local_max_size:
+            self._blocked.popitem(last=False)
+
+    async def hit(self, key: str) -> float:
+        """
+        試行を記録し、上限に達しているかを判定する
+
+        Args:
+            key: 制限の単位（ユーザー名、IPアドレスなど）
+
+        Returns:
+            float: 上限に達している場合は再試行までの秒数、許可した場合は0
+        """
+        retry_after = self._local_retry_after(key)
+        if retry_after is not None:
+            self._local_rejected += 1
+            self._rejected += 1
+            return retry_after
+
+        try:
+            sliding_window = redis_manager.client.register_script(SLIDING_WINDOW_SCRIPT)
+            retry_after_ms = await sliding_window(
+                keys=[self._key(key)],
+                args=[int(time.time() * 1000), int(self.window * 1000), self.limit, uuid.uuid4().hex],
+            )
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"試行回数制限 '{self.name}' の確認に失敗しました: {e}")
+            return 0.0
+
+        if not retry_after_ms:
+            self._allowed += 1
+            return 0.0
+
+        retry_after = int(retry_after_ms) / 1000
+        self._rejected += 1
+        self._block_locally(key, retry_after)
+        return retry_after
+
+    def clear(self) -> None:
+        """プロセス内の拒否の記録を破棄する"""
+        self._blocked.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """許可・拒否の回数などの統計情報を返す"""
+        return {
+            "limit": self.limit,
+            "window": self.window,
+            "allowed": self._allowed,
+            "rejected": self._rejected,
+            "local_rejected": self._local_rejected,
+            "locally_blocked": len(self._blocked),
+            "errors": self._errors,
+        }
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    クライアントのIPアドレスを取得する
+
+    TRUST_PROXY_HEADERS が有効な場合は X-Forwarded-For の先頭のアドレスを使用する。
+    リバースプロキシを経由しない構成で有効にすると、クライアントがIPアドレスを偽装できる。
+    """
+    if settings.TRUST_PROXY_HEADERS:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+# ログインの試行回数制限（IPアドレスごと・ユーザー名ごと）
+login_ip_limiter = SlidingWindowLimiter(
+    "ip",
+    limit=settings.LOGIN_RATE_LIMIT_PER_IP,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW,
+    local_max_size=settings.LOGIN_RATE_LIMIT_LOCAL_MAX_SIZE,
+)
+login_username_limiter = SlidingWindowLimiter(
+    "username",
+    limit=settings.LOGIN_RATE_LIMIT_PER_USERNAME,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW,
+    local_max_size=settings.LOGIN_RATE_LIMIT_LOCAL_MAX_SIZE,
+)
+
+
+async def check_login_rate_limit(request: Request, username: str) -> None:
+    """
+    ログインの試行回数を記録し、上限に達している場合は拒否する
+
+    パスワードの検証（bcrypt）より前に呼び出す。
+
+    Args:
+        request: リクエスト
+        username: ログインしようとしているユーザー名
+
+    Raises:
+        RateLimitExceededError: IPアドレスまたはユーザー名の試行回数が上限に達している場合
+    """
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return
+    for limiter, key in ((login_ip_limiter, get_client_ip(request)), (login_username_limiter, username)):
+        retry_after = await limiter.hit(key)
+        if retry_after > 0:
+            raise RateLimitExceededError(limiter.name, math.ceil(retry_after))
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+
+
+class RedisClientManager:
+    """
+    アプリケーション全体で共有するRedisクライアント（接続プール）を管理するクラス
+
+    lifespanの起動時に init() し、終了時に close() する。
+    lifespanを経由しない実行（スクリプトやテスト）では初回アクセス時に初期化する。
+    """
+
+    def __init__(self):
+        self._client: Optional[redis.Redis] = None
+        self._pool: Optional[redis.ConnectionPool] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def init(self) -> redis.Redis:
+        """接続プールとクライアントを作成する（作成済みの場合は既存のものを返す）"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        # 接続はイベントループに紐づくため、ループが変わった場合は作り直す
+        if self._client is not None and (self._loop is None or loop is None or self._loop is loop):
+            return self._client
+
+        self._pool = redis.BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+        )
+        self._client = redis.Redis(connection_pool=self._pool)
+        self._loop = loop
+        logger.info(
+            f"Redis connection pool created: {settings.REDIS_HOST}:{settings.REDIS_PORT} "
+            f"(max_connections={settings.REDIS_MAX_CONNECTIONS})"
+        )
+        return self._client
+
+    @property
+    def client(self) -> redis.Redis:
+        """共有Redisクライアントを取得する"""
+        return self.init()
+
+    async def close(self) -> None:
+        """クライアントを閉じ、接続プールを切断する"""
+        if self._client is not None:
+            await self._client.aclose()
+        if self._pool is not None:
+            await self._pool.disconnect()
+        self._client = None
+        self._pool = None
+        self._loop = None
+        logger.info("Redis connection pool closed")
+
+
+# アプリケーション全体で共有するRedisクライアントマネージャー
+redis_manager = RedisClientManager()
+
+
+async def get_redis() -> redis.Redis:
+    """
+    共有Redisクライアントを返す依存関数
+
+    Returns:
+        redis.Redis: 接続プールを共有するRedisクライアント
+    """
+    return redis_manager.client
@@ -0,0 +1,207 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+from app.core.redis_client import redis_manager
+from app.core.username_filter import CountingBloomFilter
+
+# 無効化したアクセストークンのRedisキー
+# revoked_jti:{jti} -> 1（トークンの有効期限まで保持する）
+REVOKED_JTI_PREFIX = "revoked_jti:"
+# 無効化を他のプロセス・サービスに通知するチャンネル（メッセージはjti）
+REVOCATION_CHANNEL = "revoked_jti:events"
+
+
+class RevocationList:
+    """
+    無効化したアクセストークン（jti）の一覧
+
+    Redisの revoked_jti:{jti} を正とし、プロセス内に無効化したjtiのBloomフィルタを保持する。
+    フィルタに含まれないjtiは無効化されていないことが確実なため、Redisに問い合わせずに判定できる。
+    フィルタに含まれる可能性がある場合のみRedisで確認する。
+
+    無効化は Redis の pub/sub で他のプロセス・サービスに通知する。
+    購読が途切れた場合や定期的に、Redisの revoked_jti:* から再構築する（期限切れのjtiもここで除かれる）。
+    構築が完了するまでは毎回Redisで確認する。
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float, rebuild_interval: float):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.rebuild_interval = rebuild_interval
+        self._filter: Optional[CountingBloomFilter] = None
+        # 構築中に無効化されたjti（構築後のフィルタにも追加する）
+        self._added_while_building: Optional[List[str]] = None
+        self._build_lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+        # 統計情報
+        self._local_negatives = 0
+        self._redis_checks = 0
+        self._revoked_hits = 0
+        self._revocations = 0
+        self._errors = 0
+        self._rebuilds = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def _add_local(self, jti: str) -> None:
+        if self._filter is not None:
+            self._filter.add(jti)
+        if self._added_while_building is not None:
+            self._added_while_building.append(jti)
+
+    async def revoke(self, jti: str, expires_at: float) -> bool:
+        """
+        アクセストークンを無効化する
+
+        Args:
+            jti: トークンのjti
+            expires_at: トークンの有効期限（UNIX時間）
+
+        Returns:
+            bool: 無効化した場合はTrue（有効期限が過ぎている場合はFalse）
+        """
+        ttl = int(expires_at - time.time()) + 1
+        if ttl <= 0:
+            return False
+        self._add_local(jti)
+        async with redis_manager.client.pipeline(transaction=False) as pipe:
+            pipe.setex(f"{REVOKED_JTI_PREFIX}{jti}", ttl, 1)
+            pipe.publish(REVOCATION_CHANNEL, jti)
+            await pipe.execute()
+        self._revocations += 1
+        return True
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        """
+        アクセストークンが無効化されているかを判定する
+
+        Redisの障害時は無効化されていないものとして扱う。
+
+        Args:
+            jti: トークンのjti（jtiを含まない旧形式のトークンの場合はNone）
+
+        Returns:
+            bool: 無効化されている場合はTrue
+        """
+        if not jti:
+            return False
+        if self._filter is not None and not self._filter.might_contain(jti):
+            self._local_negatives += 1
+            return False
+
+        self._redis_checks += 1
+        try:
+            revoked = await redis_manager.client.exists(f"{REVOKED_JTI_PREFIX}{jti}") > 0
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"アクセストークンの無効化の確認に失敗しました: {e}")
+            return False
+        if revoked:
+            self._revoked_hits += 1
+        return revoked
+
+    async def rebuild(self) -> bool:
+        """
+        Redisの無効化済みのjtiからフィルタを構築する
+
+        Returns:
+            bool: 構築に成功した場合はTrue
+        """
+        async with self._build_lock:
+            self._added_while_building = []
+            try:
+                new_filter = CountingBloomFilter(self.capacity, self.false_positive_rate)
+                async for key in redis_manager.client.scan_iter(match=f"{REVOKED_JTI_PREFIX}*", count=1000):
+                    new_filter.add(key.decode("utf-8")[len(REVOKED_JTI_PREFIX):])
+                for jti in self._added_while_building:
+                    new_filter.add(jti)
+            except Exception as e:
+                logger.error(f"無効化済みトークンのフィルタの構築に失敗しました: {e}")
+                return False
+            finally:
+                self._added_while_building = None
+
+            self._filter = new_filter
+            self._rebuilds += 1
+            logger.info(f"無効化済みトークンのフィルタを構築しました: 件数={new_filter.count}")
+            return True
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_manager.client.pubsub()
+            try:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                # 購読を開始する前の通知は受け取れないため、購読を開始してから構築する
+                self._rebuild_task = asyncio.create_task(self.rebuild())
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message["type"] != "message":
+                        continue
+                    self._add_local(message["data"].decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"アクセストークンの無効化の受信に失敗しました: {e}")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    async def _rebuild_loop(self) -> None:
+        # 期限切れで削除されたjtiをフィルタから除く
+        while True:
+            await asyncio.sleep(self.rebuild_interval)
+            await self.rebuild()
+
+    def start(self) -> None:
+        """フィルタの構築と他のプロセスからの無効化の受信を開始する"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._listen())]
+        if self.rebuild_interval > 0:
+            self._tasks.append(asyncio.create_task(self._rebuild_loop()))
+
+    async def stop(self) -> None:
+        """無効化の受信と定期的な再構築を停止する"""
+        tasks = self._tasks + ([self._rebuild_task] if self._rebuild_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._rebuild_task = None
+
+    def clear(self) -> None:
+        """フィルタを破棄する（再構築するまで毎回Redisで確認する）"""
+        self._filter = None
+
+    def stats(self) -> Dict[str, Any]:
+        """件数、Redisへの問い合わせ回数などの統計情報を返す"""
+        return {
+            "ready": self.ready,
+            "count": self._filter.count if self._filter else 0,
+            "estimated_false_positive_rate": self._filter.estimated_false_positive_rate if self._filter else None,
+            "local_negatives": self._local_negatives,
+            "redis_checks": self._redis_checks,
+            "revoked_hits": self._revoked_hits,
+            "revocations": self._revocations,
+            "errors": self._errors,
+            "rebuilds": self._rebuilds,
+        }
+
+
+# アプリケーション全体で共有する無効化済みトークンの一覧
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    false_positive_rate=settings.REVOCATION_FILTER_FALSE_POSITIVE_RATE,
+    rebuild_interval=settings.REVOCATION_FILTER_REBUILD_INTERVAL,
+)
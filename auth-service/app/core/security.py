@@ -1,12 +1,122 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, UTC
-from jose import jwt, JWTError
+from jose import JWTError
+import asyncio
 import secrets
-import redis.asyncio as redis
-from typing import Optional, Dict, Any
+import uuid
+import hashlib
+import time
+from collections import Counter
+from typing import Optional, Dict, Any, Tuple, List
 from .config import settings
+from .keys import key_manager, ASYMMETRIC_ALGORITHMS
+from .worker_pool import BoundedWorkerPool
+from .redis_client import redis_manager
+from .token_version import token_versions
+from .revocation import revocation_list
+from .token_codec import token_codec
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_password_context(
+    scheme: str,
+    bcrypt_rounds: int,
+    argon2_time_cost: int,
+    argon2_memory_cost: int,
+    argon2_parallelism: int,
+) -> CryptContext:
+    """
+    パスワードハッシュのコンテキストを作成する関数
+    
+    新しいハッシュは scheme で作成し、他の方式のハッシュも検証できるようにする。
+    方式またはコストが設定と異なるハッシュは needs_update / verify_and_update で更新対象となる。
+    
+    Args:
+        scheme: 新しいハッシュに使用する方式（bcrypt, argon2）
+        bcrypt_rounds: bcryptのコスト係数
+        argon2_time_cost: Argon2idの反復回数
+        argon2_memory_cost: Argon2idの使用メモリ（KiB）
+        argon2_parallelism: Argon2idの並列度
+        
+    Returns:
+        CryptContext: パスワードハッシュのコンテキスト
+    """
+    return CryptContext(
+        schemes=["bcrypt", "argon2"],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+pwd_context = build_password_context(
+    settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=settings.BCRYPT_ROUNDS,
+    argon2_time_cost=settings.ARGON2_TIME_COST,
+    argon2_memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2_parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# アクセストークン検証の結果ごとの件数
+# rs256/es256/eddsa: 非対称鍵で検証成功, legacy_hs256: 旧形式（HS256）で検証成功,
+# legacy_hs256_rejected: 旧形式の受け付けが無効なため拒否, malformed: ヘッダーを読めない,
+# unsupported_alg: 未対応のアルゴリズム, unknown_kid: kidに対応する鍵がない, invalid: 署名・有効期限などの検証に失敗
+token_verification_stats: Counter = Counter()
+
+# リフレッシュトークンのRedisキー
+# refresh_token:{token} -> ユーザーID
+# user_refresh_tokens:{user_id} -> ユーザーのトークンのインデックス（Sorted Set, スコア: 有効期限のUNIX時刻）
+REFRESH_TOKEN_PREFIX = "refresh_token:"
+USER_REFRESH_TOKENS_PREFIX = "user_refresh_tokens:"
+
+# 古いリフレッシュトークンの消費と新しいトークンの保存を1回の往復で原子的に行うLuaスクリプト
+# KEYS[1]: 古いトークンのキー, KEYS[2]: 新しいトークンのキー
+# ARGV[1]: 有効期限（秒）, ARGV[2]: 新しいトークンの有効期限（UNIX時刻）, ARGV[3]: 現在時刻（UNIX時刻）
+# ARGV[4]: インデックスのキーのプレフィックス, ARGV[5]: 古いトークン, ARGV[6]: 新しいトークン
+ROTATE_REFRESH_TOKEN_SCRIPT = """
+local user_id = redis.call('GETDEL', KEYS[1])
+if not user_id then
+    return false
+end
+redis.call('SET', KEYS[2], user_id, 'EX', ARGV[1])
+local index_key = ARGV[4] .. user_id
+redis.call('ZREM', index_key, ARGV[5])
+redis.call('ZADD', index_key, ARGV[2], ARGV[6])
+redis.call('ZREMRANGEBYSCORE', index_key, '-inf', ARGV[3])
+redis.call('EXPIRE', index_key, ARGV[1])
+return user_id
+"""
+
+# リフレッシュトークンを削除し、ユーザーのインデックスからも取り除くLuaスクリプト
+# KEYS[1]: トークンのキー, ARGV[1]: インデックスのキーのプレフィックス, ARGV[2]: トークン
+REVOKE_REFRESH_TOKEN_SCRIPT = """
+local user_id = redis.call('GETDEL', KEYS[1])
+if not user_id then
+    return 0
+end
+redis.call('ZREM', ARGV[1] .. user_id, ARGV[2])
+return 1
+"""
+
+# ユーザーのすべてのリフレッシュトークンを削除するLuaスクリプト
+# KEYS[1]: インデックスのキー, ARGV[1]: トークンのキーのプレフィックス
+REVOKE_USER_REFRESH_TOKENS_SCRIPT = """
+local tokens = redis.call('ZRANGE', KEYS[1], 0, -1)
+for _, token in ipairs(tokens) do
+    redis.call('DEL', ARGV[1] .. token)
+end
+redis.call('DEL', KEYS[1])
+return #tokens
+"""
+
+# bcryptの計算をイベントループの外で実行するためのワーカープール
+password_hash_pool = BoundedWorkerPool(
+    "password_hash",
+    kind=settings.PASSWORD_HASH_POOL_TYPE,
+    max_workers=settings.PASSWORD_HASH_POOL_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -14,6 +124,74 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_password_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    パスワードを検証し、ハッシュが現在の方式・コストと異なる場合は新しいハッシュも返す
+    
+    Returns:
+        Tuple[bool, Optional[str]]: (検証結果, 更新が必要な場合は新しいハッシュ)
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    パスワードのハッシュ化をワーカープールで実行する関数
+    
+    Raises:
+        WorkerPoolFullError: ワーカープールが上限に達している場合
+    """
+    return await password_hash_pool.run(get_password_hash, password)
+
+async def get_password_hashes_async(passwords: List[str]) -> List[str]:
+    """
+    複数のパスワードのハッシュ化をワーカープールで並列に実行する関数
+    
+    パスワードごとに1タスクとして実行し、同時に投入するタスクはワーカー数までに制限する。
+    件数に関わらず待ち行列を占有するのはワーカー数分のタスクのみで、
+    ログインなど他のリクエストのハッシュ化はパスワード1件分の待ち時間で割り込める。
+    
+    Args:
+        passwords: パスワードのリスト
+        
+    Returns:
+        List[str]: パスワードと同じ順序のハッシュのリスト
+    
+    Raises:
+        WorkerPoolFullError: ワーカープールが上限に達している場合
+    """
+    semaphore = asyncio.Semaphore(password_hash_pool.max_workers)
+    
+    async def hash_one(password: str) -> str:
+        async with semaphore:
+            return await password_hash_pool.run(get_password_hash, password)
+    
+    tasks = [asyncio.create_task(hash_one(password)) for password in passwords]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        # 失敗した場合はまだ投入していないタスクを取り消す
+        for task in tasks:
+            task.cancel()
+        raise
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    パスワードの検証をワーカープールで実行する関数
+    
+    Raises:
+        WorkerPoolFullError: ワーカープールが上限に達している場合
+    """
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def verify_password_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    パスワードの検証（と必要な場合の再ハッシュ）をワーカープールで実行する関数
+    
+    Raises:
+        WorkerPoolFullError: ワーカープールが上限に達している場合
+    """
+    return await password_hash_pool.run(verify_password_and_update, plain_password, hashed_password)
+
 async def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     非対称暗号を使用してアクセストークンを作成する関数
@@ -32,17 +210,46 @@ async def create_access_token(data: Dict[str, Any], expires_delta: Optional[time
     else:
         expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jtiは個別のトークンの無効化（ログアウトなど）に使用する
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     
-    # 秘密鍵を使用してトークンを署名
-    encoded_jwt = jwt.encode(
+    # キャッシュ済みの秘密鍵を使用してトークンを署名
+    # 検証側が鍵を選べるよう、ヘッダーに鍵のkidを含める
+    encoded_jwt = token_codec.encode(
         to_encode, 
-        settings.PRIVATE_KEY, 
-        algorithm=settings.ALGORITHM
+        key_manager.get_signing_key(), 
+        algorithm=settings.ALGORITHM,
+        kid=key_manager.signing_kid
     )
     
     return encoded_jwt
 
+async def create_user_access_token(db_user: Any) -> str:
+    """
+    ユーザーのアクセストークンを作成する関数
+    
+    認可に必要なユーザー情報と現在のトークンバージョンをクレームに含めるため、
+    トークンの検証時にデータベースを参照する必要がない。
+    トークンバージョンは他のプロセスでの変更を確実に反映するため、キャッシュを使わずにRedisから読む。
+    
+    Args:
+        db_user: トークンを発行するユーザー
+        
+    Returns:
+        str: 生成されたJWTトークン
+    """
+    user_id = str(db_user.id)
+    return await create_access_token(
+        data={
+            "sub": user_id,
+            "username": db_user.username,
+            "is_admin": db_user.is_admin,
+            "is_active": db_user.is_active,
+            "ver": await token_versions.current(user_id),
+        },
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
 async def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """
     JWTトークンを検証し、ペイロードを返す関数
@@ -54,10 +261,13 @@ async def verify_token(token: str) -> Optional[Dict[str, Any]]:
         Optional[Dict[str, Any]]: トークンが有効な場合はペイロード、無効な場合はNone
     """
     try:
-        # 公開鍵を使用してトークンを検証
-        payload = jwt.decode(
+        # ヘッダーのkidに対応するキャッシュ済みの公開鍵を使用してトークンを検証
+        key = key_manager.get_verification_key(kid=token_codec.get_unverified_header(token).get("kid"))
+        if key is None:
+            return None
+        payload = token_codec.decode(
             token, 
-            settings.PUBLIC_KEY, 
+            key, 
             algorithms=[settings.ALGORITHM]
         )
         return payload
@@ -68,28 +278,92 @@ async def verify_token_with_fallback(token: str) -> Optional[Dict[str, Any]]:
     """
     両方の方式をサポートする移行期間用のトークン検証関数
     
+    トークンのヘッダーを一度だけ読み、alg（とkid）に対応する検証鍵で1回だけ検証する。
+    旧形式（HS256）のトークンは LEGACY_HS256_ENABLED がTrueの場合のみ受け付ける。
+    
     Args:
         token: 検証するJWTトークン
         
     Returns:
         Optional[Dict[str, Any]]: トークンが有効な場合はペイロード、無効な場合はNone
     """
-    # まず新しい非対称鍵で検証を試みる
     try:
-        payload = jwt.decode(token, settings.PUBLIC_KEY, algorithms=["RS256"])
-        return payload
+        header = token_codec.get_unverified_header(token)
     except JWTError:
-        # 失敗したら古い対称鍵で検証を試みる
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            return payload
-        except JWTError:
+        token_verification_stats["malformed"] += 1
+        return None
+    
+    algorithm = header.get("alg")
+    if algorithm is not None and not isinstance(algorithm, str):
+        # 文字列以外のalgは辞書のキーとして使えないため、形式が不正なトークンとして扱う
+        token_verification_stats["malformed"] += 1
+        return None
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        # 新しい非対称鍵で検証
+        key = key_manager.get_verification_key(algorithm, kid=header.get("kid"))
+        if key is None:
+            token_verification_stats["unknown_kid"] += 1
+            return None
+        result = algorithm.lower()
+    elif algorithm == "HS256":
+        # 古い対称鍵で検証
+        if not settings.LEGACY_HS256_ENABLED:
+            token_verification_stats["legacy_hs256_rejected"] += 1
             return None
+        key = settings.SECRET_KEY
+        result = "legacy_hs256"
+    else:
+        token_verification_stats["unsupported_alg"] += 1
+        return None
+    
+    try:
+        payload = token_codec.decode(token, key, algorithms=[algorithm])
+    except JWTError:
+        token_verification_stats["invalid"] += 1
+        return None
+    
+    token_verification_stats[result] += 1
+    return payload
+
+async def revoke_access_token(token: str) -> bool:
+    """
+    アクセストークンを有効期限まで無効化する関数
+    
+    トークンのjtiを無効化済みの一覧に追加する。同じユーザーの他のトークンには影響しない。
+    
+    Args:
+        token: 無効化するアクセストークン
+        
+    Returns:
+        bool: 無効化した場合はTrue、トークンが無効またはjtiを含まない場合はFalse
+    """
+    payload = await verify_token_with_fallback(token)
+    if payload is None or not payload.get("jti") or "exp" not in payload:
+        return False
+    return await revocation_list.revoke(payload["jti"], payload["exp"])
+
+def _refresh_token_expiry() -> int:
+    """リフレッシュトークンの有効期限（秒）"""
+    return settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60  # 日数を秒に変換
+
+def get_refresh_session_id(token: str) -> str:
+    """
+    リフレッシュトークンから外部に公開してよいセッションIDを生成する関数
+    
+    Args:
+        token: リフレッシュトークン
+        
+    Returns:
+        str: トークンのSHA-256ダイジェストの先頭16文字
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
 
 async def create_refresh_token(user_id: str) -> str:
     """
     リフレッシュトークンを作成し、Redisに保存する関数
     
+    トークン本体に加えて、ユーザーごとのトークンのインデックスも更新する。
+    
     Args:
         user_id: ユーザーID
         
@@ -99,16 +373,21 @@ async def create_refresh_token(user_id: str) -> str:
     # ランダムなトークンを生成
     token = secrets.token_urlsafe(32)
     
-    # Redisクライアントを初期化
-    r = redis.from_url(settings.REDIS_URL)
+    # 共有の接続プールからRedisクライアントを取得
+    r = redis_manager.client
     
     # トークンをRedisに保存（キー: トークン, 値: ユーザーID）
-    # 有効期限を設定
-    expiry = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60  # 日数を秒に変換
-    await r.setex(f"refresh_token:{token}", expiry, user_id)
-    
-    # 接続を閉じる
-    await r.aclose()
+    # 有効期限を設定し、ユーザーのインデックスにも追加する
+    expiry = _refresh_token_expiry()
+    now = int(time.time())
+    index_key = f"{USER_REFRESH_TOKENS_PREFIX}{user_id}"
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.setex(f"{REFRESH_TOKEN_PREFIX}{token}", expiry, user_id)
+        pipe.zadd(index_key, {token: now + expiry})
+        # 期限切れのトークンをインデックスから取り除く
+        pipe.zremrangebyscore(index_key, "-inf", now)
+        pipe.expire(index_key, expiry)
+        await pipe.execute()
     
     return token
 
@@ -122,14 +401,11 @@ async def verify_refresh_token(token: str) -> Optional[str]:
     Returns:
         Optional[str]: トークンが有効な場合はユーザーID、無効な場合はNone
     """
-    # Redisクライアントを初期化
-    r = redis.from_url(settings.REDIS_URL)
+    # 共有の接続プールからRedisクライアントを取得
+    r = redis_manager.client
     
     # トークンをRedisから取得
-    user_id = await r.get(f"refresh_token:{token}")
-    
-    # 接続を閉じる
-    await r.aclose()
+    user_id = await r.get(f"{REFRESH_TOKEN_PREFIX}{token}")
     
     if user_id:
         return user_id.decode("utf-8")
@@ -146,13 +422,89 @@ async def revoke_refresh_token(token: str) -> bool:
     Returns:
         bool: 無効化に成功した場合はTrue、失敗した場合はFalse
     """
-    # Redisクライアントを初期化
-    r = redis.from_url(settings.REDIS_URL)
-    
-    # トークンをRedisから削除
-    result = await r.delete(f"refresh_token:{token}")
+    # 共有の接続プールからRedisクライアントを取得
+    r = redis_manager.client
     
-    # 接続を閉じる
-    await r.aclose()
+    # トークンをRedisから削除し、ユーザーのインデックスからも取り除く
+    revoke = r.register_script(REVOKE_REFRESH_TOKEN_SCRIPT)
+    result = await revoke(
+        keys=[f"{REFRESH_TOKEN_PREFIX}{token}"],
+        args=[USER_REFRESH_TOKENS_PREFIX, token],
+    )
     
     return result > 0
+
+async def rotate_refresh_token(token: str) -> Optional[Tuple[str, str]]:
+    """
+    リフレッシュトークンを原子的にローテーションする関数
+    
+    古いトークンの消費（GETDEL）と新しいトークンの保存をLuaスクリプトで1回の往復で行う。
+    同じトークンで同時にリクエストされた場合、成功するのは1つだけとなる。
+    
+    Args:
+        token: 消費するリフレッシュトークン
+        
+    Returns:
+        Optional[Tuple[str, str]]: 成功した場合は(ユーザーID, 新しいリフレッシュトークン)、
+                                   トークンが無効または使用済みの場合はNone
+    """
+    new_token = secrets.token_urlsafe(32)
+    expiry = _refresh_token_expiry()
+    now = int(time.time())
+    
+    r = redis_manager.client
+    rotate = r.register_script(ROTATE_REFRESH_TOKEN_SCRIPT)
+    user_id = await rotate(
+        keys=[f"{REFRESH_TOKEN_PREFIX}{token}", f"{REFRESH_TOKEN_PREFIX}{new_token}"],
+        args=[expiry, now + expiry, now, USER_REFRESH_TOKENS_PREFIX, token, new_token],
+    )
+    
+    if not user_id:
+        return None
+    
+    return user_id.decode("utf-8"), new_token
+
+async def list_refresh_sessions(user_id: str) -> List[Dict[str, Any]]:
+    """
+    ユーザーの有効なリフレッシュトークン（セッション）の一覧を取得する関数
+    
+    Args:
+        user_id: ユーザーID
+        
+    Returns:
+        List[Dict[str, Any]]: セッションIDと有効期限のリスト（有効期限の昇順）
+    """
+    r = redis_manager.client
+    
+    entries = await r.zrangebyscore(
+        f"{USER_REFRESH_TOKENS_PREFIX}{user_id}", int(time.time()), "+inf", withscores=True
+    )
+    
+    return [
+        {
+            "session_id": get_refresh_session_id(token.decode("utf-8")),
+            "expires_at": datetime.fromtimestamp(score, UTC),
+        }
+        for token, score in entries
+    ]
+
+async def revoke_all_refresh_tokens(user_id: str) -> int:
+    """
+    ユーザーのすべてのリフレッシュトークンを無効化する関数
+    
+    ユーザーのインデックスを使用するため、キー空間のSCANは行わない。
+    トークンの削除はLuaスクリプトで1回の往復で行う。
+    
+    Args:
+        user_id: ユーザーID
+        
+    Returns:
+        int: 無効化したトークンの数
+    """
+    r = redis_manager.client
+    
+    revoke_all = r.register_script(REVOKE_USER_REFRESH_TOKENS_SCRIPT)
+    return await revoke_all(
+        keys=[f"{USER_REFRESH_TOKENS_PREFIX}{user_id}"],
+        args=[REFRESH_TOKEN_PREFIX],
+    )
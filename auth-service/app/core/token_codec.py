@@ -0,0 +1,345 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+import weakref
+from calendar import timegm
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jose import jwt as jose_jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError, JWTError
+
+from app.core.config import settings
+# EdDSAをjoseに登録する
+from app.core import eddsa  # noqa: F401
+
+# 解析済みのヘッダーを保持する最大数（ヘッダーは鍵ごとにほぼ固定のため少数で足りる）
+_HEADER_CACHE_MAX_SIZE = 64
+
+# アルゴリズムごとのハッシュ関数
+_HASHES = {"256": hashes.SHA256, "384": hashes.SHA384, "512": hashes.SHA512}
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+# 有効期限などの日時として扱うクレーム（datetimeはUNIX時刻に変換する）
+_TIME_CLAIMS = ("exp", "iat", "nbf")
+
+# joseのKeyオブジェクトから取り出したcryptographyの鍵
+_native_keys: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except (binascii.Error, ValueError) as e:
+        raise JWTError("Invalid segment encoding") from e
+
+
+def native_key(key: Any) -> Any:
+    """
+    鍵をcryptographyの鍵オブジェクト（HMACの場合はbytes）に変換する
+
+    joseのKeyオブジェクトは内部のcryptographyの鍵を取り出し、変換結果をKeyオブジェクトごとに再利用する。
+
+    Args:
+        key: joseのKeyオブジェクト、cryptographyの鍵オブジェクト、またはHMACの秘密鍵（str / bytes）
+
+    Returns:
+        Any: cryptographyの鍵オブジェクト、またはHMACの秘密鍵（bytes）
+    """
+    if isinstance(key, str):
+        return key.encode("utf-8")
+    if isinstance(key, (bytes, rsa.RSAPrivateKey, rsa.RSAPublicKey, ec.EllipticCurvePrivateKey,
+                        ec.EllipticCurvePublicKey, ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return key
+    try:
+        return _native_keys[key]
+    except (KeyError, TypeError):
+        pass
+    # joseのcryptographyバックエンドの鍵は prepared_key、EdDSAKeyは _key に保持している
+    raw = getattr(key, "prepared_key", None) or getattr(key, "_key", None)
+    if raw is None:
+        pem = key.to_pem()
+        raw = load_pem_private_key(pem, password=None) if b"PRIVATE KEY" in pem else load_pem_public_key(pem)
+    try:
+        _native_keys[key] = raw
+    except TypeError:
+        pass
+    return raw
+
+
+def _to_timestamps(claims: Dict[str, Any]) -> Dict[str, Any]:
+    if not any(isinstance(claims.get(name), datetime) for name in _TIME_CLAIMS):
+        return claims
+    claims = dict(claims)
+    for name in _TIME_CLAIMS:
+        if isinstance(claims.get(name), datetime):
+            claims[name] = timegm(claims[name].utctimetuple())
+    return claims
+
+
+class TokenCodec:
+    """
+    JWTの署名・検証を行うコーデックの基底クラス
+
+    どのバックエンドも失敗時は joseの JWTError（有効期限切れは ExpiredSignatureError）を送出するため、
+    呼び出し側はバックエンドを意識せずに使用できる。
+    """
+
+    name = ""
+
+    def __init__(self):
+        self._headers: Dict[str, Dict[str, Any]] = {}
+
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, kid: Optional[str] = None) -> str:
+        """
+        クレームに署名してトークンを作成する
+
+        Args:
+            claims: トークンに含めるクレーム（exp などはdatetimeでもよい）
+            key: 署名鍵（joseのKeyオブジェクト、cryptographyの鍵オブジェクト、HMACの秘密鍵）
+            algorithm: 署名アルゴリズム
+            kid: ヘッダーに含める鍵のID
+
+        Returns:
+            str: JWT
+        """
+        raise NotImplementedError
+
+    def decode(self, token: str, key: Any, algorithms: List[str]) -> Dict[str, Any]:
+        """
+        トークンの署名と有効期限を検証し、クレームを返す
+
+        Args:
+            token: JWT
+            key: 検証鍵
+            algorithms: 受け付けるアルゴリズム
+
+        Returns:
+            Dict[str, Any]: クレーム
+
+        Raises:
+            JWTError: 署名・形式・有効期限などの検証に失敗した場合
+        """
+        raise NotImplementedError
+
+    def get_unverified_header(self, token: str) -> Dict[str, Any]:
+        """
+        署名を検証せずにヘッダーを取得する（同じヘッダーの解析結果は再利用する）
+
+        Raises:
+            JWTError: ヘッダーを読めない場合
+        """
+        segment = token.split(".", 1)[0]
+        header = self._headers.get(segment)
+        if header is None:
+            try:
+                header = json.loads(_b64decode(segment))
+            except ValueError as e:
+                raise JWTError("Invalid header string") from e
+            if not isinstance(header, dict):
+                raise JWTError("Invalid header string")
+            if len(self._headers) >= _HEADER_CACHE_MAX_SIZE:
+                self._headers.clear()
+            self._headers[segment] = header
+        return dict(header)
+
+    def get_unverified_claims(self, token: str) -> Dict[str, Any]:
+        """
+        署名を検証せずにクレームを取得する
+
+        Raises:
+            JWTError: クレームを読めない場合
+        """
+        parts = token.split(".")
+        if len(parts) != 3:
+            raise JWTError("Not enough segments")
+        try:
+            claims = json.loads(_b64decode(parts[1]))
+        except ValueError as e:
+            raise JWTError("Invalid payload string") from e
+        if not isinstance(claims, dict):
+            raise JWTError("Invalid payload string")
+        return claims
+
+
+class JoseCodec(TokenCodec):
+    """python-joseによる実装"""
+
+    name = "jose"
+
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, kid: Optional[str] = None) -> str:
+        return jose_jwt.encode(claims, key, algorithm=algorithm, headers={"kid": kid} if kid else None)
+
+    def decode(self, token: str, key: Any, algorithms: List[str]) -> Dict[str, Any]:
+        return jose_jwt.decode(token, key, algorithms=algorithms)
+
+
+class PyJWTCodec(TokenCodec):
+    """PyJWTによる実装（PyJWTがインストールされている場合のみ使用できる）"""
+
+    name = "pyjwt"
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import jwt as pyjwt
+        except ImportError as e:
+            raise RuntimeError("JWT_BACKEND=pyjwt にはPyJWTが必要です（pip install PyJWT）") from e
+        self._jwt = pyjwt
+
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, kid: Optional[str] = None) -> str:
+        return self._jwt.encode(claims, native_key(key), algorithm=algorithm, headers={"kid": kid} if kid else None)
+
+    def decode(self, token: str, key: Any, algorithms: List[str]) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(token, native_key(key), algorithms=algorithms)
+        except self._jwt.ExpiredSignatureError as e:
+            raise ExpiredSignatureError(str(e)) from e
+        except self._jwt.PyJWTError as e:
+            raise JWTError(str(e)) from e
+
+
+class CryptographyCodec(TokenCodec):
+    """
+    cryptographyを直接使用する実装
+
+    アルゴリズムとkidごとにエンコード済みのヘッダーを保持し、署名・検証以外の処理を最小限にする。
+    """
+
+    name = "cryptography"
+
+    def __init__(self):
+        super().__init__()
+        self._encoded_headers: Dict[Tuple[str, Optional[str]], str] = {}
+
+    def _encoded_header(self, algorithm: str, kid: Optional[str]) -> str:
+        segment = self._encoded_headers.get((algorithm, kid))
+        if segment is None:
+            header = {"alg": algorithm, "typ": "JWT"}
+            if kid:
+                header["kid"] = kid
+            segment = _b64encode(json.dumps(header, separators=(",", ":")).encode("utf-8"))
+            if len(self._encoded_headers) >= _HEADER_CACHE_MAX_SIZE:
+                self._encoded_headers.clear()
+            self._encoded_headers[(algorithm, kid)] = segment
+        return segment
+
+    @staticmethod
+    def _sign(message: bytes, key: Any, algorithm: str) -> bytes:
+        if algorithm in _HMAC_DIGESTS:
+            return hmac.new(key, message, _HMAC_DIGESTS[algorithm]).digest()
+        if algorithm == "EdDSA":
+            return key.sign(message)
+        hash_algorithm = _HASHES[algorithm[2:]]()
+        if algorithm.startswith("RS"):
+            return key.sign(message, padding.PKCS1v15(), hash_algorithm)
+        if algorithm.startswith("ES"):
+            # DER形式の署名をJWSの r || s 形式に変換する
+            r, s = decode_dss_signature(key.sign(message, ec.ECDSA(hash_algorithm)))
+            size = (key.curve.key_size + 7) // 8
+            return r.to_bytes(size, "big") + s.to_bytes(size, "big")
+        raise JWTError(f"Unsupported algorithm: {algorithm}")
+
+    @staticmethod
+    def _verify(message: bytes, signature: bytes, key: Any, algorithm: str) -> bool:
+        if algorithm in _HMAC_DIGESTS:
+            if not isinstance(key, bytes):
+                return False
+            return hmac.compare_digest(hmac.new(key, message, _HMAC_DIGESTS[algorithm]).digest(), signature)
+        if isinstance(key, (rsa.RSAPrivateKey, ec.EllipticCurvePrivateKey, ed25519.Ed25519PrivateKey)):
+            key = key.public_key()
+        try:
+            if algorithm == "EdDSA" and isinstance(key, ed25519.Ed25519PublicKey):
+                key.verify(signature, message)
+                return True
+            hash_algorithm = _HASHES.get(algorithm[2:])
+            if hash_algorithm is None:
+                return False
+            if algorithm.startswith("RS") and isinstance(key, rsa.RSAPublicKey):
+                key.verify(signature, message, padding.PKCS1v15(), hash_algorithm())
+                return True
+            if algorithm.startswith("ES") and isinstance(key, ec.EllipticCurvePublicKey):
+                size = (key.curve.key_size + 7) // 8
+                if len(signature) != 2 * size:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:size], "big"), int.from_bytes(signature[size:], "big")
+                )
+                key.verify(der, message, ec.ECDSA(hash_algorithm()))
+                return True
+        except InvalidSignature:
+            return False
+        return False
+
+    def encode(self, claims: Dict[str, Any], key: Any, algorithm: str, kid: Optional[str] = None) -> str:
+        payload = json.dumps(_to_timestamps(claims), separators=(",", ":")).encode("utf-8")
+        signing_input = f"{self._encoded_header(algorithm, kid)}.{_b64encode(payload)}"
+        signature = self._sign(signing_input.encode("ascii"), native_key(key), algorithm)
+        return f"{signing_input}.{_b64encode(signature)}"
+
+    def decode(self, token: str, key: Any, algorithms: List[str]) -> Dict[str, Any]:
+        parts = token.split(".")
+        if len(parts) != 3:
+            raise JWTError("Not enough segments")
+        try:
+            signing_input = token.rsplit(".", 1)[0].encode("ascii")
+        except UnicodeEncodeError as e:
+            raise JWTError("Invalid token encoding") from e
+        header = self.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm not in algorithms:
+            raise JWTError("The specified alg value is not allowed")
+
+        if not self._verify(signing_input, _b64decode(parts[2]), native_key(key), algorithm):
+            raise JWTError("Signature verification failed.")
+
+        claims = self.get_unverified_claims(token)
+        # python-joseと同じく秒単位で比較する
+        now = int(time.time())
+        for name in _TIME_CLAIMS:
+            if name in claims and not isinstance(claims[name], (int, float)):
+                raise JWTClaimsError(f"{name} claim must be a number.")
+        if "exp" in claims and claims["exp"] < now:
+            raise ExpiredSignatureError("Signature has expired.")
+        if "nbf" in claims and claims["nbf"] > now:
+            raise JWTClaimsError("The token is not yet valid (nbf)")
+        return claims
+
+
+_CODECS = {"jose": JoseCodec, "pyjwt": PyJWTCodec, "cryptography": CryptographyCodec}
+
+
+def get_codec(backend: str) -> TokenCodec:
+    """
+    バックエンド名に対応するコーデックを作成する
+
+    Args:
+        backend: jose, pyjwt, cryptography のいずれか
+
+    Returns:
+        TokenCodec: コーデック
+
+    Raises:
+        ValueError: 未知のバックエンドの場合
+        RuntimeError: バックエンドに必要なライブラリがない場合
+    """
+    codec_class = _CODECS.get(backend)
+    if codec_class is None:
+        raise ValueError(f"未知のJWTバックエンドです: {backend}")
+    return codec_class()
+
+
+# アプリケーション全体で共有するコーデック
+token_codec = get_codec(settings.JWT_BACKEND)
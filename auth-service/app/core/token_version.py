@@ -0,0 +1,131 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+from app.core.redis_client import redis_manager
+
+# ユーザーごとのトークンバージョンのRedisキー
+# token_version:{user_id} -> バージョン（キーがない場合は0）
+TOKEN_VERSION_PREFIX = "token_version:"
+
+
+class TokenVersionCache:
+    """
+    ユーザーごとのトークンバージョンを管理するクラス
+
+    アクセストークンには発行時のバージョンを ver クレームとして含め、
+    パスワード変更・権限や状態の変更・削除の際にバージョンを上げることで既存のトークンを無効化する。
+    バージョンはRedisに保存し、プロセス内で TOKEN_VERSION_CACHE_TTL 秒キャッシュする。
+    他のプロセスでの変更は、トークンの検証では最大でTTLの秒数だけ遅れて反映される。
+    トークンの発行時はキャッシュを使わずにRedisから読むため、直前に他のプロセスで上げたバージョンでも
+    古いバージョンのトークンを発行することはない。
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+        # 統計情報
+        self._hits = 0
+        self._misses = 0
+        self._bumps = 0
+        self._errors = 0
+
+    def _store(self, user_id: str, version: int) -> None:
+        self._entries[user_id] = (version, time.monotonic())
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, user_id: str) -> int:
+        """
+        トークンの検証に使用するユーザーのトークンバージョンを取得する
+
+        Redisの障害時は、期限切れのキャッシュがあればその値を、なければ0を返す
+        （無効化の確認と同じく、認証を止めずに無効化の反映を遅らせる）。
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            int: 現在のバージョン
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self._hits += 1
+            return entry[0]
+
+        self._misses += 1
+        try:
+            return await self.current(user_id)
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"トークンバージョンの取得に失敗しました: {e}")
+            return entry[0] if entry is not None else 0
+
+    async def current(self, user_id: str) -> int:
+        """
+        キャッシュを使わずにRedisからユーザーの現在のトークンバージョンを取得する
+
+        トークンの発行時に使用する。取得した値でプロセス内のキャッシュも更新する。
+
+        Args:
+            user_id: ユーザーID
+
+        Returns:
+            int: 現在のバージョン
+
+        Raises:
+            Exception: Redisの操作に失敗した場合
+        """
+        value = await redis_manager.client.get(f"{TOKEN_VERSION_PREFIX}{user_id}")
+        version = int(value) if value is not None else 0
+        self._store(user_id, version)
+        return version
+
+    async def bump(self, user_id: str, expire: Optional[int] = None) -> int:
+        """
+        ユーザーのトークンバージョンを上げ、発行済みのアクセストークンを無効化する
+
+        Args:
+            user_id: ユーザーID
+            expire: キーの有効期限（秒）。削除したユーザーのように以後トークンを発行しない場合に指定する
+
+        Returns:
+            int: 新しいバージョン
+        """
+        key = f"{TOKEN_VERSION_PREFIX}{user_id}"
+        async with redis_manager.client.pipeline(transaction=True) as pipe:
+            pipe.incr(key)
+            if expire is not None:
+                pipe.expire(key, expire)
+            version, *_ = await pipe.execute()
+        self._bumps += 1
+        self._store(user_id, version)
+        return version
+
+    def clear(self) -> None:
+        """プロセス内のキャッシュを破棄する"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """エントリ数、ヒット数、ミス数などの統計情報を返す"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "bumps": self._bumps,
+            "errors": self._errors,
+        }
+
+
+# アプリケーション全体で共有するトークンバージョンのキャッシュ
+token_versions = TokenVersionCache(
+    ttl=settings.TOKEN_VERSION_CACHE_TTL,
+    max_size=settings.TOKEN_VERSION_CACHE_MAX_SIZE,
+)
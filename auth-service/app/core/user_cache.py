@@ -0,0 +1,251 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+from app.core.redis_client import redis_manager
+
+# ユーザーキャッシュのRedisキー
+# user_cache:id:{user_id} -> パスワードハッシュを除いたユーザー情報（JSON）
+# user_cache:username:{username} -> ユーザーID
+USER_CACHE_ID_PREFIX = "user_cache:id:"
+USER_CACHE_USERNAME_PREFIX = "user_cache:username:"
+# 無効化を他のプロセスに通知するチャンネル
+USER_CACHE_CHANNEL = "user_cache:invalidate"
+
+# Redisに保存しない項目
+_PRIVATE_FIELDS = ("hashed_password",)
+
+
+class UserCache:
+    """
+    ユーザー情報の2段階キャッシュ
+
+    L1: プロセス内のTTL付きLRU（パスワードハッシュを含む）
+    L2: 全プロセスで共有するRedis（パスワードハッシュを含まない）
+
+    書き込み時は invalidate() でL1・L2の両方から削除し、Redisのpub/subで他のプロセスのL1からも削除する。
+    Redisの障害時はキャッシュを使用せずデータベースから取得する。
+    """
+
+    def __init__(self, local_ttl: float, local_max_size: int, redis_ttl: int):
+        self.local_ttl = local_ttl
+        self.local_max_size = local_max_size
+        self.redis_ttl = redis_ttl
+        self._by_id: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._id_by_username: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # 統計情報
+        self._local_hits = 0
+        self._redis_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    # --- L1（プロセス内） ---
+
+    def _local_get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._by_id.get(user_id)
+        if entry is None:
+            return None
+        row, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._local_evict(user_id)
+            return None
+        self._by_id.move_to_end(user_id)
+        return row
+
+    def _local_set(self, row: Dict[str, Any]) -> None:
+        user_id = row["id"]
+        old = self._by_id.get(user_id)
+        if old is not None and old[0]["username"] != row["username"]:
+            self._id_by_username.pop(old[0]["username"], None)
+        self._by_id[user_id] = (row, time.monotonic() + self.local_ttl)
+        self._by_id.move_to_end(user_id)
+        self._id_by_username[row["username"]] = user_id
+        while len(self._by_id) > self.local_max_size:
+            evicted_id, (evicted, _) = self._by_id.popitem(last=False)
+            if self._id_by_username.get(evicted["username"]) == evicted_id:
+                del self._id_by_username[evicted["username"]]
+
+    def _local_evict(self, user_id: Optional[str] = None, usernames: Iterable[str] = ()) -> None:
+        if user_id is not None:
+            entry = self._by_id.pop(user_id, None)
+            if entry is not None:
+                self._id_by_username.pop(entry[0]["username"], None)
+        for username in usernames:
+            evicted_id = self._id_by_username.pop(username, None)
+            if evicted_id is not None:
+                self._by_id.pop(evicted_id, None)
+
+    # --- 読み込み ---
+
+    async def get_by_id(self, user_id: str, with_password: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        IDでユーザー情報を取得する
+
+        Args:
+            user_id: ユーザーID
+            with_password: パスワードハッシュが必要か（必要な場合はL1のみを使用する）
+
+        Returns:
+            Optional[Dict[str, Any]]: キャッシュにある場合はユーザー情報、ない場合はNone
+        """
+        row = self._local_get(user_id)
+        if row is not None:
+            self._local_hits += 1
+            return row
+        if not with_password:
+            row = await self._redis_get(f"{USER_CACHE_ID_PREFIX}{user_id}")
+            if row is not None:
+                self._redis_hits += 1
+                return row
+        self._misses += 1
+        return None
+
+    async def get_by_username(self, username: str, with_password: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        ユーザー名でユーザー情報を取得する
+
+        Args:
+            username: ユーザー名
+            with_password: パスワードハッシュが必要か（必要な場合はL1のみを使用する）
+
+        Returns:
+            Optional[Dict[str, Any]]: キャッシュにある場合はユーザー情報、ない場合はNone
+        """
+        user_id = self._id_by_username.get(username)
+        if user_id is not None:
+            row = self._local_get(user_id)
+            if row is not None:
+                self._local_hits += 1
+                return row
+        if not with_password:
+            try:
+                cached_id = await redis_manager.client.get(f"{USER_CACHE_USERNAME_PREFIX}{username}")
+            except Exception as e:
+                logger.warning(f"ユーザーキャッシュの読み込みに失敗しました: {e}")
+                cached_id = None
+            if cached_id is not None:
+                row = await self._redis_get(f"{USER_CACHE_ID_PREFIX}{cached_id.decode('utf-8')}")
+                # 名前の変更直後などでIDとユーザー名が一致しない場合は使用しない
+                if row is not None and row["username"] == username:
+                    self._redis_hits += 1
+                    return row
+        self._misses += 1
+        return None
+
+    async def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = await redis_manager.client.get(key)
+        except Exception as e:
+            logger.warning(f"ユーザーキャッシュの読み込みに失敗しました: {e}")
+            return None
+        return json.loads(value) if value is not None else None
+
+    # --- 書き込み ---
+
+    async def set(self, row: Dict[str, Any]) -> None:
+        """
+        データベースから読み込んだユーザー情報をキャッシュに保存する
+
+        Args:
+            row: ユーザー情報（JSONに変換可能な値のみ）
+        """
+        self._local_set(row)
+        shared = {k: v for k, v in row.items() if k not in _PRIVATE_FIELDS}
+        try:
+            async with redis_manager.client.pipeline(transaction=False) as pipe:
+                pipe.setex(f"{USER_CACHE_ID_PREFIX}{row['id']}", self.redis_ttl, json.dumps(shared))
+                pipe.setex(f"{USER_CACHE_USERNAME_PREFIX}{row['username']}", self.redis_ttl, row["id"])
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"ユーザーキャッシュの保存に失敗しました: {e}")
+
+    async def invalidate(self, user_id: str, usernames: Iterable[str] = ()) -> None:
+        """
+        ユーザー情報をすべてのプロセスのキャッシュから削除する
+
+        Args:
+            user_id: ユーザーID
+            usernames: 削除するユーザー名（変更前後のユーザー名）
+        """
+        usernames = list(usernames)
+        self._invalidations += 1
+        self._local_evict(user_id, usernames)
+        try:
+            keys = [f"{USER_CACHE_ID_PREFIX}{user_id}"]
+            keys += [f"{USER_CACHE_USERNAME_PREFIX}{username}" for username in usernames]
+            async with redis_manager.client.pipeline(transaction=False) as pipe:
+                pipe.delete(*keys)
+                pipe.publish(USER_CACHE_CHANNEL, json.dumps({"id": user_id, "usernames": usernames}))
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"ユーザーキャッシュの無効化に失敗しました: {user_id}: {e}")
+
+    def clear(self) -> None:
+        """プロセス内のキャッシュを破棄する"""
+        self._by_id.clear()
+        self._id_by_username.clear()
+
+    # --- 他のプロセスからの無効化の受信 ---
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_manager.client.pubsub()
+            try:
+                await pubsub.subscribe(USER_CACHE_CHANNEL)
+                # 購読が途切れている間の通知は受け取れないため、プロセス内のキャッシュを破棄する
+                self.clear()
+                while True:
+                    # ソケットのタイムアウトより短い間隔で待つ
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message["type"] != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    self._local_evict(data.get("id"), data.get("usernames", ()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"ユーザーキャッシュの無効化の受信に失敗しました: {e}")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """他のプロセスからの無効化の受信を開始する"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """他のプロセスからの無効化の受信を停止する"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """エントリ数、ヒット数、ミス数などの統計情報を返す"""
+        return {
+            "local_size": len(self._by_id),
+            "local_max_size": self.local_max_size,
+            "local_hits": self._local_hits,
+            "redis_hits": self._redis_hits,
+            "misses": self._misses,
+            "invalidations": self._invalidations,
+            "listening": self._task is not None and not self._task.done(),
+        }
+
+
+# アプリケーション全体で共有するユーザーキャッシュ
+user_cache = UserCache(
+    local_ttl=settings.USER_CACHE_LOCAL_TTL,
+    local_max_size=settings.USER_CACHE_LOCAL_MAX_SIZE,
+    redis_ttl=settings.USER_CACHE_REDIS_TTL,
+)
@@ -0,0 +1,311 @@
+import asyncio
+import hashlib
+import json
+import math
+import time
+import uuid
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+from app.core.redis_client import redis_manager
+
+# ユーザー名の追加・削除を他のプロセスに通知するチャンネル
+USERNAME_FILTER_CHANNEL = "username_filter:update"
+
+# カウンターの上限（上限に達したカウンターは減らさない）
+_COUNTER_MAX = 255
+
+# 構築のたびにフィルタに追加し直す、直近に追加されたユーザー名の保持期間（秒）
+# add() はコミット前に呼び出されるため、構築がコミット前のデータベースを読んだ場合に備える
+_RECENT_ADD_WINDOW = 60.0
+
+
+class CountingBloomFilter:
+    """
+    削除に対応したBloomフィルタ（各位置を1バイトのカウンターとする）
+
+    might_contain が False の要素は確実に含まれない。True の場合は含まれる可能性がある。
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._counters = bytearray(self.size)
+        self._nonzero = 0
+        self.count = 0
+
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            value = self._counters[position]
+            if value == 0:
+                self._nonzero += 1
+            if value < _COUNTER_MAX:
+                self._counters[position] = value + 1
+        self.count += 1
+
+    def remove(self, item: str) -> bool:
+        """
+        要素を削除する
+
+        追加されていない要素を削除すると他の要素が含まれないと判定されるため、
+        含まれる可能性がない場合は何もしない。
+        """
+        positions = self._positions(item)
+        if any(self._counters[position] == 0 for position in positions):
+            return False
+        for position in positions:
+            value = self._counters[position]
+            if value < _COUNTER_MAX:
+                self._counters[position] = value - 1
+                if value == 1:
+                    self._nonzero -= 1
+        self.count = max(0, self.count - 1)
+        return True
+
+    def might_contain(self, item: str) -> bool:
+        return all(self._counters[position] for position in self._positions(item))
+
+    @property
+    def estimated_false_positive_rate(self) -> float:
+        """使用中のカウンターの割合から推定した偽陽性率"""
+        return (self._nonzero / self.size) ** self.hashes
+
+
+class UsernameFilter:
+    """
+    登録済みのユーザー名のBloomフィルタ
+
+    起動時にデータベースの全ユーザー名から構築し、作成・名前の変更・削除の際に更新する。
+    確実に存在しないユーザー名はデータベースに問い合わせずに「存在しない」と判定できる。
+
+    他のプロセスでの追加・削除はRedisのpub/subで受け取る。
+    購読が途切れた場合は通知を取りこぼした可能性があるため、再購読の際に再構築する。
+    構築が完了するまでは常に「存在する可能性がある」と判定する。
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float, rebuild_interval: float):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.rebuild_interval = rebuild_interval
+        self._filter: Optional[CountingBloomFilter] = None
+        self._loader: Optional[Callable[[], AsyncIterator[str]]] = None
+        # 構築中に追加されたユーザー名（構築後のフィルタにも追加する）
+        self._added_while_building: Optional[List[str]] = None
+        # 直近に追加されたユーザー名と追加した時刻（構築後のフィルタにも追加する）
+        self._recent_adds: Deque[Tuple[float, str]] = deque()
+        self._build_lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+        self._rebuild_task: Optional[asyncio.Task] = None
+        # 自分が送信した通知を区別するためのID
+        self._origin = uuid.uuid4().hex
+
+        # 統計情報
+        self._definite_misses = 0
+        self._maybe = 0
+        self._false_positives = 0
+        self._rebuilds = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def might_exist(self, username: str) -> bool:
+        """
+        ユーザー名が登録されている可能性があるかを判定する
+
+        Args:
+            username: ユーザー名
+
+        Returns:
+            bool: 確実に登録されていない場合はFalse
+        """
+        if self._filter is None:
+            return True
+        if self._filter.might_contain(username):
+            self._maybe += 1
+            return True
+        self._definite_misses += 1
+        return False
+
+    def record_false_positive(self) -> None:
+        """might_exist が True を返したユーザー名が存在しなかったことを記録する"""
+        if self._filter is not None:
+            self._false_positives += 1
+
+    def _recent(self) -> List[str]:
+        """保持期間内に追加されたユーザー名を返す（期間を過ぎたものは破棄する）"""
+        expired = time.monotonic() - _RECENT_ADD_WINDOW
+        while self._recent_adds and self._recent_adds[0][0] < expired:
+            self._recent_adds.popleft()
+        return [username for _, username in self._recent_adds]
+
+    def _apply(self, op: str, usernames: Iterable[str]) -> None:
+        for username in usernames:
+            if op == "add":
+                if self._filter is not None:
+                    self._filter.add(username)
+                if self._added_while_building is not None:
+                    self._added_while_building.append(username)
+                self._recent_adds.append((time.monotonic(), username))
+            elif self._filter is not None:
+                # 削除は構築中のフィルタには反映しない（残っても偽陽性になるだけ）
+                self._filter.remove(username)
+
+    async def _publish(self, op: str, usernames: List[str]) -> None:
+        try:
+            message = json.dumps({"op": op, "usernames": usernames, "origin": self._origin})
+            await redis_manager.client.publish(USERNAME_FILTER_CHANNEL, message)
+        except Exception as e:
+            logger.error(f"ユーザー名フィルタの更新の通知に失敗しました: {e}")
+
+    async def add(self, usernames: Iterable[str]) -> None:
+        """
+        ユーザー名を追加し、他のプロセスに通知する
+
+        コミット前に呼び出してよい（ロールバックされた場合は偽陽性になるだけ）。
+        """
+        usernames = list(usernames)
+        if not settings.USERNAME_FILTER_ENABLED or not usernames:
+            return
+        self._apply("add", usernames)
+        await self._publish("add", usernames)
+
+    async def remove(self, usernames: Iterable[str]) -> None:
+        """
+        ユーザー名を削除し、他のプロセスに通知する
+
+        ロールバックされると登録済みのユーザー名が「存在しない」と判定されるため、コミット後に呼び出す。
+        """
+        usernames = list(usernames)
+        if not settings.USERNAME_FILTER_ENABLED or not usernames:
+            return
+        self._apply("remove", usernames)
+        await self._publish("remove", usernames)
+
+    async def rebuild(self) -> bool:
+        """
+        データベースの全ユーザー名からフィルタを構築する
+
+        Returns:
+            bool: 構築に成功した場合はTrue
+        """
+        if self._loader is None:
+            return False
+        async with self._build_lock:
+            self._added_while_building = []
+            # 構築の開始前に追加され、まだコミットされていない可能性があるユーザー名
+            recent = self._recent()
+            try:
+                new_filter = CountingBloomFilter(self.capacity, self.false_positive_rate)
+                async for username in self._loader():
+                    new_filter.add(username)
+                for username in recent + self._added_while_building:
+                    new_filter.add(username)
+            except Exception as e:
+                logger.error(f"ユーザー名フィルタの構築に失敗しました: {e}")
+                return False
+            finally:
+                self._added_while_building = None
+
+            if new_filter.count > self.capacity:
+                logger.warning(
+                    f"ユーザー数がユーザー名フィルタの想定件数を超えています: {new_filter.count} > {self.capacity}"
+                )
+            self._filter = new_filter
+            self._rebuilds += 1
+            logger.info(f"ユーザー名フィルタを構築しました: 件数={new_filter.count}")
+            return True
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_manager.client.pubsub()
+            try:
+                await pubsub.subscribe(USERNAME_FILTER_CHANNEL)
+                # 購読を開始する前の通知は受け取れないため、購読を開始してから構築する
+                self._rebuild_task = asyncio.create_task(self.rebuild())
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message["type"] != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    if data.get("origin") != self._origin:
+                        self._apply(data["op"], data.get("usernames", ()))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"ユーザー名フィルタの更新の受信に失敗しました: {e}")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    async def _rebuild_loop(self) -> None:
+        # 削除されずに残った要素や上限に達したカウンターによる偽陽性を定期的に解消する
+        while True:
+            await asyncio.sleep(self.rebuild_interval)
+            await self.rebuild()
+
+    def start(self, loader: Callable[[], AsyncIterator[str]]) -> None:
+        """
+        フィルタの構築と他のプロセスからの更新の受信を開始する
+
+        Args:
+            loader: データベースの全ユーザー名を順に返す関数
+        """
+        if self._tasks:
+            return
+        self._loader = loader
+        self._tasks = [asyncio.create_task(self._listen())]
+        if self.rebuild_interval > 0:
+            self._tasks.append(asyncio.create_task(self._rebuild_loop()))
+
+    async def stop(self) -> None:
+        """更新の受信と定期的な再構築を停止する"""
+        tasks = self._tasks + ([self._rebuild_task] if self._rebuild_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._rebuild_task = None
+
+    def clear(self) -> None:
+        """フィルタを破棄する（再構築するまで常に「存在する可能性がある」と判定する）"""
+        self._filter = None
+
+    def stats(self) -> Dict[str, Any]:
+        """件数、推定偽陽性率、判定の回数などの統計情報を返す"""
+        negatives = self._definite_misses + self._false_positives
+        return {
+            "ready": self.ready,
+            "count": self._filter.count if self._filter else 0,
+            "capacity": self.capacity,
+            "size": self._filter.size if self._filter else 0,
+            "hashes": self._filter.hashes if self._filter else 0,
+            "estimated_false_positive_rate": self._filter.estimated_false_positive_rate if self._filter else None,
+            "definite_misses": self._definite_misses,
+            "maybe": self._maybe,
+            "false_positives": self._false_positives,
+            # 存在しないユーザー名のうち、フィルタで判定できなかった割合
+            "observed_false_positive_rate": self._false_positives / negatives if negatives else 0.0,
+            "rebuilds": self._rebuilds,
+        }
+
+
+# アプリケーション全体で共有するユーザー名フィルタ
+username_filter = UsernameFilter(
+    capacity=settings.USERNAME_FILTER_CAPACITY,
+    false_positive_rate=settings.USERNAME_FILTER_FALSE_POSITIVE_RATE,
+    rebuild_interval=settings.USERNAME_FILTER_REBUILD_INTERVAL,
+)
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal, Optional, Tuple
+
+from app.core.logging import app_logger as logger
+
+
+class WorkerPoolFullError(Exception):
+    """ワーカープールの待ち行列が上限に達している場合の例外"""
+
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__(f"ワーカープール '{name}' が上限に達しています")
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float, float]:
+    """
+    関数を実行し、結果と実行開始・終了時刻を返す
+
+    プロセスプールでも使えるようにモジュールレベルで定義する
+    """
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+
+class BoundedWorkerPool:
+    """
+    CPU負荷の高い同期処理をイベントループの外で実行するワーカープール
+
+    実行中と待機中の合計が max_workers + queue_size に達した場合は
+    WorkerPoolFullError を送出して即座に失敗させる（バックプレッシャー）。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: Literal["thread", "process"],
+        max_workers: int,
+        queue_size: int,
+    ):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._executor: Optional[Executor] = None
+
+        # 統計情報
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._exec_total = 0.0
+        self._exec_max = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """ワーカーの空きを待っているタスク数"""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        関数をワーカープールで実行し、結果を返す
+
+        Args:
+            fn: 実行する関数（プロセスプールの場合はpickle可能である必要がある）
+            *args: 関数に渡す引数
+
+        Returns:
+            Any: 関数の戻り値
+
+        Raises:
+            WorkerPoolFullError: 待ち行列が上限に達している場合
+        """
+        if self._in_flight >= self.max_workers + self.queue_size:
+            self._rejected += 1
+            logger.warning(
+                f"ワーカープール '{self.name}' が上限に達しました: "
+                f"実行中+待機中={self._in_flight}"
+            )
+            raise WorkerPoolFullError(self.name)
+
+        self._in_flight += 1
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self._get_executor(), _timed_call, fn, *args
+            )
+        finally:
+            self._in_flight -= 1
+
+        wait_time = max(0.0, started - submitted)
+        exec_time = finished - started
+        self._completed += 1
+        self._wait_total += wait_time
+        self._wait_max = max(self._wait_max, wait_time)
+        self._exec_total += exec_time
+        self._exec_max = max(self._exec_max, exec_time)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """キューの深さ、待ち時間、実行時間などの統計情報を返す"""
+        completed = self._completed or 1
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "queue_size": self.queue_size,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "wait_time_avg": self._wait_total / completed,
+            "wait_time_max": self._wait_max,
+            "exec_time_avg": self._exec_total / completed,
+            "exec_time_max": self._exec_max,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """ワーカープールを停止する"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -1,60 +1,412 @@
-from typing import Optional
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterable, AsyncIterator, Tuple
 from uuid import UUID
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import any_, bindparam, delete, event, inspect, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
+from sqlalchemy.orm import Session, load_only, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.user import User
 from app.schemas.user import UserCreate, AdminUserCreate, UserUpdate, PasswordUpdate
-from app.core.security import get_password_hash
+from app.core.config import settings
+from app.core.security import get_password_hash_async, get_password_hashes_async
+from app.core.user_cache import user_cache
+from app.core.username_filter import username_filter
+
+# セッションのinfoに保存するキー
+# 書き込みを行ったセッション（コミット前の内容を読む可能性があるため、キャッシュを読み書きしない）
+_CACHE_DIRTY_KEY = "user_cache_dirty"
+# コミット後に改めて無効化するユーザー
+_CACHE_PENDING_KEY = "user_cache_pending"
+# コミット後にユーザー名フィルタから削除するユーザー名
+_FILTER_REMOVALS_KEY = "username_filter_removals"
+
+# 実行中の無効化タスク（ガベージコレクションされないように保持する）
+_invalidation_tasks: set = set()
+
+
+def _to_row(db_obj: User) -> Dict[str, Any]:
+    """ユーザーをキャッシュに保存する形式に変換する"""
+    return {
+        "id": str(db_obj.id),
+        "username": db_obj.username,
+        "hashed_password": db_obj.hashed_password,
+        "is_active": db_obj.is_active,
+        "is_admin": db_obj.is_admin,
+        "created_at": db_obj.created_at.isoformat() if db_obj.created_at else None,
+        "updated_at": db_obj.updated_at.isoformat() if db_obj.updated_at else None,
+    }
+
+
+def _from_row(row: Dict[str, Any]) -> User:
+    """
+    キャッシュのユーザー情報からデータベースを参照せずにセッションに追加できるユーザーを作成する
+
+    Redisのキャッシュにはパスワードハッシュが含まれないため、その場合 hashed_password は未読み込みとなる。
+    """
+    db_obj = User(
+        id=uuid.UUID(row["id"]),
+        username=row["username"],
+        is_active=row["is_active"],
+        is_admin=row["is_admin"],
+        created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
+        updated_at=datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
+    )
+    if "hashed_password" in row:
+        db_obj.hashed_password = row["hashed_password"]
+    make_transient_to_detached(db_obj)
+    return db_obj
+
+
+class UsernameAlreadyExistsError(IntegrityError):
+    """ユーザー名が既に登録されている場合の例外（INSERT ... ON CONFLICT DO NOTHING で検出する）"""
+
+    def __init__(self, username: str):
+        self.username = username
+        super().__init__(
+            "INSERT INTO users ... ON CONFLICT (username) DO NOTHING",
+            {"username": username},
+            Exception(f'duplicate key value violates unique constraint "ix_users_username": username={username}'),
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    """
+    コミット後にユーザーキャッシュを改めて無効化する
+
+    書き込み時の無効化からコミットまでの間に他のリクエストが古い内容をキャッシュした場合に備える。
+    """
+    pending = session.info.pop(_CACHE_PENDING_KEY, None)
+    removals = session.info.pop(_FILTER_REMOVALS_KEY, None)
+    if not pending and not removals:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    coros = [user_cache.invalidate(user_id, usernames) for user_id, usernames in (pending or {}).items()]
+    if removals:
+        # 削除・変更前のユーザー名は、ロールバックされないことが確定してからフィルタから削除する
+        coros.append(username_filter.remove(removals))
+    for coro in coros:
+        task = loop.create_task(coro)
+        _invalidation_tasks.add(task)
+        task.add_done_callback(_invalidation_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_invalidations(session: Session) -> None:
+    session.info.pop(_CACHE_PENDING_KEY, None)
+    session.info.pop(_FILTER_REMOVALS_KEY, None)
+
 
 class CRUDUser:
+    """
+    ユーザーのCRUD操作
+
+    get_by_id / get_by_username はユーザーキャッシュ（app.core.user_cache）を経由して読み込み、
+    update / update_password / delete はキャッシュを無効化する。
+    get_by_username はユーザー名フィルタ（app.core.username_filter）で確実に存在しないと判定できる場合は
+    データベースに問い合わせず、作成・名前の変更・削除の際はフィルタを更新する。
+    """
+
+    @staticmethod
+    def _cache_usable(db: AsyncSession) -> bool:
+        return settings.USER_CACHE_ENABLED and not db.info.get(_CACHE_DIRTY_KEY)
+
+    @staticmethod
+    async def _invalidate(db: AsyncSession, user_id: Any, usernames: Iterable[str] = ()) -> None:
+        """書き込みを記録し、ユーザーキャッシュを無効化する"""
+        db.info[_CACHE_DIRTY_KEY] = True
+        if not settings.USER_CACHE_ENABLED:
+            return
+        usernames = set(usernames)
+        db.info.setdefault(_CACHE_PENDING_KEY, {}).setdefault(str(user_id), set()).update(usernames)
+        await user_cache.invalidate(str(user_id), usernames)
+
+    @staticmethod
+    def _remove_username_after_commit(db: AsyncSession, username: str) -> None:
+        db.info.setdefault(_FILTER_REMOVALS_KEY, []).append(username)
+
+    async def _cached(self, db: AsyncSession, row: Optional[Dict[str, Any]]) -> Optional[User]:
+        if row is None:
+            return None
+        # データベースを参照せずにセッションに追加する
+        return await db.merge(_from_row(row), load=False)
+
+    async def _store(self, db: AsyncSession, db_obj: Optional[User]) -> Optional[User]:
+        if db_obj is not None and self._cache_usable(db):
+            await user_cache.set(_to_row(db_obj))
+        return db_obj
+
     async def create(self, db: AsyncSession, obj_in: UserCreate | AdminUserCreate) -> User:
+        """
+        ユーザーを作成する
+
+        INSERT ... ON CONFLICT (username) DO NOTHING RETURNING の1文で作成し、
+        ユーザー名の重複は事前のSELECTではなくデータベースで検出する。
+        重複した場合もトランザクションは中断されない。
+
+        Args:
+            db: データベースセッション
+            obj_in: 作成するユーザー
+
+        Returns:
+            User: 作成したユーザー
+
+        Raises:
+            UsernameAlreadyExistsError: ユーザー名が既に登録されている場合
+            WorkerPoolFullError: ワーカープールが上限に達している場合
+        """
         password = obj_in.password
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
         
         # UserCreateの場合はis_adminがないのでFalseをデフォルト値として使用
         is_admin = getattr(obj_in, 'is_admin', False)
         
-        db_obj = User(
-            username=obj_in.username,
-            hashed_password=hashed_password,
-            is_admin=is_admin
+        # 作成したユーザーはコミットまでキャッシュしない
+        db.info[_CACHE_DIRTY_KEY] = True
+        
+        result = await db.execute(
+            insert(User)
+            .values(username=obj_in.username, hashed_password=hashed_password, is_admin=bool(is_admin))
+            .on_conflict_do_nothing(index_elements=[User.username])
+            .returning(User)
         )
-        db.add(db_obj)
+        db_obj = result.scalar_one_or_none()
+        if db_obj is None:
+            raise UsernameAlreadyExistsError(obj_in.username)
+        await username_filter.add([db_obj.username])
         # コミットは呼び出し元に任せる
-        await db.flush() # flush() でセッションに変更を反映
-        await db.refresh(db_obj)
         return db_obj
     
+    async def bulk_create(self, db: AsyncSession, objs_in: list[AdminUserCreate]) -> Dict[str, uuid.UUID]:
+        """
+        複数のユーザーを1回のINSERTで登録する
+
+        パスワードはワーカープールで並列にハッシュ化し、
+        INSERT ... ON CONFLICT (username) DO NOTHING RETURNING で既存のユーザー名を飛ばして登録する。
+
+        Args:
+            db: データベースセッション
+            objs_in: 登録するユーザー（ユーザー名が重複しないこと）
+
+        Returns:
+            Dict[str, uuid.UUID]: 登録したユーザーのユーザー名とID（既に存在したユーザー名は含まれない）
+
+        Raises:
+            WorkerPoolFullError: ワーカープールが上限に達している場合
+        """
+        if not objs_in:
+            return {}
+        hashed_passwords = await get_password_hashes_async([obj_in.password for obj_in in objs_in])
+
+        # 作成したユーザーはコミットまでキャッシュしない
+        db.info[_CACHE_DIRTY_KEY] = True
+
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "username": obj_in.username,
+                "hashed_password": hashed_password,
+                "is_admin": bool(obj_in.is_admin),
+                "is_active": True,
+            }
+            for obj_in, hashed_password in zip(objs_in, hashed_passwords)
+        ]
+        result = await db.execute(
+            insert(User)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[User.username])
+            .returning(User.username, User.id)
+        )
+        created = {username: id for username, id in result.all()}
+        await username_filter.add(created)
+        # コミットは呼び出し元に任せる
+        return created
+
     async def get_all_users(self, db: AsyncSession) -> list[User]:
         result = await db.execute(select(User))
         return result.scalars().all()
 
-    async def get_by_id(self, db: AsyncSession, id: UUID) -> Optional[User]:
+    async def get_users_page(
+        self,
+        db: AsyncSession,
+        limit: int,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None
+    ) -> list[User]:
+        """
+        (created_at, id) の順でユーザーを1ページ分取得する（キーセットページネーション）
+
+        OFFSETを使用せず、前のページの最後の行より後ろから読み始めるため、
+        ページの位置に関わらず ix_users_created_at_id のインデックスでlimit件だけを読む。
+
+        Args:
+            db: データベースセッション
+            limit: 取得する最大件数
+            after: 前のページの最後の行の (created_at, id)。最初のページの場合はNone
+
+        Returns:
+            list[User]: ユーザーのリスト
+        """
+        query = select(User).order_by(User.created_at, User.id).limit(limit)
+        if after is not None:
+            query = query.where(tuple_(User.created_at, User.id) > tuple_(*after))
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def stream_users(self, db: AsyncSession, batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        (created_at, id) の順で全ユーザーの公開項目をサーバーサイドカーソルで読み出す
+
+        ORMオブジェクトを作らず、batch_size 件ずつ取得した行を順に返すため、
+        ユーザー数に関わらずメモリ使用量は一定となる。
+
+        Args:
+            db: データベースセッション（読み出しが終わるまで使用する）
+            batch_size: 1回に取得する行数
+
+        Yields:
+            Dict[str, Any]: ユーザーの公開項目（id, username, is_admin, is_active）
+        """
+        result = await db.stream(
+            select(User.id, User.username, User.is_admin, User.is_active)
+            .order_by(User.created_at, User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for row in result.mappings():
+            yield dict(row)
+
+    async def stream_usernames(self, db: AsyncSession, batch_size: int) -> AsyncIterator[str]:
+        """
+        全ユーザーのユーザー名をサーバーサイドカーソルで読み出す
+
+        Args:
+            db: データベースセッション（読み出しが終わるまで使用する）
+            batch_size: 1回に取得する行数
+
+        Yields:
+            str: ユーザー名
+        """
+        result = await db.stream(select(User.username).execution_options(yield_per=batch_size))
+        async for username in result.scalars():
+            yield username
+
+    async def get_by_id(self, db: AsyncSession, id: UUID, with_password: bool = False) -> Optional[User]:
+        """
+        IDでユーザーを取得する
+
+        Args:
+            db: データベースセッション
+            id: ユーザーID
+            with_password: hashed_password を使用するか（使用する場合はパスワードハッシュを含むキャッシュのみを使う）
+
+        Returns:
+            Optional[User]: ユーザー。存在しない場合はNone
+        """
+        if self._cache_usable(db):
+            cached = await self._cached(db, await user_cache.get_by_id(str(id), with_password))
+            if cached is not None:
+                return cached
         result = await db.execute(select(User).filter(User.id == id))
-        return result.scalar_one_or_none()
+        return await self._store(db, result.scalar_one_or_none())
+
+    async def get_public_by_ids(self, db: AsyncSession, ids: list[UUID]) -> list[User]:
+        """
+        複数のIDで公開情報（IDとユーザー名）のみを読み込んだユーザーを一括取得する
+
+        IDの数に関わらず、配列パラメータ1つの WHERE id = ANY(:ids) の1クエリで取得する。
 
-    async def get_by_username(self, db: AsyncSession, username: str) -> Optional[User]:
+        Args:
+            db: データベースセッション
+            ids: ユーザーIDのリスト
+
+        Returns:
+            list[User]: 見つかったユーザー（順序は不定、存在しないIDは含まれない）
+        """
+        ids_param = bindparam("ids", list(ids), type_=ARRAY(UUID(as_uuid=True)))
+        result = await db.execute(
+            select(User)
+            .options(load_only(User.id, User.username))
+            .where(User.id == any_(ids_param))
+        )
+        return result.scalars().all()
+
+    async def get_by_username(self, db: AsyncSession, username: str, with_password: bool = False) -> Optional[User]:
+        """
+        ユーザー名でユーザーを取得する
+
+        Args:
+            db: データベースセッション
+            username: ユーザー名
+            with_password: hashed_password を使用するか（使用する場合はパスワードハッシュを含むキャッシュのみを使う）
+
+        Returns:
+            Optional[User]: ユーザー。存在しない場合はNone
+        """
+        # 確実に存在しないユーザー名はデータベースに問い合わせない
+        if not username_filter.might_exist(username):
+            return None
+        if self._cache_usable(db):
+            cached = await self._cached(db, await user_cache.get_by_username(username, with_password))
+            if cached is not None:
+                return cached
         result = await db.execute(select(User).filter(User.username == username))
-        return result.scalar_one_or_none()
+        db_obj = result.scalar_one_or_none()
+        if db_obj is None:
+            username_filter.record_false_positive()
+        return await self._store(db, db_obj)
+
+    async def _update_returning(self, db: AsyncSession, db_obj: User, values: Dict[str, Any]) -> User:
+        """UPDATE ... RETURNING の1文で更新し、セッション内のユーザーに更新後の値を反映する"""
+        if not inspect(db_obj).persistent:
+            raise InvalidRequestError(f"Instance '{db_obj!r}' is not persistent within this session")
+        result = await db.execute(
+            update(User)
+            .where(User.id == db_obj.id)
+            .values(**values)
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        updated = result.scalar_one_or_none()
+        if updated is None:
+            raise ValueError("User not found")
+        # コミットは呼び出し元に任せる
+        return updated
 
     async def update(self, db: AsyncSession, db_obj: User, obj_in: UserUpdate) -> User:
-        try:
-            if obj_in.username is not None:
-                db_obj.username = obj_in.username
-            if obj_in.is_active is not None:
-                db_obj.is_active = obj_in.is_active
-            if obj_in.is_admin is not None:
-                db_obj.is_admin = obj_in.is_admin
-            # コミットは呼び出し元に任せる
-            await db.flush() # flush() でセッションに変更を反映
-            await db.refresh(db_obj)
+        """
+        ユーザー情報を更新する
+
+        UPDATE ... RETURNING の1文で更新し、ユーザー名の重複はデータベースで検出する。
+
+        Args:
+            db: データベースセッション
+            db_obj: 更新対象のユーザー（セッション内のもの）
+            obj_in: 更新内容
+
+        Returns:
+            User: 更新されたユーザー
+
+        Raises:
+            IntegrityError: ユーザー名が既に使用されている場合（ロールバックは呼び出し元に任せる）
+            ValueError: ユーザーが存在しない場合
+        """
+        values = obj_in.model_dump(include={"username", "is_active", "is_admin"}, exclude_none=True)
+        if not values:
             return db_obj
-        except IntegrityError:
-            # ロールバックは呼び出し元に任せる
-            # await db.rollback() # 削除
-            raise
+        old_username = db_obj.username
+        await self._invalidate(db, db_obj.id, {old_username, obj_in.username} - {None})
+        updated = await self._update_returning(db, db_obj, values)
+        if updated.username != old_username:
+            await username_filter.add([updated.username])
+            self._remove_username_after_commit(db, old_username)
+        return updated
     
     async def update_password(self, db: AsyncSession, db_obj: User, new_password: str) -> User:
         """
@@ -68,24 +420,60 @@ class CRUDUser:
         Returns:
             User: 更新されたユーザーオブジェクト
         """
-        # try/except は不要になるか、より具体的な例外を捕捉するように変更可能
-        # ここではシンプルに削除
-        db_obj.hashed_password = get_password_hash(new_password)
+        hashed_password = await get_password_hash_async(new_password)
+        await self._invalidate(db, db_obj.id, {db_obj.username})
+        return await self._update_returning(db, db_obj, {"hashed_password": hashed_password})
+
+    async def rehash_password(self, db: AsyncSession, db_obj: User, new_hashed_password: str) -> bool:
+        """
+        同じパスワードを現在の方式・コストで作成し直したハッシュに置き換える関数
+
+        パスワード自体は変わらないため、トークンバージョンやセッションには影響しない。
+        検証してから置き換えるまでの間にパスワードが変更された場合は置き換えない。
+
+        Args:
+            db: データベースセッション
+            db_obj: 対象のユーザーオブジェクト（検証に使用したハッシュを保持していること）
+            new_hashed_password: 新しいハッシュ
+
+        Returns:
+            bool: 置き換えた場合はTrue
+        """
+        stmt = (
+            update(User)
+            .where(User.id == db_obj.id, User.hashed_password == db_obj.hashed_password)
+            .values(hashed_password=new_hashed_password)
+            .returning(User.id)
+        )
+        result = await db.execute(stmt)
+        if result.scalar_one_or_none() is None:
+            return False
+        # 変更済みとして扱われないように、読み込んだ値として設定する
+        set_committed_value(db_obj, "hashed_password", new_hashed_password)
+        await self._invalidate(db, db_obj.id, {db_obj.username})
+        return True
+
+    async def delete_by_id(self, db: AsyncSession, id: UUID) -> Optional[str]:
+        """
+        DELETE ... RETURNING の1文でユーザーを削除する
+
+        Args:
+            db: データベースセッション
+            id: ユーザーID
+
+        Returns:
+            Optional[str]: 削除したユーザーのユーザー名。存在しない場合はNone
+        """
+        result = await db.execute(delete(User).where(User.id == id).returning(User.username))
+        username = result.scalar_one_or_none()
+        if username is not None:
+            await self._invalidate(db, id, {username})
+            self._remove_username_after_commit(db, username)
         # コミットは呼び出し元に任せる
-        # flush() でセッションに変更を反映させる（コミット前）
-        await db.flush() 
-        await db.refresh(db_obj)
-        return db_obj
-        # ロールバックも呼び出し元に任せる
+        return username
 
     async def delete(self, db: AsyncSession, db_obj: User) -> None:
-        # Check if the user exists in the database
-        existing_user = await self.get_by_id(db, db_obj.id)
-        if not existing_user:
+        if await self.delete_by_id(db, db_obj.id) is None:
             raise ValueError("User not found")
-        
-        await db.delete(existing_user)
-        # コミットは呼び出し元に任せる
-        await db.flush() # flush() でセッションに変更を反映
 
 user = CRUDUser()
@@ -14,6 +14,13 @@ from app.db.init import Database
 from app.db.session import AsyncSessionLocal
 from app.crud.user import user
 from app.schemas.user import AdminUserCreate
+from app.core.security import password_hash_pool
+from app.core.redis_client import redis_manager
+from app.core.worker_pool import WorkerPoolFullError
+from app.core.rate_limit import RateLimitExceededError
+from app.core.user_cache import user_cache
+from app.core.username_filter import username_filter
+from app.core.revocation import revocation_list
 
 # ログディレクトリの作成（ファイルログが有効な場合）
 if settings.LOG_TO_FILE:
@@ -22,6 +29,13 @@ if settings.LOG_TO_FILE:
         os.makedirs(log_dir)
 
 
+async def _load_usernames():
+    """ユーザー名フィルタの構築のため、全ユーザー名をサーバーサイドカーソルで読み出す"""
+    async with AsyncSessionLocal() as session:
+        async for username in user.stream_usernames(session, settings.USER_STREAM_BATCH_SIZE):
+            yield username
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """アプリケーションのライフサイクルを管理します"""
@@ -32,6 +46,26 @@ async def lifespan(app: FastAPI):
         await db.init()
         app_logger.info("Database initialized successfully")
         
+        # Redis接続プールの初期化
+        try:
+            await redis_manager.init().ping()
+            app_logger.info("Redis connection pool initialized successfully")
+        except Exception as e:
+            # Redisに接続できなくてもアプリの起動は妨げない（各リクエストで再接続する）
+            app_logger.error(f"Error connecting to Redis: {e}")
+        
+        # 他のプロセスからのユーザーキャッシュの無効化の受信を開始
+        if settings.USER_CACHE_ENABLED:
+            user_cache.start()
+        
+        # 登録済みユーザー名のフィルタの構築と、他のプロセスからの更新の受信を開始
+        if settings.USERNAME_FILTER_ENABLED:
+            username_filter.start(_load_usernames)
+        
+        # 無効化済みアクセストークンのフィルタの構築と、他のプロセスからの無効化の受信を開始
+        if settings.REVOCATION_FILTER_ENABLED:
+            revocation_list.start()
+        
         # 初期管理者ユーザーの作成
         admin_username = settings.INITIAL_ADMIN_USERNAME
         admin_password = settings.INITIAL_ADMIN_PASSWORD
@@ -65,6 +99,11 @@ async def lifespan(app: FastAPI):
     
     # 終了時の処理
     app_logger.info("Shutting down application")
+    await user_cache.stop()
+    await username_filter.stop()
+    await revocation_list.stop()
+    await redis_manager.close()
+    password_hash_pool.shutdown()
 
 
 # FastAPIアプリケーションの作成
@@ -173,6 +212,30 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": errors, "body": exc.body},
     )
 
+# ログイン試行回数の上限超過時のハンドラー
+@app.exception_handler(RateLimitExceededError)
+async def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceededError):
+    logger = get_request_logger(request)
+    logger.warning(f"Rate limit exceeded: {request.method} {request.url.path} ({exc})")
+    
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "試行回数が上限に達しました。しばらくしてから再度お試しください"},
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
+# ワーカープール飽和時のハンドラー（バックプレッシャー）
+@app.exception_handler(WorkerPoolFullError)
+async def worker_pool_full_handler(request: Request, exc: WorkerPoolFullError):
+    logger = get_request_logger(request)
+    logger.warning(f"Service busy: {request.method} {request.url.path} ({exc})")
+    
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "サーバーが混雑しています。しばらくしてから再度お試しください"},
+        headers={"Retry-After": "1"},
+    )
+
 # APIルーターの登録
 app.include_router(api_router, prefix="/api/v1")
 
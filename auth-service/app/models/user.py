@@ -1,10 +1,14 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # GET /auth/users のキーセットページネーション用
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     username: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
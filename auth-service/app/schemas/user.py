@@ -1,6 +1,9 @@
-from typing import Optional
+from typing import Any, Dict, Literal, Optional, List
 from pydantic import BaseModel, Field, field_validator
 from uuid import UUID
+from datetime import datetime
+
+from app.core.config import settings
 
 
 # 共通のプロパティを持つUserBaseクラス
@@ -63,6 +66,50 @@ class User(UserInDBBase):
     pass
 
 
+# 他のサービスに公開するユーザー情報
+class UserPublic(BaseModel):
+    id: UUID
+    username: str
+
+    model_config = {
+        "from_attributes": True
+    }
+
+
+# ユーザー情報の一括取得リクエスト
+class UserBatchRequest(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=settings.USER_BATCH_MAX_IDS)
+
+
+# ユーザーの一括登録リクエスト（各行はAdminUserCreateとして検証する）
+class UserImportRequest(BaseModel):
+    users: List[Dict[str, Any]] = Field(..., min_length=1, max_length=settings.USER_IMPORT_MAX_ROWS)
+
+
+# ユーザーの一括登録の行ごとの結果
+class UserImportRowResult(BaseModel):
+    index: int
+    username: Optional[str] = None
+    # created: 登録した, exists: 既に登録されている, duplicate: 同じリクエスト内で重複している, invalid: 入力が不正
+    # error: 前のバッチの登録後に処理が中断されたため登録していない
+    status: Literal["created", "exists", "duplicate", "invalid", "error"]
+    id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+
+# ユーザーの一括登録の結果
+class UserImportResult(BaseModel):
+    created: int
+    skipped: int
+    failed: int
+    results: List[UserImportRowResult]
+
+
+# アクセストークンのクレームから復元した認証済みユーザー
+class CurrentUser(UserInDBBase):
+    pass
+
+
 # データベース内部で使用するスキーマ（パスワードハッシュを含む）
 class UserInDB(UserInDBBase):
     hashed_password: str
@@ -81,3 +128,13 @@ class TokenPayload(BaseModel):
 
 class RefreshToken(BaseModel):
     refresh_token: str
+
+
+# セッション（リフレッシュトークン）関連のスキーマ
+class RefreshSession(BaseModel):
+    session_id: str
+    expires_at: datetime
+
+
+class SessionRevokeResult(BaseModel):
+    revoked: int
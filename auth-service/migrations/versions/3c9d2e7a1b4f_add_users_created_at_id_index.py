@@ -0,0 +1,35 @@
+"""add users created_at id index
+
+Revision ID: 3c9d2e7a1b4f
+Revises: a5ff953e928b
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2e7a1b4f'
+down_revision: Union[str, None] = 'a5ff953e928b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # テーブルをロックしないように CONCURRENTLY で作成する（トランザクション外で実行する必要がある）
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_created_at_id', 'users', ['created_at', 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_created_at_id', table_name='users',
+            postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,95 @@
+"""
+JWTの署名アルゴリズムとバックエンドごとの署名・検証のスループットとトークンサイズを計測するスクリプト
+
+バックエンドはアプリケーションと同じく app.core.token_codec のコーデックとjoseのKeyオブジェクトで計測する。
+結果を比較して JWT_BACKEND と ALGORITHM を選ぶ。
+
+使用例（auth-serviceディレクトリで実行）:
+    python -m scripts.benchmark_jwt
+    python -m scripts.benchmark_jwt --iterations 5000 --algorithms RS256 EdDSA --backends jose cryptography
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+from jose import jwk
+
+# EdDSAをjoseに登録する
+from app.core import eddsa  # noqa: F401
+from app.core.token_codec import get_codec
+from scripts.generate_keys import generate_private_key
+
+
+def benchmark(algorithm: str, backend: str, iterations: int) -> dict:
+    """1つのアルゴリズムとバックエンドについて署名・検証を繰り返し、1秒あたりの回数を返す"""
+    codec = get_codec(backend)
+    private_key = generate_private_key(algorithm)
+    private_pem = private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    public_pem = private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+    signing_key = jwk.construct(private_pem, algorithm)
+    verification_key = jwk.construct(public_pem, algorithm)
+
+    # 実際のアクセストークンと同程度のクレーム
+    claims = {
+        "sub": "00000000-0000-0000-0000-000000000000",
+        "username": "benchmark_user",
+        "is_admin": False,
+        "is_active": True,
+        "ver": 0,
+        "exp": datetime.now(UTC) + timedelta(minutes=30),
+        "jti": uuid.uuid4().hex,
+    }
+    kid = "x" * 43
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        token = codec.encode(claims, signing_key, algorithm, kid=kid)
+    sign_elapsed = time.perf_counter() - started
+
+    # 検証はリクエストと同じくヘッダーの読み取りを含める
+    started = time.perf_counter()
+    for _ in range(iterations):
+        codec.get_unverified_header(token)
+        codec.decode(token, verification_key, algorithms=[algorithm])
+    verify_elapsed = time.perf_counter() - started
+
+    return {
+        "algorithm": algorithm,
+        "backend": backend,
+        "sign_per_sec": iterations / sign_elapsed,
+        "verify_per_sec": iterations / verify_elapsed,
+        "token_bytes": len(token),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JWT署名アルゴリズムとバックエンドのベンチマーク")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--algorithms", nargs="+", default=["RS256", "ES256", "EdDSA"])
+    parser.add_argument("--backends", nargs="+", default=["jose", "pyjwt", "cryptography"])
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10} {'backend':<13} {'sign/s':>12} {'verify/s':>12} {'token bytes':>12}")
+    for algorithm in args.algorithms:
+        for backend in args.backends:
+            try:
+                result = benchmark(algorithm, backend, args.iterations)
+            except RuntimeError as e:
+                # 任意の依存関係がないバックエンドは飛ばす
+                print(f"{algorithm:<10} {backend:<13} {e}")
+                continue
+            print(
+                f"{result['algorithm']:<10} {result['backend']:<13} {result['sign_per_sec']:>12.0f} "
+                f"{result['verify_per_sec']:>12.0f} {result['token_bytes']:>12}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+パスワードハッシュの計算時間を計測し、目標の時間に収まる最大のコストを選ぶスクリプト
+
+CPUの割り当て（docker-compose.yml の cpus）が本番と同じコンテナで実行する。
+
+使用例（auth-serviceディレクトリで実行）:
+    python -m scripts.calibrate_password_hash
+    python -m scripts.calibrate_password_hash --scheme argon2 --target-ms 200 --argon2-memory-cost 19456
+"""
+import argparse
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from app.core.security import build_password_context
+
+# 計測に使用するパスワード
+_PASSWORD = "calibration-password-0123456789"
+
+
+def measure(scheme: str, samples: int, **costs: int) -> float:
+    """指定した方式・コストでハッシュ化を繰り返し、1回あたりの時間（秒）の中央値を返す"""
+    context = build_password_context(scheme, **costs)
+    # 初回はバックエンドの読み込みを含むため計測しない
+    context.hash(_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash(_PASSWORD)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate(args: argparse.Namespace) -> Tuple[Dict[str, int], List[Tuple[int, float]]]:
+    """
+    コストを1ずつ上げて計測し、目標の時間に収まる最大のコストを返す
+
+    bcryptはコスト係数（rounds）、Argon2idは反復回数（time_cost）を調整する。
+    Argon2idの使用メモリと並列度は指定した値に固定する。
+
+    Returns:
+        Tuple[Dict[str, int], List[Tuple[int, float]]]: (選んだコスト, 計測したコストと時間の一覧)
+    """
+    target = args.target_ms / 1000
+    if args.scheme == "bcrypt":
+        name, start, stop = "bcrypt_rounds", 4, 31
+    else:
+        name, start, stop = "argon2_time_cost", 1, 100
+
+    costs = {
+        "bcrypt_rounds": 4,
+        "argon2_time_cost": 1,
+        "argon2_memory_cost": args.argon2_memory_cost,
+        "argon2_parallelism": args.argon2_parallelism,
+    }
+    results: List[Tuple[int, float]] = []
+    chosen = start
+    for value in range(start, stop + 1):
+        costs[name] = value
+        elapsed = measure(args.scheme, args.samples, **costs)
+        results.append((value, elapsed))
+        if elapsed > target:
+            break
+        chosen = value
+    costs[name] = chosen
+    return costs, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="パスワードハッシュのコストの計測")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="1回のハッシュ化の目標時間（ミリ秒）")
+    parser.add_argument("--samples", type=int, default=5, help="コストごとの計測回数")
+    parser.add_argument("--argon2-memory-cost", type=int, default=19456, help="Argon2idの使用メモリ（KiB）")
+    parser.add_argument("--argon2-parallelism", type=int, default=1)
+    args = parser.parse_args()
+
+    costs, results = calibrate(args)
+    cost_name = "bcrypt_rounds" if args.scheme == "bcrypt" else "argon2_time_cost"
+
+    print(f"{cost_name:<18} {'ms':>10} {'hashes/s/worker':>16}")
+    for value, elapsed in results:
+        print(f"{value:<18} {elapsed * 1000:>10.1f} {1 / elapsed:>16.1f}")
+
+    chosen_elapsed = dict(results)[costs[cost_name]]
+    if chosen_elapsed > args.target_ms / 1000:
+        print(f"\n警告: 最小のコストでも目標の {args.target_ms:.0f}ms を超えています")
+
+    print(f"\n目標 {args.target_ms:.0f}ms に収まる設定:")
+    print(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    if args.scheme == "bcrypt":
+        print(f"BCRYPT_ROUNDS={costs['bcrypt_rounds']}")
+    else:
+        print(f"ARGON2_TIME_COST={costs['argon2_time_cost']}")
+        print(f"ARGON2_MEMORY_COST={costs['argon2_memory_cost']}")
+        print(f"ARGON2_PARALLELISM={costs['argon2_parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
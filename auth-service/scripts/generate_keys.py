@@ -0,0 +1,71 @@
+"""
+JWT署名用の鍵ペアを生成するスクリプト
+
+使用例（auth-serviceディレクトリで実行）:
+    python -m scripts.generate_keys --algorithm EdDSA --out-dir keys
+    python -m scripts.generate_keys --algorithm ES256 --out-dir keys --name next
+
+生成した公開鍵はpost-serviceにも配布する（JWKSを使用する場合は不要）。
+"""
+import argparse
+import os
+import sys
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+
+
+def generate_private_key(algorithm: str):
+    """アルゴリズムに対応する秘密鍵を生成する"""
+    if algorithm in ("RS256", "RS384", "RS512"):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "ES384":
+        return ec.generate_private_key(ec.SECP384R1())
+    if algorithm == "ES512":
+        return ec.generate_private_key(ec.SECP521R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"未対応のアルゴリズムです: {algorithm}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="JWT署名用の鍵ペアを生成します")
+    parser.add_argument("--algorithm", default="RS256", choices=["RS256", "RS384", "RS512", "ES256", "ES384", "ES512", "EdDSA"])
+    parser.add_argument("--out-dir", default="keys", help="出力先ディレクトリ")
+    parser.add_argument("--name", default="", help="ファイル名の接頭辞（例: next → next_private.pem）")
+    parser.add_argument("--force", action="store_true", help="既存のファイルを上書きする")
+    args = parser.parse_args()
+
+    prefix = f"{args.name}_" if args.name else ""
+    private_path = os.path.join(args.out_dir, f"{prefix}private.pem")
+    public_path = os.path.join(args.out_dir, f"{prefix}public.pem")
+
+    if not args.force and (os.path.exists(private_path) or os.path.exists(public_path)):
+        print(f"鍵ファイルが既に存在します: {private_path}, {public_path}（上書きする場合は --force）", file=sys.stderr)
+        return 1
+
+    private_key = generate_private_key(args.algorithm)
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    # 秘密鍵は所有者のみ読み書き可能にする
+    fd = os.open(private_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()))
+    with open(public_path, "wb") as f:
+        f.write(private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo))
+
+    print(f"秘密鍵: {private_path}")
+    print(f"公開鍵: {public_path}")
+    print(f"両サービスの ALGORITHM を {args.algorithm} に設定してください")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,16 @@
 import pytest
 from httpx import AsyncClient
 from fastapi import status
+import json
 import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import patch
 
 from app.main import app
+from app.core.config import settings
 from app.core.security import create_access_token
+from app.crud.user import user
+from app.schemas.user import UserCreate
 
 @pytest.mark.asyncio
 async def test_get_all_users_admin_success(db_session, admin_user, test_user, async_client):
@@ -54,3 +60,107 @@ async def test_get_all_users_regular_user_forbidden(db_session, test_user, async
     error_data = response.json()
     assert "detail" in error_data
     assert "この操作には管理者権限が必要です" in error_data["detail"]
+
+@pytest.mark.asyncio
+async def test_get_all_users_with_cursor(db_session, admin_user, test_user, async_client):
+    """
+    正常系テスト：X-Next-Cursor をたどって全ユーザーを重複・欠落なく取得でき、最後のページにはヘッダーがないことを確認
+    """
+    # ユーザーを追加で作成（管理者と一般ユーザーを合わせて少なくとも5人）
+    expected_ids = {str(admin_user.id), str(test_user.id)}
+    for _ in range(3):
+        created = await user.create(db_session, UserCreate(username=f"user_{uuid.uuid4()}", password="test_password123"))
+        expected_ids.add(str(created.id))
+    
+    # 管理者用アクセストークンの生成
+    access_token = await create_access_token(
+        data={"sub": str(admin_user.id)}
+    )
+    
+    # X-Next-Cursor がなくなるまで2件ずつ取得
+    pages = []
+    params = {"limit": 2}
+    while True:
+        response = await async_client.get(
+            "/api/v1/auth/users",
+            params=params,
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+    
+    # レスポンスの検証 - 最後のページ以外は2件ずつで、重複なく全ユーザーを含む
+    assert len(pages) >= 3
+    assert all(len(page) == 2 for page in pages[:-1])
+    assert 1 <= len(pages[-1]) <= 2
+    user_ids = [u["id"] for page in pages for u in page]
+    assert len(user_ids) == len(set(user_ids))
+    assert expected_ids <= set(user_ids)
+
+@pytest.mark.asyncio
+async def test_get_all_users_invalid_pagination(db_session, admin_user, async_client):
+    """
+    異常系テスト：不正なカーソルは400エラー、上限を超えるlimitは422エラーになることを確認
+    """
+    # 管理者用アクセストークンの生成
+    access_token = await create_access_token(
+        data={"sub": str(admin_user.id)}
+    )
+    
+    response = await async_client.get(
+        "/api/v1/auth/users",
+        params={"cursor": "garbage"},
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "不正なカーソルです"
+    
+    response = await async_client.get(
+        "/api/v1/auth/users",
+        params={"limit": settings.USER_LIST_MAX_LIMIT + 1},
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+@pytest.mark.asyncio
+async def test_get_all_users_ndjson(db_session, admin_user, test_user, async_client):
+    """
+    正常系テスト：format=ndjson で全ユーザーを1行1ユーザーのNDJSONとして取得できることを確認
+    """
+    # ストリーミングは依存関係とは別のセッションを使用するため、テスト用のセッションに差し替える
+    # （テストのデータはコミットされていないため、別のセッションからは見えない）
+    @asynccontextmanager
+    async def test_session():
+        yield db_session
+    
+    # 管理者用アクセストークンの生成
+    access_token = await create_access_token(
+        data={"sub": str(admin_user.id)}
+    )
+    
+    # APIリクエスト（limit は無視される）
+    with patch("app.api.v1.auth.AsyncSessionLocal", test_session):
+        response = await async_client.get(
+            "/api/v1/auth/users",
+            params={"format": "ndjson", "limit": 1},
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+    
+    # レスポンスの検証
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "X-Next-Cursor" not in response.headers
+    lines = response.text.splitlines()
+    assert len(lines) >= 2  # limit に関わらず全ユーザーを返す
+    rows = [json.loads(line) for line in lines]
+    user_ids = [row["id"] for row in rows]
+    assert len(user_ids) == len(set(user_ids))
+    assert {str(admin_user.id), str(test_user.id)} <= set(user_ids)
+    for row in rows:
+        # 公開項目のみを含む
+        assert set(row) == {"id", "username", "is_admin", "is_active"}
+    assert next(row for row in rows if row["id"] == str(admin_user.id))["is_admin"] is True
@@ -0,0 +1,131 @@
+import json
+import pytest
+from fastapi import status
+import uuid
+from unittest.mock import patch
+
+from app.crud.user import user
+from app.core.config import settings
+from app.core.security import create_access_token
+
+
+@pytest.mark.asyncio
+async def test_import_users_json(db_session, admin_user, test_user, async_client):
+    """
+    正常系テスト：JSONで複数のユーザーを一括登録し、行ごとの結果が返ることを確認
+    """
+    access_token = await create_access_token(data={"sub": str(admin_user.id)})
+    new_username = f"import_{uuid.uuid4().hex[:8]}"
+    
+    response = await async_client.post(
+        "/api/v1/auth/admin/users/import",
+        json={"users": [
+            {"username": new_username, "password": "password123"},
+            {"username": test_user.username, "password": "password123"},
+            {"username": new_username, "password": "password123"},
+            {"username": "", "password": "password123"},
+        ]},
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["created"], data["skipped"], data["failed"]) == (1, 2, 1)
+    assert [result["status"] for result in data["results"]] == ["created", "exists", "duplicate", "invalid"]
+    
+    # 登録したユーザーがデータベースに存在することを確認
+    created = await user.get_by_username(db_session, new_username)
+    assert created is not None
+    assert str(created.id) == data["results"][0]["id"]
+
+
+@pytest.mark.asyncio
+async def test_import_users_ndjson(db_session, admin_user, async_client):
+    """
+    正常系テスト：NDJSONで複数のユーザーを一括登録できることを確認
+    """
+    access_token = await create_access_token(data={"sub": str(admin_user.id)})
+    usernames = [f"import_{uuid.uuid4().hex[:8]}" for _ in range(3)]
+    body = "\n".join(json.dumps({"username": name, "password": "password123"}) for name in usernames) + "\n"
+    
+    response = await async_client.post(
+        "/api/v1/auth/admin/users/import",
+        content=body.encode("utf-8") + b"not json\n",
+        headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/x-ndjson"}
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["created"] == 3
+    assert data["failed"] == 1
+    assert [result["username"] for result in data["results"][:3]] == usernames
+
+
+@pytest.mark.asyncio
+async def test_import_users_regular_user_forbidden(db_session, test_user, async_client):
+    """
+    異常系テスト：一般ユーザーは一括登録できないことを確認
+    """
+    access_token = await create_access_token(data={"sub": str(test_user.id)})
+    
+    response = await async_client.post(
+        "/api/v1/auth/admin/users/import",
+        json={"users": [{"username": "someone", "password": "password123"}]},
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
+    
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.asyncio
+async def test_import_users_too_many_rows(db_session, admin_user, async_client):
+    """
+    異常系テスト：上限を超える件数の場合は413エラーとなり、前のバッチ分も含めて1件も登録されないことを確認
+    """
+    access_token = await create_access_token(data={"sub": str(admin_user.id)})
+    usernames = [f"import_{uuid.uuid4().hex[:8]}" for _ in range(5)]
+    body = "\n".join(json.dumps({"username": name, "password": "password123"}) for name in usernames) + "\n"
+    
+    with patch.object(settings, "USER_IMPORT_MAX_ROWS", 4), patch.object(settings, "USER_IMPORT_BATCH_SIZE", 2):
+        response = await async_client.post(
+            "/api/v1/auth/admin/users/import",
+            content=body.encode("utf-8"),
+            headers={"Authorization": f"Bearer {access_token}", "Content-Type": "application/x-ndjson"}
+        )
+    
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    for name in usernames:
+        assert await user.get_by_username(db_session, name) is None
+
+
+@pytest.mark.asyncio
+async def test_import_users_interrupted_after_first_batch(db_session, admin_user, async_client):
+    """
+    異常系テスト：2つ目のバッチで失敗した場合、1つ目のバッチはコミットされ、以降の行は error として返ることを確認
+    """
+    access_token = await create_access_token(data={"sub": str(admin_user.id)})
+    usernames = [f"import_{uuid.uuid4().hex[:8]}" for _ in range(3)]
+    bulk_create = user.bulk_create
+    calls = 0
+    
+    async def failing_bulk_create(db, objs_in):
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            raise RuntimeError("database error")
+        return await bulk_create(db, objs_in)
+    
+    with patch.object(settings, "USER_IMPORT_BATCH_SIZE", 2), \
+            patch.object(user, "bulk_create", side_effect=failing_bulk_create):
+        response = await async_client.post(
+            "/api/v1/auth/admin/users/import",
+            json={"users": [{"username": name, "password": "password123"} for name in usernames]},
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert (data["created"], data["skipped"], data["failed"]) == (2, 0, 1)
+    assert [result["status"] for result in data["results"]] == ["created", "created", "error"]
+    assert await user.get_by_username(db_session, usernames[0]) is not None
+    assert await user.get_by_username(db_session, usernames[2]) is None
@@ -0,0 +1,70 @@
+# 署名アルゴリズム（ES256 / EdDSA）のテスト
+import pytest
+from unittest.mock import patch
+from jose import jwt
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+
+from app.core.config import settings
+from app.core.keys import KeyManager
+from app.core.security import create_access_token, verify_token, verify_token_with_fallback
+from scripts.generate_keys import generate_private_key
+
+
+@pytest.fixture(params=["ES256", "EdDSA"])
+def algorithm_keys(request, tmp_path):
+    """アルゴリズムに対応する鍵ペアを生成し、設定と鍵マネージャーを差し替える"""
+    algorithm = request.param
+    private_key = generate_private_key(algorithm)
+    private_path = tmp_path / "private.pem"
+    public_path = tmp_path / "public.pem"
+    private_path.write_bytes(private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()))
+    public_path.write_bytes(private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo))
+
+    manager = KeyManager()
+    with patch.object(settings, "ALGORITHM", algorithm), \
+         patch.object(settings, "PRIVATE_KEY_PATH", str(private_path)), \
+         patch.object(settings, "PUBLIC_KEY_PATH", str(public_path)), \
+         patch("app.core.security.key_manager", manager):
+        yield algorithm, manager
+
+
+@pytest.mark.asyncio
+async def test_sign_and_verify(algorithm_keys):
+    """設定したアルゴリズムでトークンを発行・検証できることをテスト"""
+    algorithm, manager = algorithm_keys
+
+    token = await create_access_token({"sub": "test-user-id"})
+
+    header = jwt.get_unverified_header(token)
+    assert header["alg"] == algorithm
+    assert header["kid"] == manager.signing_kid
+    assert (await verify_token(token))["sub"] == "test-user-id"
+    assert (await verify_token_with_fallback(token))["sub"] == "test-user-id"
+
+
+@pytest.mark.asyncio
+async def test_tampered_token_is_rejected(algorithm_keys):
+    """改ざんされたトークンが拒否されることをテスト"""
+    token = await create_access_token({"sub": "test-user-id"})
+    header, claims, signature = token.split(".")
+    tampered_claims = jwt.encode({"sub": "admin"}, "x", algorithm="HS256").split(".")[1]
+
+    assert await verify_token(f"{header}.{tampered_claims}.{signature}") is None
+    assert await verify_token_with_fallback(f"{header}.{tampered_claims}.{signature}") is None
+
+
+def test_jwks_uses_key_algorithm(algorithm_keys):
+    """JWKSに鍵の種類とアルゴリズムが正しく載ることをテスト"""
+    algorithm, manager = algorithm_keys
+
+    key = manager.jwks()["keys"][0]
+
+    assert key["alg"] == algorithm
+    assert key["kty"] == {"ES256": "EC", "EdDSA": "OKP"}[algorithm]
+    # 鍵の種類に合わないアルゴリズムでは検証鍵を返さない
+    assert manager.get_verification_key("RS256") is None
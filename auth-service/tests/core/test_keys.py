@@ -0,0 +1,107 @@
+# 鍵マネージャーのテスト
+import os
+import shutil
+import pytest
+from unittest.mock import patch
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat, load_pem_public_key
+
+from app.core.config import settings
+from app.core.keys import KeyManager, KeyLoadError, jwk_thumbprint, public_key_to_jwk
+
+
+KEYS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "keys")
+
+
+@pytest.fixture
+def key_paths(tmp_path):
+    """一時ディレクトリに鍵ファイルをコピーし、設定を差し替える"""
+    private_path = tmp_path / "private.pem"
+    public_path = tmp_path / "public.pem"
+    shutil.copy(os.path.join(KEYS_DIR, "test_private.pem"), private_path)
+    shutil.copy(os.path.join(KEYS_DIR, "test_public.pem"), public_path)
+
+    with patch.object(settings, "PRIVATE_KEY_PATH", str(private_path)), \
+         patch.object(settings, "PUBLIC_KEY_PATH", str(public_path)), \
+         patch.object(settings, "KEY_RELOAD_CHECK_INTERVAL", 0):
+        yield private_path, public_path
+
+
+def test_keys_are_parsed_once(key_paths):
+    """ファイルが変わらない限り鍵が再パースされないことをテスト"""
+    manager = KeyManager()
+
+    with patch("app.core.keys.load_pem_public_key", wraps=load_pem_public_key) as loader:
+        first = manager.get_verification_key("RS256")
+        second = manager.get_verification_key("RS256")
+
+    # 同じKeyオブジェクトが再利用されること
+    assert first is second
+    assert loader.call_count == 1
+
+
+def test_keys_reloaded_when_mtime_changes(key_paths):
+    """ファイルのmtimeが変わった場合に鍵が再読み込みされることをテスト"""
+    _, public_path = key_paths
+    manager = KeyManager()
+
+    first = manager.public_key
+
+    # mtimeを進める
+    stat = os.stat(public_path)
+    os.utime(public_path, (stat.st_atime, stat.st_mtime + 10))
+
+    second = manager.public_key
+    assert first is not second
+
+
+def test_reload_forces_new_keys(key_paths):
+    """reload()で鍵が強制的に再読み込みされることをテスト"""
+    manager = KeyManager()
+    first = manager.get_signing_key("RS256")
+
+    result = manager.reload()
+
+    assert result["private_key_path"] == settings.PRIVATE_KEY_PATH
+    assert manager.get_signing_key("RS256") is not first
+
+
+def test_missing_key_raises(tmp_path):
+    """鍵ファイルも環境変数もない場合に例外が発生することをテスト"""
+    manager = KeyManager()
+
+    with patch.object(settings, "PUBLIC_KEY_PATH", str(tmp_path / "missing.pem")), \
+         patch.dict(os.environ, {"PUBLIC_KEY": ""}):
+        with pytest.raises(KeyLoadError):
+            manager.public_key
+
+
+def test_kid_is_jwk_thumbprint(key_paths):
+    """kidが公開鍵のJWKサムプリントであり、秘密鍵と公開鍵で一致することをテスト"""
+    manager = KeyManager()
+
+    jwks = manager.jwks()
+
+    assert len(jwks["keys"]) == 1
+    key = jwks["keys"][0]
+    assert key["kty"] == "RSA"
+    assert key["kid"] == manager.signing_kid
+    assert key["kid"] == jwk_thumbprint(public_key_to_jwk(manager.public_key))
+
+
+def test_additional_public_keys_are_published(key_paths, tmp_path):
+    """ローテーション中の追加の公開鍵がJWKSに含まれ、kidで検証鍵を選べることをテスト"""
+    new_private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    new_public_path = tmp_path / "next_public.pem"
+    new_public_path.write_bytes(
+        new_private.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+    )
+    new_kid = jwk_thumbprint(public_key_to_jwk(new_private.public_key()))
+
+    manager = KeyManager()
+    with patch.object(settings, "ADDITIONAL_PUBLIC_KEY_PATHS", [str(new_public_path)]):
+        kids = [key["kid"] for key in manager.jwks()["keys"]]
+        assert kids == [manager.signing_kid, new_kid]
+
+        assert manager.get_verification_key("RS256", kid=new_kid) is not None
+        assert manager.get_verification_key("RS256", kid="unknown") is None
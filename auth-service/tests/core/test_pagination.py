@@ -0,0 +1,35 @@
+# キーセットページネーションのカーソルのテスト
+import base64
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursorError
+
+
+def test_cursor_round_trip():
+    """カーソルから作成日時とIDを復元できることをテスト"""
+    created_at = datetime(2025, 4, 4, 16, 7, 17, 380636)
+    id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "WyJ4IiwieSJd", "!!!"])
+def test_invalid_cursor(cursor):
+    """不正なカーソルでInvalidCursorErrorが発生することをテスト"""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("values", [["2025-04-04", 5], ["2025-04-04", ["x"]], ["2025-04-04", None], [5, str(uuid.uuid4())]])
+def test_invalid_cursor_value_types(values):
+    """形式は正しいが値の型が不正なカーソルでInvalidCursorErrorが発生することをテスト"""
+    cursor = base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).rstrip(b"=").decode("ascii")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
@@ -0,0 +1,54 @@
+# パスワードハッシュの方式・コストの変更と再ハッシュのテスト
+import pytest
+from unittest.mock import patch
+
+from app.core import security
+from app.core.security import build_password_context, verify_password_and_update, verify_password_and_update_async
+
+
+def _context(scheme: str = "bcrypt", bcrypt_rounds: int = 4, argon2_time_cost: int = 1):
+    """テスト用に計算量を小さくしたコンテキストを作成する"""
+    return build_password_context(
+        scheme,
+        bcrypt_rounds=bcrypt_rounds,
+        argon2_time_cost=argon2_time_cost,
+        argon2_memory_cost=1024,
+        argon2_parallelism=1,
+    )
+
+
+def test_current_policy_hash_is_not_updated():
+    """現在の方式・コストのハッシュは再ハッシュしないことをテスト"""
+    context = _context()
+    hashed = context.hash("password")
+
+    with patch.object(security, "pwd_context", context):
+        assert verify_password_and_update("password", hashed) == (True, None)
+        assert verify_password_and_update("wrong", hashed) == (False, None)
+
+
+def test_changed_cost_is_rehashed():
+    """コストが設定と異なるハッシュは、検証成功時に現在のコストで再ハッシュすることをテスト"""
+    old_hash = _context(bcrypt_rounds=4).hash("password")
+    context = _context(bcrypt_rounds=5)
+
+    with patch.object(security, "pwd_context", context):
+        valid, new_hash = verify_password_and_update("password", old_hash)
+        assert valid is True
+        assert new_hash.startswith("$2b$05$")
+        assert context.verify("password", new_hash)
+        # 検証に失敗した場合は再ハッシュしない
+        assert verify_password_and_update("wrong", old_hash) == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_bcrypt_hash_is_migrated_to_argon2():
+    """方式をArgon2idに変更した後も既存のbcryptのハッシュで検証でき、Argon2idに移行することをテスト"""
+    bcrypt_hash = _context("bcrypt").hash("password")
+    context = _context("argon2")
+
+    with patch.object(security, "pwd_context", context):
+        valid, new_hash = await verify_password_and_update_async("password", bcrypt_hash)
+        assert valid is True
+        assert new_hash.startswith("$argon2id$")
+        assert verify_password_and_update("password", new_hash) == (True, None)
@@ -0,0 +1,128 @@
+# ログインの試行回数制限のテスト
+import uuid
+import pytest
+import pytest_asyncio
+import fakeredis.aioredis
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from app.core.config import settings
+from app.core.redis_client import redis_manager
+from app.core.rate_limit import (
+    SlidingWindowLimiter,
+    RateLimitExceededError,
+    check_login_rate_limit,
+    get_client_ip,
+    login_ip_limiter,
+    login_username_limiter,
+)
+
+
+@pytest_asyncio.fixture
+async def mock_redis():
+    """fakeredisを共有Redisクライアントとして差し替える"""
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "_client", fake_redis):
+        yield fake_redis
+
+
+def _request(host: str = "10.0.0.1", headers: dict = None) -> SimpleNamespace:
+    return SimpleNamespace(client=SimpleNamespace(host=host), headers=headers or {})
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_after_limit(mock_redis):
+    """上限回数を超えた試行が拒否され、再試行までの秒数が返ることをテスト"""
+    limiter = SlidingWindowLimiter("test", limit=3, window=60, local_max_size=10)
+    key = str(uuid.uuid4())
+
+    assert [await limiter.hit(key) for _ in range(3)] == [0.0, 0.0, 0.0]
+    retry_after = await limiter.hit(key)
+
+    assert 0 < retry_after <= 60
+    # 他のキーには影響しない
+    assert await limiter.hit(str(uuid.uuid4())) == 0.0
+    stats = limiter.stats()
+    assert stats["allowed"] == 4
+    assert stats["rejected"] == 1
+    assert stats["locally_blocked"] == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_blocked_key_skips_redis(mock_redis):
+    """拒否中のキーはRedisに問い合わせずに拒否されることをテスト"""
+    limiter = SlidingWindowLimiter("test", limit=1, window=60, local_max_size=10)
+    key = str(uuid.uuid4())
+    await limiter.hit(key)
+    assert await limiter.hit(key) > 0
+
+    with patch.object(redis_manager, "_client", MagicMock()) as client:
+        assert await limiter.hit(key) > 0
+        client.register_script.assert_not_called()
+    assert limiter.stats()["local_rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_window_slides(mock_redis):
+    """ウィンドウから外れた試行は数えられないことをテスト"""
+    limiter = SlidingWindowLimiter("test", limit=2, window=60, local_max_size=10)
+    key = str(uuid.uuid4())
+    with patch("app.core.rate_limit.time.time", return_value=1000.0):
+        await limiter.hit(key)
+    with patch("app.core.rate_limit.time.time", return_value=1030.0):
+        await limiter.hit(key)
+        assert await limiter.hit(key) == pytest.approx(30.0)
+    limiter.clear()
+    # 最初の試行がウィンドウから外れた後は許可される
+    with patch("app.core.rate_limit.time.time", return_value=1061.0):
+        assert await limiter.hit(key) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_limiter_allows_when_redis_fails():
+    """Redisの障害時は制限せずに許可することをテスト"""
+    limiter = SlidingWindowLimiter("test", limit=1, window=60, local_max_size=10)
+    client = MagicMock()
+    client.register_script.return_value = AsyncMock(side_effect=ConnectionError("down"))
+    with patch.object(redis_manager, "_client", client):
+        assert await limiter.hit("key") == 0.0
+        assert await limiter.hit("key") == 0.0
+    assert limiter.stats()["errors"] == 2
+
+
+@pytest.mark.asyncio
+async def test_check_login_rate_limit_by_username(mock_redis):
+    """同じユーザー名への試行が上限に達すると、別のIPアドレスからでも拒否されることをテスト"""
+    username = f"user_{uuid.uuid4().hex[:8]}"
+    for i in range(settings.LOGIN_RATE_LIMIT_PER_USERNAME):
+        await check_login_rate_limit(_request(f"10.1.0.{i}"), username)
+
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        await check_login_rate_limit(_request("10.2.0.1"), username)
+
+    assert exc_info.value.name == "username"
+    assert exc_info.value.retry_after >= 1
+    login_username_limiter.clear()
+
+
+@pytest.mark.asyncio
+async def test_check_login_rate_limit_by_ip(mock_redis):
+    """同じIPアドレスからの試行が上限に達すると、別のユーザー名でも拒否されることをテスト"""
+    ip = f"10.3.{uuid.uuid4().int % 256}.{uuid.uuid4().int % 256}"
+    with patch.object(login_ip_limiter, "limit", 3):
+        for i in range(3):
+            await check_login_rate_limit(_request(ip), f"user_{uuid.uuid4().hex[:8]}")
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            await check_login_rate_limit(_request(ip), f"user_{uuid.uuid4().hex[:8]}")
+
+    assert exc_info.value.name == "ip"
+    login_ip_limiter.clear()
+
+
+def test_get_client_ip_proxy_headers():
+    """X-Forwarded-For は TRUST_PROXY_HEADERS が有効な場合のみ使用されることをテスト"""
+    request = _request("10.0.0.1", {"x-forwarded-for": "203.0.113.5, 10.0.0.2"})
+
+    assert get_client_ip(request) == "10.0.0.1"
+    with patch.object(settings, "TRUST_PROXY_HEADERS", True):
+        assert get_client_ip(request) == "203.0.113.5"
@@ -0,0 +1,34 @@
+# Redisクライアントマネージャーのテスト
+import pytest
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.redis_client import RedisClientManager
+
+
+@pytest.mark.asyncio
+async def test_client_is_shared():
+    """同じイベントループ内では同じクライアントが再利用されることをテスト"""
+    manager = RedisClientManager()
+    try:
+        first = manager.client
+        second = manager.client
+
+        assert first is second
+        assert isinstance(first.connection_pool, redis.BlockingConnectionPool)
+        assert first.connection_pool.max_connections == settings.REDIS_MAX_CONNECTIONS
+    finally:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_close_releases_client():
+    """close()でクライアントが破棄され、次回アクセス時に作り直されることをテスト"""
+    manager = RedisClientManager()
+    first = manager.client
+
+    await manager.close()
+    second = manager.client
+
+    assert first is not second
+    await manager.close()
@@ -0,0 +1,128 @@
+# アクセストークンの無効化（jti）のテスト
+import asyncio
+import time
+import uuid
+import pytest
+import pytest_asyncio
+import fakeredis.aioredis
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+from fastapi import HTTPException
+from jose import jwt
+
+from app.api.deps import get_current_user
+from app.core.redis_client import redis_manager
+from app.core.revocation import RevocationList, revocation_list
+from app.core.security import create_user_access_token, revoke_access_token
+
+
+@pytest_asyncio.fixture
+async def mock_redis():
+    """fakeredisを共有Redisクライアントとして差し替える"""
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "_client", fake_redis):
+        yield fake_redis
+    await fake_redis.flushall()
+    revocation_list.clear()
+
+
+def _db_user() -> SimpleNamespace:
+    """データベースのユーザーの代わりに使用するオブジェクト"""
+    return SimpleNamespace(id=uuid.uuid4(), username=f"user_{uuid.uuid4().hex[:8]}", is_admin=False, is_active=True)
+
+
+@pytest.mark.asyncio
+async def test_access_token_has_unique_jti(mock_redis):
+    """アクセストークンごとに異なるjtiが含まれることをテスト"""
+    db_user = _db_user()
+    first = jwt.get_unverified_claims(await create_user_access_token(db_user))
+    second = jwt.get_unverified_claims(await create_user_access_token(db_user))
+
+    assert first["jti"] and second["jti"]
+    assert first["jti"] != second["jti"]
+
+
+@pytest.mark.asyncio
+async def test_revoke_expires_with_token(mock_redis):
+    """無効化の記録がトークンの有効期限まで保持されることをテスト"""
+    revocations = RevocationList(capacity=100, false_positive_rate=0.001, rebuild_interval=0)
+
+    assert await revocations.revoke("jti-1", time.time() + 60) is True
+    assert await revocations.is_revoked("jti-1") is True
+    assert 0 < await mock_redis.ttl("revoked_jti:jti-1") <= 61
+
+    # 有効期限が過ぎたトークンは記録しない
+    assert await revocations.revoke("jti-2", time.time() - 1) is False
+    assert await mock_redis.exists("revoked_jti:jti-2") == 0
+
+
+@pytest.mark.asyncio
+async def test_ready_filter_skips_redis(mock_redis):
+    """構築後は無効化されていないjtiをRedisに問い合わせずに判定することをテスト"""
+    await mock_redis.setex("revoked_jti:old", 60, 1)
+    revocations = RevocationList(capacity=100, false_positive_rate=0.001, rebuild_interval=0)
+    assert await revocations.rebuild() is True
+
+    with patch.object(mock_redis, "exists", new_callable=AsyncMock) as exists:
+        for i in range(100):
+            assert await revocations.is_revoked(f"active-{i}") is False
+        # 偽陽性の場合のみRedisに問い合わせる
+        assert exists.await_count < 5
+
+    assert await revocations.is_revoked("old") is True
+    stats = revocations.stats()
+    assert stats["ready"] is True
+    assert stats["count"] == 1
+    assert stats["revoked_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_fails_open(mock_redis):
+    """Redisの障害時は無効化されていないものとして扱うことをテスト"""
+    revocations = RevocationList(capacity=100, false_positive_rate=0.001, rebuild_interval=0)
+
+    with patch.object(mock_redis, "exists", new_callable=AsyncMock, side_effect=ConnectionError("down")):
+        assert await revocations.is_revoked("any") is False
+    assert revocations.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_revocation_fans_out_to_other_processes(mock_redis):
+    """無効化が他のプロセスのフィルタに反映されることをテスト"""
+    local = RevocationList(capacity=100, false_positive_rate=0.001, rebuild_interval=0)
+    other = RevocationList(capacity=100, false_positive_rate=0.001, rebuild_interval=0)
+    other.start()
+    try:
+        for _ in range(50):
+            if other.ready:
+                break
+            await asyncio.sleep(0.05)
+        # 購読の開始を待つ
+        await asyncio.sleep(0.1)
+
+        await local.revoke("jti-3", time.time() + 60)
+        for _ in range(50):
+            if other._filter.might_contain("jti-3"):
+                break
+            await asyncio.sleep(0.05)
+        assert await other.is_revoked("jti-3") is True
+    finally:
+        await other.stop()
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_rejected(mock_redis):
+    """無効化したトークンだけが拒否され、同じユーザーの他のトークンは有効なことをテスト"""
+    db_user = _db_user()
+    token = await create_user_access_token(db_user)
+    other_token = await create_user_access_token(db_user)
+
+    assert await revoke_access_token(token) is True
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token, db=None)
+    assert exc_info.value.status_code == 401
+    assert (await get_current_user(other_token, db=None)).id == db_user.id
+
+    # 不正なトークンは無効化しない
+    assert await revoke_access_token("invalid") is False
@@ -15,6 +15,7 @@ from app.core.security import (
     verify_refresh_token
 )
 from app.core.config import settings
+from app.core.redis_client import redis_manager
 
 
 # アクセストークン関連の境界値テスト
@@ -171,10 +172,9 @@ async def test_verify_password_with_unicode_chars():
 @pytest_asyncio.fixture
 async def mock_redis():
     """Redisのモックを提供するフィクスチャ"""
-    with patch('redis.asyncio.from_url') as mock_redis:
-        # fakeredisを使用してRedisをモック
-        fake_redis = fakeredis.aioredis.FakeRedis()
-        mock_redis.return_value = fake_redis
+    # fakeredisを共有Redisクライアントとして差し替える
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "_client", fake_redis):
         yield fake_redis
 
 
@@ -1,8 +1,10 @@
 # エラー系テスト
+import json
 import pytest
 import pytest_asyncio
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
+from jose.utils import base64url_encode
 import fakeredis.aioredis
 from unittest.mock import patch, AsyncMock, MagicMock
 from freezegun import freeze_time
@@ -13,9 +15,13 @@ from app.core.security import (
     create_access_token,
     create_refresh_token,
     verify_refresh_token,
-    revoke_refresh_token
+    revoke_refresh_token,
+    rotate_refresh_token,
+    verify_token_with_fallback,
+    token_verification_stats
 )
 from app.core.config import settings
+from app.core.redis_client import redis_manager
 
 
 # パスワード関連のエラーテスト
@@ -121,10 +127,9 @@ async def test_decode_invalid_token_format():
 @pytest_asyncio.fixture
 async def mock_redis():
     """Redisのモックを提供するフィクスチャ"""
-    with patch('redis.asyncio.from_url') as mock_redis:
-        # fakeredisを使用してRedisをモック
-        fake_redis = fakeredis.aioredis.FakeRedis()
-        mock_redis.return_value = fake_redis
+    # fakeredisを共有Redisクライアントとして差し替える
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "_client", fake_redis):
         yield fake_redis
 
 
@@ -178,16 +183,16 @@ async def test_revoke_refresh_token_not_found(mock_redis):
 @pytest.mark.asyncio
 async def test_redis_connection_error():
     """Redis接続エラーのテスト"""
-    # Redisクライアントをモックしてエラーを発生させる
-    with patch('redis.asyncio.from_url') as mock_redis:
-        # 例外を発生させるモック
-        mock_client = AsyncMock()
-        mock_client.get.side_effect = Exception("Redis connection error")
-        mock_client.delete.side_effect = Exception("Redis connection error")
-        mock_client.setex.side_effect = Exception("Redis connection error")
-        mock_client.close = AsyncMock()
-        mock_redis.return_value = mock_client
-        
+    # 共有Redisクライアントをモックしてエラーを発生させる
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = Exception("Redis connection error")
+    mock_client.delete.side_effect = Exception("Redis connection error")
+    mock_client.setex.side_effect = Exception("Redis connection error")
+    mock_client.pipeline = MagicMock(side_effect=Exception("Redis connection error"))
+    mock_client.register_script = MagicMock(
+        return_value=AsyncMock(side_effect=Exception("Redis connection error"))
+    )
+    with patch.object(redis_manager, "_client", mock_client):
         # リフレッシュトークン検証
         with pytest.raises(Exception) as exc_info:
             await verify_refresh_token("test-token")
@@ -222,3 +227,96 @@ async def test_create_access_token_with_invalid_data():
     
     # エラーメッセージを確認
     assert "not json serializable" in str(exc_info.value).lower()
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token_not_found(mock_redis):
+    """存在しないリフレッシュトークンのローテーションテスト"""
+    keys_before = set(await mock_redis.keys("refresh_token:*"))
+    
+    result = await rotate_refresh_token("non-existent-token")
+    
+    # 結果がNoneであり、新しいトークンが保存されていないことを確認
+    assert result is None
+    assert set(await mock_redis.keys("refresh_token:*")) == keys_before
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token_concurrent_replay(mock_redis):
+    """同じリフレッシュトークンによる同時ローテーションが1つしか成功しないことをテスト"""
+    import asyncio
+    
+    keys_before = set(await mock_redis.keys("refresh_token:*"))
+    token = await create_refresh_token("test-user-id")
+    
+    # 同じトークンで同時にローテーション
+    results = await asyncio.gather(*[rotate_refresh_token(token) for _ in range(5)])
+    
+    # 成功は1つだけであることを確認
+    successes = [r for r in results if r is not None]
+    assert len(successes) == 1
+    
+    # 有効なリフレッシュトークンは新しいもの1つだけであることを確認
+    keys = set(await mock_redis.keys("refresh_token:*")) - keys_before
+    assert keys == {f"refresh_token:{successes[0][1]}".encode("utf-8")}
+
+
+@pytest.mark.asyncio
+async def test_verify_token_with_fallback_legacy_disabled():
+    """旧形式の受け付けが無効な場合にHS256のトークンが拒否されることのテスト"""
+    token = jwt.encode({"sub": "legacy-user-id"}, settings.SECRET_KEY, algorithm="HS256")
+    before = token_verification_stats["legacy_hs256_rejected"]
+    
+    with patch.object(settings, "LEGACY_HS256_ENABLED", False):
+        assert await verify_token_with_fallback(token) is None
+    
+    assert token_verification_stats["legacy_hs256_rejected"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_verify_token_with_fallback_malformed_token():
+    """形式が不正なトークンがデコードを試みずに拒否されることのテスト"""
+    before = token_verification_stats["malformed"]
+    
+    with patch("app.core.security.token_codec.decode") as mock_decode:
+        assert await verify_token_with_fallback("not-a-jwt") is None
+        mock_decode.assert_not_called()
+    
+    assert token_verification_stats["malformed"] == before + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("alg", [["RS256"], {"alg": "RS256"}, 256])
+async def test_verify_token_with_fallback_non_string_alg(alg):
+    """文字列以外のalgのトークンが例外を発生させずに拒否されることのテスト"""
+    header = base64url_encode(json.dumps({"alg": alg}).encode()).decode()
+    payload = base64url_encode(json.dumps({"sub": "test-user-id"}).encode()).decode()
+    before = token_verification_stats["malformed"]
+    
+    with patch("app.core.security.token_codec.decode") as mock_decode:
+        assert await verify_token_with_fallback(f"{header}.{payload}.signature") is None
+        mock_decode.assert_not_called()
+    
+    assert token_verification_stats["malformed"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_verify_token_with_fallback_invalid_signature():
+    """署名が不正なトークンが1回の検証で拒否されることのテスト"""
+    token = jwt.encode({"sub": "test-user-id"}, "wrong-secret", algorithm="HS256")
+    before = token_verification_stats["invalid"]
+    
+    with patch.object(settings, "LEGACY_HS256_ENABLED", True):
+        assert await verify_token_with_fallback(token) is None
+    
+    assert token_verification_stats["invalid"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_verify_token_with_fallback_unsupported_alg():
+    """未対応のアルゴリズムのトークンが拒否されることのテスト"""
+    token = jwt.encode({"sub": "test-user-id"}, "secret", algorithm="HS512")
+    before = token_verification_stats["unsupported_alg"]
+    
+    assert await verify_token_with_fallback(token) is None
+    assert token_verification_stats["unsupported_alg"] == before + 1
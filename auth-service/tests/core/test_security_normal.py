@@ -1,4 +1,5 @@
 # 正常系テスト
+import uuid
 import pytest
 import pytest_asyncio
 from datetime import datetime, timedelta
@@ -13,9 +14,17 @@ from app.core.security import (
     create_access_token,
     create_refresh_token,
     verify_refresh_token,
-    revoke_refresh_token
+    revoke_refresh_token,
+    rotate_refresh_token,
+    list_refresh_sessions,
+    revoke_all_refresh_tokens,
+    get_refresh_session_id,
+    verify_token_with_fallback,
+    token_verification_stats
 )
 from app.core.config import settings
+from app.core.redis_client import redis_manager
+from app.core.keys import key_manager
 
 
 # パスワード関連のテスト
@@ -102,10 +111,9 @@ async def test_create_access_token_with_custom_exp():
 @pytest_asyncio.fixture
 async def mock_redis():
     """Redisのモックを提供するフィクスチャ"""
-    with patch('redis.asyncio.from_url') as mock_redis:
-        # fakeredisを使用してRedisをモック
-        fake_redis = fakeredis.aioredis.FakeRedis()
-        mock_redis.return_value = fake_redis
+    # fakeredisを共有Redisクライアントとして差し替える
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "_client", fake_redis):
         yield fake_redis
 
 
@@ -181,3 +189,119 @@ async def test_revoke_refresh_token_success(mock_redis):
     # トークンがRedisから削除されていることを確認
     stored_user_id = await mock_redis.get(f"refresh_token:{token}")
     assert stored_user_id is None
+
+
+@pytest.mark.asyncio
+async def test_rotate_refresh_token_success(mock_redis):
+    """リフレッシュトークンのローテーションのテスト"""
+    user_id = "test-user-id"
+    token = await create_refresh_token(user_id)
+    
+    # ローテーション
+    result = await rotate_refresh_token(token)
+    
+    # ユーザーIDと新しいトークンが返されることを確認
+    assert result is not None
+    rotated_user_id, new_token = result
+    assert rotated_user_id == user_id
+    assert new_token != token
+    
+    # 古いトークンは削除され、新しいトークンが保存されていることを確認
+    assert await mock_redis.get(f"refresh_token:{token}") is None
+    stored_user_id = await mock_redis.get(f"refresh_token:{new_token}")
+    assert stored_user_id.decode("utf-8") == user_id
+    
+    # 新しいトークンに有効期限が設定されていることを確認
+    ttl = await mock_redis.ttl(f"refresh_token:{new_token}")
+    expected_ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+    assert abs(ttl - expected_ttl) < 10
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_user_index(mock_redis):
+    """ユーザーごとのトークンのインデックスが作成・ローテーション・無効化で更新されることのテスト"""
+    user_id = f"index-user-{uuid.uuid4()}"
+    index_key = f"user_refresh_tokens:{user_id}"
+    
+    token = await create_refresh_token(user_id)
+    assert await mock_redis.zscore(index_key, token) is not None
+    assert await mock_redis.ttl(index_key) > 0
+    
+    # ローテーションで古いトークンが新しいトークンに置き換わることを確認
+    _, new_token = await rotate_refresh_token(token)
+    assert await mock_redis.zscore(index_key, token) is None
+    assert await mock_redis.zscore(index_key, new_token) is not None
+    
+    # 無効化でインデックスからも取り除かれることを確認
+    assert await revoke_refresh_token(new_token) is True
+    assert await mock_redis.zscore(index_key, new_token) is None
+
+
+@pytest.mark.asyncio
+async def test_list_refresh_sessions_success(mock_redis):
+    """ユーザーのセッション一覧取得のテスト"""
+    user_id = f"sessions-user-{uuid.uuid4()}"
+    tokens = [await create_refresh_token(user_id) for _ in range(3)]
+    await create_refresh_token("other-user-id")
+    
+    sessions = await list_refresh_sessions(user_id)
+    
+    # トークン本体ではなくセッションIDのみが返されることを確認
+    assert len(sessions) == 3
+    assert {s["session_id"] for s in sessions} == {get_refresh_session_id(t) for t in tokens}
+    assert all(s["session_id"] not in tokens for s in sessions)
+    assert all(s["expires_at"] > datetime.now().astimezone() for s in sessions)
+
+
+@pytest.mark.asyncio
+async def test_revoke_all_refresh_tokens_success(mock_redis):
+    """ユーザーのすべてのリフレッシュトークン無効化のテスト"""
+    user_id = f"revoke-all-user-{uuid.uuid4()}"
+    tokens = [await create_refresh_token(user_id) for _ in range(3)]
+    other_token = await create_refresh_token("other-user-id")
+    
+    revoked = await revoke_all_refresh_tokens(user_id)
+    
+    # 対象ユーザーのトークンのみが削除されていることを確認
+    assert revoked == 3
+    for token in tokens:
+        assert await verify_refresh_token(token) is None
+    assert await verify_refresh_token(other_token) == "other-user-id"
+    assert await list_refresh_sessions(user_id) == []
+    
+    # トークンがない場合は0件
+    assert await revoke_all_refresh_tokens(user_id) == 0
+
+
+@pytest.mark.asyncio
+async def test_verify_token_with_fallback_rs256():
+    """RS256のトークンが非対称鍵で検証されることのテスト"""
+    token = await create_access_token({"sub": "test-user-id"})
+    before = token_verification_stats["rs256"]
+    
+    payload = await verify_token_with_fallback(token)
+    
+    assert payload["sub"] == "test-user-id"
+    assert token_verification_stats["rs256"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_verify_token_with_fallback_legacy_hs256():
+    """旧形式（HS256）のトークンが受け付けられ、件数が記録されることのテスト"""
+    token = jwt.encode({"sub": "legacy-user-id"}, settings.SECRET_KEY, algorithm="HS256")
+    before = token_verification_stats["legacy_hs256"]
+    
+    with patch.object(settings, "LEGACY_HS256_ENABLED", True):
+        payload = await verify_token_with_fallback(token)
+    
+    assert payload["sub"] == "legacy-user-id"
+    assert token_verification_stats["legacy_hs256"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_create_access_token_has_kid():
+    """アクセストークンのヘッダーに署名鍵のkidが含まれることのテスト"""
+    token = await create_access_token({"sub": "test-user-id"})
+    
+    header = jwt.get_unverified_header(token)
+    assert header["kid"] == key_manager.signing_kid
@@ -0,0 +1,112 @@
+# JWTのコーデック（バックエンドの切り替え）のテスト
+import importlib.util
+import time
+import pytest
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+from jose import jwk
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from app.core.token_codec import CryptographyCodec, get_codec
+from scripts.generate_keys import generate_private_key
+
+# PyJWTは任意の依存関係のため、インストールされている場合のみテストする
+BACKENDS = ["jose", "cryptography"] + (["pyjwt"] if importlib.util.find_spec("jwt") else [])
+
+
+def _jose_keys(algorithm: str):
+    """アプリケーションと同じくjoseのKeyオブジェクトの署名鍵・検証鍵を作成する"""
+    private_key = generate_private_key(algorithm)
+    private_pem = private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    public_pem = private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+    return jwk.construct(private_pem, algorithm), jwk.construct(public_pem, algorithm)
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256", "EdDSA"])
+def test_backends_are_interchangeable(algorithm):
+    """どのバックエンドで署名したトークンも、他のすべてのバックエンドで検証できることをテスト"""
+    signing_key, verification_key = _jose_keys(algorithm)
+    claims = {"sub": "user-id", "jti": "jti", "exp": int(time.time()) + 60}
+
+    for signer in BACKENDS:
+        token = get_codec(signer).encode(claims, signing_key, algorithm, kid="kid-1")
+        for verifier in BACKENDS:
+            codec = get_codec(verifier)
+            assert codec.get_unverified_header(token)["kid"] == "kid-1"
+            assert codec.decode(token, verification_key, algorithms=[algorithm]) == claims
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_legacy_hs256_secret(backend):
+    """HS256の秘密鍵（文字列）で署名・検証できることをテスト"""
+    codec = get_codec(backend)
+    token = codec.encode({"sub": "legacy"}, "secret", "HS256")
+
+    assert get_codec("jose").decode(token, "secret", algorithms=["HS256"]) == {"sub": "legacy"}
+    assert codec.decode(token, "secret", algorithms=["HS256"]) == {"sub": "legacy"}
+    with pytest.raises(JWTError):
+        codec.decode(token, "other-secret", algorithms=["HS256"])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_rejects_invalid_tokens(backend):
+    """有効期限切れ・許可されていないアルゴリズム・改ざんされたトークンを拒否することをテスト"""
+    signing_key, verification_key = _jose_keys("RS256")
+    codec = get_codec(backend)
+
+    expired = codec.encode({"sub": "user-id", "exp": int(time.time()) - 10}, signing_key, "RS256")
+    with pytest.raises(ExpiredSignatureError):
+        codec.decode(expired, verification_key, algorithms=["RS256"])
+
+    token = codec.encode({"sub": "user-id", "exp": int(time.time()) + 60}, signing_key, "RS256")
+    with pytest.raises(JWTError):
+        codec.decode(token, verification_key, algorithms=["ES256"])
+
+    header, _, signature = token.split(".")
+    forged = get_codec("jose").encode({"sub": "admin"}, "x", "HS256").split(".")[1]
+    with pytest.raises(JWTError):
+        codec.decode(f"{header}.{forged}.{signature}", verification_key, algorithms=["RS256"])
+
+    with pytest.raises(JWTError):
+        codec.get_unverified_header("not-a-jwt")
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_rejects_malformed_tokens(backend):
+    """形式が不正なトークン（非ASCII文字を含むものなど）でJWTErrorが発生することをテスト"""
+    signing_key, verification_key = _jose_keys("RS256")
+    codec = get_codec(backend)
+    header, payload, signature = codec.encode({"sub": "user-id"}, signing_key, "RS256").split(".")
+
+    malformed = [
+        f"{header}.{payload}é.{signature}",
+        f"{header}é.{payload}.{signature}",
+        f"{header}.{payload}.{signature}é",
+        f"{header}.{payload}",
+        f"{header}.{payload}.{signature}.extra",
+        "a.b.c",
+        "",
+    ]
+    for token in malformed:
+        with pytest.raises(JWTError):
+            codec.decode(token, verification_key, algorithms=["RS256"])
+
+
+def test_cryptography_codec_reuses_header():
+    """同じアルゴリズムとkidのヘッダーはエンコード済みのものを再利用することをテスト"""
+    signing_key, _ = _jose_keys("EdDSA")
+    codec = CryptographyCodec()
+
+    first = codec.encode({"sub": "a"}, signing_key, "EdDSA", kid="kid-1")
+    second = codec.encode({"sub": "b"}, signing_key, "EdDSA", kid="kid-1")
+
+    assert first.split(".")[0] == second.split(".")[0]
+    assert len(codec._encoded_headers) == 1
+    codec.get_unverified_header(first)
+    codec.get_unverified_header(second)
+    assert len(codec._headers) == 1
+
+
+def test_unknown_backend():
+    """未知のバックエンドを指定した場合のエラーをテスト"""
+    with pytest.raises(ValueError):
+        get_codec("unknown")
@@ -0,0 +1,125 @@
+# トークンバージョンとクレームによる認証のテスト
+import uuid
+import pytest
+import pytest_asyncio
+import fakeredis.aioredis
+from types import SimpleNamespace
+from unittest.mock import patch, AsyncMock
+from fastapi import HTTPException
+
+from app.api.deps import get_current_user, get_current_admin_user
+from app.core.redis_client import redis_manager
+from app.core.security import create_user_access_token
+from app.core.token_version import TokenVersionCache, token_versions
+
+
+@pytest_asyncio.fixture
+async def mock_redis():
+    """fakeredisを共有Redisクライアントとして差し替える"""
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "_client", fake_redis):
+        yield fake_redis
+    token_versions.clear()
+
+
+def _db_user(is_admin: bool = False) -> SimpleNamespace:
+    """データベースのユーザーの代わりに使用するオブジェクト"""
+    return SimpleNamespace(id=uuid.uuid4(), username=f"user_{uuid.uuid4().hex[:8]}", is_admin=is_admin, is_active=True)
+
+
+@pytest.mark.asyncio
+async def test_bump_increments_version(mock_redis):
+    """バージョンが0から始まり、bumpで増えることをテスト"""
+    cache = TokenVersionCache(ttl=60, max_size=10)
+    user_id = str(uuid.uuid4())
+
+    assert await cache.get(user_id) == 0
+    assert await cache.bump(user_id) == 1
+    assert await cache.get(user_id) == 1
+    assert await mock_redis.get(f"token_version:{user_id}") == b"1"
+
+
+@pytest.mark.asyncio
+async def test_get_uses_local_cache_until_ttl(mock_redis):
+    """TTLの間はRedisを参照しないことをテスト"""
+    cache = TokenVersionCache(ttl=60, max_size=10)
+    user_id = str(uuid.uuid4())
+    await cache.get(user_id)
+
+    # 他のプロセスでのbumpはTTLが過ぎるまで反映されない
+    await mock_redis.incr(f"token_version:{user_id}")
+    assert await cache.get(user_id) == 0
+    assert cache.stats()["hits"] == 1
+
+    cache.ttl = 0
+    assert await cache.get(user_id) == 1
+
+
+@pytest.mark.asyncio
+async def test_current_user_from_claims_without_db(mock_redis):
+    """クレームを含むトークンではデータベースを参照せずにユーザーを復元することをテスト"""
+    db_user = _db_user(is_admin=True)
+    token = await create_user_access_token(db_user)
+
+    with patch("app.api.deps.user_crud.get_by_id", new_callable=AsyncMock) as get_by_id:
+        current_user = await get_current_user(token, db=None)
+        get_by_id.assert_not_called()
+
+    assert current_user.id == db_user.id
+    assert current_user.username == db_user.username
+    assert await get_current_admin_user(current_user) is current_user
+
+
+@pytest.mark.asyncio
+async def test_bumped_version_invalidates_token(mock_redis):
+    """バージョンを上げると発行済みのトークンが無効になることをテスト"""
+    db_user = _db_user()
+    token = await create_user_access_token(db_user)
+
+    await token_versions.bump(str(db_user.id))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token, db=None)
+    assert exc_info.value.status_code == 401
+
+    # 新しく発行したトークンは有効
+    new_token = await create_user_access_token(db_user)
+    assert (await get_current_user(new_token, db=None)).id == db_user.id
+
+
+@pytest.mark.asyncio
+async def test_issued_token_uses_version_bumped_by_other_process(mock_redis):
+    """他のプロセスでバージョンを上げた直後でも、キャッシュの古いバージョンでトークンを発行しないことをテスト"""
+    db_user = _db_user()
+    user_id = str(db_user.id)
+    await token_versions.get(user_id)
+
+    # 他のプロセスでのパスワード変更など
+    await mock_redis.incr(f"token_version:{user_id}")
+    token = await create_user_access_token(db_user)
+
+    # キャッシュの期限が切れた後も有効
+    token_versions.clear()
+    assert (await get_current_user(token, db=None)).id == db_user.id
+
+
+@pytest.mark.asyncio
+async def test_get_fails_open_on_redis_error(mock_redis):
+    """Redisの障害時は期限切れのキャッシュの値（なければ0）を返し、認証を止めないことをテスト"""
+    cache = TokenVersionCache(ttl=0, max_size=10)
+    cached_user_id = str(uuid.uuid4())
+    await mock_redis.set(f"token_version:{cached_user_id}", 2)
+    assert await cache.get(cached_user_id) == 2
+
+    with patch.object(mock_redis, "get", side_effect=ConnectionError("down")):
+        assert await cache.get(cached_user_id) == 2
+        assert await cache.get(str(uuid.uuid4())) == 0
+        # 発行時は古いバージョンのトークンを発行しないよう、例外をそのまま送出する
+        with pytest.raises(ConnectionError):
+            await cache.current(cached_user_id)
+    assert cache.stats()["errors"] == 2
+
+    db_user = _db_user()
+    token = await create_user_access_token(db_user)
+    with patch.object(mock_redis, "get", side_effect=ConnectionError("down")):
+        assert (await get_current_user(token, db=None)).id == db_user.id
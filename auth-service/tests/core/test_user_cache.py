@@ -0,0 +1,120 @@
+# ユーザーキャッシュのテスト
+import asyncio
+import json
+import uuid
+import pytest
+import pytest_asyncio
+import fakeredis.aioredis
+from datetime import datetime
+from unittest.mock import patch, AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis_client import redis_manager
+from app.core.user_cache import UserCache, user_cache
+from app.crud.user import user
+
+
+@pytest_asyncio.fixture
+async def mock_redis():
+    """fakeredisを共有Redisクライアントとして差し替える"""
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "_client", fake_redis):
+        yield fake_redis
+    user_cache.clear()
+
+
+def _row(username: str = None) -> dict:
+    """キャッシュに保存するユーザー情報"""
+    return {
+        "id": str(uuid.uuid4()),
+        "username": username or f"user_{uuid.uuid4().hex[:8]}",
+        "hashed_password": "$2b$12$hash",
+        "is_active": True,
+        "is_admin": False,
+        "created_at": datetime(2024, 1, 1).isoformat(),
+        "updated_at": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_password_hash_is_not_shared(mock_redis):
+    """パスワードハッシュがRedisに保存されず、プロセス内のキャッシュにのみ保持されることをテスト"""
+    cache = UserCache(local_ttl=60, local_max_size=10, redis_ttl=60)
+    row = _row()
+    await cache.set(row)
+
+    shared = json.loads(await mock_redis.get(f"user_cache:id:{row['id']}"))
+    assert "hashed_password" not in shared
+    assert (await cache.get_by_id(row["id"], with_password=True))["hashed_password"] == row["hashed_password"]
+
+    # 他のプロセスではRedisから取得できるが、パスワードハッシュが必要な場合は使用しない
+    other = UserCache(local_ttl=60, local_max_size=10, redis_ttl=60)
+    assert (await other.get_by_username(row["username"]))["id"] == row["id"]
+    assert await other.get_by_id(row["id"], with_password=True) is None
+    assert other.stats()["redis_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_fans_out_to_other_processes(mock_redis):
+    """無効化がRedisと他のプロセスのキャッシュに反映されることをテスト"""
+    cache = UserCache(local_ttl=60, local_max_size=10, redis_ttl=60)
+    other = UserCache(local_ttl=60, local_max_size=10, redis_ttl=60)
+    row = _row()
+    other.start()
+    try:
+        await asyncio.sleep(0.1)
+        await cache.set(row)
+        other._local_set(row)
+
+        await cache.invalidate(row["id"], [row["username"]])
+        await asyncio.sleep(0.5)
+
+        assert await mock_redis.get(f"user_cache:id:{row['id']}") is None
+        assert await other.get_by_id(row["id"]) is None
+        assert await other.get_by_username(row["username"]) is None
+    finally:
+        await other.stop()
+
+
+@pytest.mark.asyncio
+async def test_crud_returns_cached_user_without_query(mock_redis):
+    """キャッシュにあるユーザーをクエリなしでセッションに追加して返すことをテスト"""
+    row = _row()
+    await user_cache.set(row)
+    db = AsyncSession()
+    try:
+        with patch.object(db, "execute", new_callable=AsyncMock) as execute:
+            db_user = await user.get_by_username(db, row["username"], with_password=True)
+            execute.assert_not_called()
+
+        assert str(db_user.id) == row["id"]
+        assert db_user.hashed_password == row["hashed_password"]
+        assert db_user in db
+    finally:
+        await db.close()
+
+
+@pytest.mark.asyncio
+async def test_crud_skips_cache_after_write(mock_redis):
+    """書き込みを行ったセッションではキャッシュを使用しないことをテスト"""
+    row = _row()
+    await user_cache.set(row)
+    db = AsyncSession()
+    try:
+        db_user = await user.get_by_id(db, uuid.UUID(row["id"]))
+        updated = MagicMock()
+        updated.scalar_one_or_none.return_value = db_user
+        with patch("app.crud.user.get_password_hash_async", new_callable=AsyncMock, return_value="new-hash"), \
+             patch.object(db, "execute", new_callable=AsyncMock, return_value=updated):
+            await user.update_password(db, db_user, "new_password")
+
+        # キャッシュから削除されている
+        assert await user_cache.get_by_id(row["id"]) is None
+
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = None
+        with patch.object(db, "execute", new_callable=AsyncMock, return_value=result) as execute:
+            await user.get_by_id(db, uuid.UUID(row["id"]))
+            execute.assert_called_once()
+    finally:
+        await db.close()
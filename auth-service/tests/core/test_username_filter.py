@@ -0,0 +1,157 @@
+# ユーザー名フィルタのテスト
+import asyncio
+import time
+import uuid
+import pytest
+import pytest_asyncio
+import fakeredis.aioredis
+from unittest.mock import patch, AsyncMock
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis_client import redis_manager
+from app.core import username_filter as username_filter_module
+from app.core.username_filter import CountingBloomFilter, UsernameFilter, username_filter
+from app.crud.user import user
+
+
+@pytest_asyncio.fixture
+async def mock_redis():
+    """fakeredisを共有Redisクライアントとして差し替える"""
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "_client", fake_redis):
+        yield fake_redis
+    username_filter.clear()
+
+
+def _loader(usernames):
+    """指定したユーザー名を返すローダー"""
+    async def load():
+        for username in usernames:
+            yield username
+    return load
+
+
+def test_counting_bloom_filter_add_remove():
+    """追加した要素は必ず含まれ、削除すると含まれなくなることをテスト"""
+    bloom = CountingBloomFilter(capacity=1000, false_positive_rate=0.01)
+    items = [f"user_{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(bloom.might_contain(item) for item in items)
+    # 偽陽性率は設定値の数倍以内に収まる
+    false_positives = sum(bloom.might_contain(f"other_{i}") for i in range(10000))
+    assert false_positives / 10000 < 0.03
+    assert bloom.estimated_false_positive_rate < 0.03
+
+    for item in items[:500]:
+        assert bloom.remove(item) is True
+    # 削除していない要素は含まれたまま
+    assert all(bloom.might_contain(item) for item in items[500:])
+    assert bloom.count == 500
+
+
+def test_counting_bloom_filter_ignores_unknown_removal():
+    """追加されていない要素の削除で他の要素が失われないことをテスト"""
+    bloom = CountingBloomFilter(capacity=10, false_positive_rate=0.01)
+    bloom.add("alice")
+
+    assert bloom.remove("bob") is False
+    assert bloom.might_contain("alice")
+
+
+@pytest.mark.asyncio
+async def test_not_ready_filter_allows_everything(mock_redis):
+    """構築前は常に存在する可能性があると判定することをテスト"""
+    usernames = UsernameFilter(capacity=100, false_positive_rate=0.01, rebuild_interval=0)
+
+    assert usernames.ready is False
+    assert usernames.might_exist("anyone") is True
+
+
+@pytest.mark.asyncio
+async def test_rebuild_and_update(mock_redis):
+    """構築後は存在しないユーザー名を判定でき、追加・削除が反映されることをテスト"""
+    usernames = UsernameFilter(capacity=100, false_positive_rate=0.01, rebuild_interval=0)
+    usernames._loader = _loader(["alice", "bob"])
+    assert await usernames.rebuild() is True
+
+    assert usernames.might_exist("alice") is True
+    assert usernames.might_exist("carol") is False
+    await usernames.add(["carol"])
+    assert usernames.might_exist("carol") is True
+    await usernames.remove(["alice"])
+    assert usernames.might_exist("alice") is False
+
+    stats = usernames.stats()
+    assert stats["ready"] is True
+    assert stats["count"] == 2
+    assert stats["definite_misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_uncommitted_recent_adds(mock_redis):
+    """コミット前に追加されたユーザー名は、データベースにまだない状態で再構築しても残ることをテスト"""
+    usernames = UsernameFilter(capacity=100, false_positive_rate=0.01, rebuild_interval=0)
+    usernames._loader = _loader(["alice"])
+    assert await usernames.rebuild() is True
+
+    # create() がユーザー名を追加したが、再構築の読み込み時点ではまだコミットされていない
+    await usernames.add(["carol"])
+    assert await usernames.rebuild() is True
+    assert usernames.might_exist("carol") is True
+
+    # 保持期間を過ぎた追加は、データベースにない場合は再構築で除かれる
+    later = time.monotonic() + username_filter_module._RECENT_ADD_WINDOW + 1
+    with patch("app.core.username_filter.time.monotonic", return_value=later):
+        assert await usernames.rebuild() is True
+    assert usernames.might_exist("carol") is False
+
+
+@pytest.mark.asyncio
+async def test_updates_fan_out_to_other_processes(mock_redis):
+    """追加・削除が他のプロセスのフィルタに反映され、自分の通知は二重に反映されないことをテスト"""
+    local = UsernameFilter(capacity=100, false_positive_rate=0.01, rebuild_interval=0)
+    other = UsernameFilter(capacity=100, false_positive_rate=0.01, rebuild_interval=0)
+    local.start(_loader(["alice"]))
+    other.start(_loader(["alice"]))
+    try:
+        for _ in range(50):
+            if local.ready and other.ready:
+                break
+            await asyncio.sleep(0.05)
+        # 購読の開始を待つ
+        await asyncio.sleep(0.1)
+
+        await local.add(["dave"])
+        for _ in range(50):
+            if other.might_exist("dave"):
+                break
+            await asyncio.sleep(0.05)
+        assert other.might_exist("dave") is True
+        assert local.stats()["count"] == 2
+
+        await local.remove(["alice"])
+        for _ in range(50):
+            if not other.might_exist("alice"):
+                break
+            await asyncio.sleep(0.05)
+        assert other.might_exist("alice") is False
+    finally:
+        await local.stop()
+        await other.stop()
+
+
+@pytest.mark.asyncio
+async def test_crud_skips_query_for_unknown_username(mock_redis):
+    """確実に存在しないユーザー名ではデータベースに問い合わせないことをテスト"""
+    username_filter._loader = _loader(["alice"])
+    await username_filter.rebuild()
+    db = AsyncSession()
+    try:
+        with patch.object(db, "execute", new_callable=AsyncMock) as execute:
+            assert await user.get_by_username(db, f"nobody_{uuid.uuid4().hex[:8]}") is None
+            execute.assert_not_called()
+    finally:
+        await db.close()
+        username_filter._loader = None
@@ -0,0 +1,113 @@
+# ワーカープールのテスト
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+
+from app.core.worker_pool import BoundedWorkerPool, WorkerPoolFullError
+from app.core.security import get_password_hash_async, get_password_hashes_async, password_hash_pool, verify_password_async
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_and_records_stats():
+    """関数の結果が返され、統計情報が記録されることをテスト"""
+    pool = BoundedWorkerPool("test", kind="thread", max_workers=1, queue_size=1)
+    try:
+        result = await pool.run(sum, [1, 2, 3])
+        assert result == 6
+
+        stats = pool.stats()
+        assert stats["completed"] == 1
+        assert stats["rejected"] == 0
+        assert stats["in_flight"] == 0
+        assert stats["exec_time_max"] >= 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_rejects_when_queue_is_full():
+    """実行中と待機中の合計が上限に達した場合に即座に失敗することをテスト"""
+    pool = BoundedWorkerPool("test", kind="thread", max_workers=1, queue_size=1)
+    release = threading.Event()
+    try:
+        # 1件実行中、1件待機中にする
+        running = asyncio.create_task(pool.run(release.wait))
+        queued = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["queue_depth"] == 1
+
+        with pytest.raises(WorkerPoolFullError):
+            await pool.run(release.wait)
+        assert pool.stats()["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert pool.stats()["completed"] == 2
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_exceptions():
+    """ワーカー内の例外が呼び出し元に伝播することをテスト"""
+    pool = BoundedWorkerPool("test", kind="thread", max_workers=1, queue_size=1)
+    try:
+        with pytest.raises(ValueError):
+            await pool.run(int, "not-a-number")
+        assert pool.stats()["in_flight"] == 0
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async_roundtrip():
+    """非同期版のハッシュ化と検証が正しく動作することをテスト"""
+    hashed_password = await get_password_hash_async("testpassword123")
+
+    assert await verify_password_async("testpassword123", hashed_password) is True
+    assert await verify_password_async("wrongpassword", hashed_password) is False
+
+
+@pytest.mark.asyncio
+async def test_password_hashes_async_keeps_order():
+    """複数のパスワードを1件ずつ並列にハッシュ化し、入力と同じ順序で返すことをテスト"""
+    passwords = [f"password{i}" for i in range(password_hash_pool.max_workers * 3)]
+    in_flight = []
+    run = password_hash_pool.run
+
+    async def recording_run(fn, *args):
+        in_flight.append(password_hash_pool.stats()["in_flight"])
+        return await run(fn, *args)
+
+    with patch.object(password_hash_pool, "run", side_effect=recording_run):
+        hashed_passwords = await get_password_hashes_async(passwords)
+
+    assert len(hashed_passwords) == len(passwords)
+    for password, hashed in zip(passwords, hashed_passwords):
+        assert await verify_password_async(password, hashed) is True
+    # パスワードごとに1タスクとし、同時に投入するタスクはワーカー数まで
+    assert len(in_flight) == len(passwords)
+    assert max(in_flight) < password_hash_pool.max_workers
+    assert await get_password_hashes_async([]) == []
+
+
+@pytest.mark.asyncio
+async def test_password_hashes_async_stops_on_failure():
+    """ハッシュ化に失敗した場合、まだ投入していないパスワードは投入せずに例外を送出することをテスト"""
+    passwords = [f"password{i}" for i in range(password_hash_pool.max_workers * 3)]
+    calls = 0
+
+    async def failing_run(fn, *args):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        raise WorkerPoolFullError(password_hash_pool.name)
+
+    with patch.object(password_hash_pool, "run", side_effect=failing_run):
+        with pytest.raises(WorkerPoolFullError):
+            await get_password_hashes_async(passwords)
+        await asyncio.sleep(0.01)
+
+    assert calls < len(passwords)
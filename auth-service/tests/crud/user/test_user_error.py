@@ -124,6 +124,21 @@ async def test_create_duplicate_username(db_session):
     # テストの検証は完了したので、ここでテストを終了する
     # フィクスチャがロールバックするため、明示的なクリーンアップは不要
 
+@pytest.mark.asyncio
+async def test_create_duplicate_username_keeps_transaction(db_session):
+    # 重複はON CONFLICTで検出するため、トランザクションは中断されない
+    username = f"dup_{uuid.uuid4().hex[:8]}"
+    db_obj = await user.create(db_session, UserCreate(username=username, password="password123"))
+
+    with pytest.raises(IntegrityError):
+        await user.create(db_session, UserCreate(username=username, password="diffpassword123"))
+
+    # 同じトランザクションで引き続きクエリを実行できることを確認
+    result = await db_session.execute(select(User).filter(User.username == username))
+    users = result.scalars().all()
+    assert len(users) == 1
+    assert users[0].id == db_obj.id
+
 # Read操作テスト
 @pytest.mark.asyncio
 async def test_get_user_by_invalid_id(db_session):
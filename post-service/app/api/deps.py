@@ -1,10 +1,15 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from typing import Optional, Dict, Any
 from uuid import UUID
 
 from app.core.config import settings
+from app.core.keys import key_manager, KeyLoadError
+from app.core.jwks import jwks_client
+from app.core.token_cache import token_cache
+from app.core.token_codec import token_codec
+from app.core.revocation import revocation_list
 from app.db.session import get_db
 from app.crud.post import post
 from app.models.post import Post
@@ -17,24 +22,49 @@ async def verify_token(token: str) -> Optional[Dict[str, Any]]:
     """
     JWTトークンを検証し、ペイロードを返す関数
     
+    検証済みのトークンはexpまでキャッシュし、同じトークンの署名検証を繰り返さない。
+    検証鍵はヘッダーのkidでJWKSから選び、kidがない場合やJWKSを取得できない場合はローカルの公開鍵を使用する。
+    キャッシュ済みのトークンも含め、auth-serviceで無効化されたトークン（jti）は無効とする。
+    
     Args:
         token: 検証するJWTトークン
         
     Returns:
         Optional[Dict[str, Any]]: トークンが有効な場合はペイロード、無効な場合はNone
     """
+    payload = token_cache.get(token)
+    if payload is not None:
+        if await revocation_list.is_revoked(payload.get("jti")):
+            logger.warning("トークン検証失敗: 無効化されたトークンです")
+            return None
+        return payload
+    
     try:
-        # 公開鍵を使用してトークンを検証
-        payload = jwt.decode(
+        kid = token_codec.get_unverified_header(token).get("kid")
+        # ヘッダーは未検証のため、文字列以外のkidは不正なトークンとして扱う
+        if kid is not None and not isinstance(kid, str):
+            raise JWTError("Invalid kid")
+        key = await jwks_client.get_key(kid) if kid else None
+        if key is None:
+            # キャッシュ済みのローカルの公開鍵を使用
+            key = key_manager.get_verification_key()
+        payload = token_codec.decode(
             token, 
-            settings.PUBLIC_KEY, 
+            key, 
             algorithms=[settings.ALGORITHM]
         )
         logger.debug(f"トークン検証成功: {payload}")
+        token_cache.set(token, payload)
+        if await revocation_list.is_revoked(payload.get("jti")):
+            logger.warning("トークン検証失敗: 無効化されたトークンです")
+            return None
         return payload
     except JWTError as e:
         logger.error(f"トークン検証失敗: {e}")
         return None
+    except KeyLoadError as e:
+        logger.error(f"トークン検証失敗: 検証鍵がありません: {e}")
+        return None
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
     """
@@ -1,21 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from typing import List, Dict, Any, Literal, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_user_post
+from app.core.config import settings
+from app.core.feed_cache import feed_cache, FeedPage
+from app.core.pagination import (
+    encode_cursor, decode_cursor, encode_search_cursor, decode_search_cursor, InvalidCursorError
+)
 from app.db.session import get_db
 from app.crud.post import post
-from app.schemas.post import Post, PostCreate, PostUpdate
+from app.schemas.post import Post, PostCount, PostCreate, PostUpdate
 
 router = APIRouter()
 
+def _decode_cursor(cursor: Optional[str], decode=decode_cursor):
+    """
+    クエリパラメータのカーソルを復元する
+
+    Raises:
+        HTTPException: カーソルが不正な場合（400）
+    """
+    if cursor is None:
+        return None
+    try:
+        return decode(cursor)
+    except InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="不正なカーソルです"
+        )
+
+def _split_page(posts: List[Post], limit: int) -> Tuple[List[Post], Optional[str]]:
+    """1件多く取得した結果から次のページの有無を判定し、(ページ, 次のページのカーソル) を返す"""
+    if len(posts) > limit:
+        posts = posts[:limit]
+        return posts, encode_cursor(posts[-1].published_at, posts[-1].id)
+    return posts, None
+
+def _paginate(posts: List[Post], limit: int, response: Response) -> List[Post]:
+    """1件多く取得した結果から次のページの有無を判定し、X-Next-Cursor ヘッダーを設定する"""
+    posts, next_cursor = _split_page(posts, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return posts
+
 @router.get("/", response_model=List[Post])
 async def get_posts(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(settings.POST_LIST_DEFAULT_LIMIT, ge=1, le=settings.POST_LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="前のページの X-Next-Cursor ヘッダーの値"),
     published_only: bool = Query(True, description="公開済みの投稿のみを取得するかどうか")
 ):
     """
@@ -23,11 +60,28 @@ async def get_posts(
     
     - **認証**: 必須
     - **権限**: 認証されたユーザーであれば誰でも可能
+    - (published_at DESC, id) の順で limit 件ずつ返す
+    - 次のページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定して続きを取得する
+    - 公開済みの投稿の最初のページはキャッシュする（投稿の変更時に無効化する）
     """
+    after = _decode_cursor(cursor)
+    if published_only and feed_cache.enabled:
+        async def load_page() -> FeedPage:
+            # 全ユーザーに同じ内容を返すため、JSONに変換してキャッシュする
+            posts = await post.get_multi(db, limit=limit + 1, published_only=True, after=after)
+            posts, next_cursor = _split_page(posts, limit)
+            return [Post.model_validate(post_obj).model_dump(mode="json") for post_obj in posts], next_cursor
+        
+        posts, next_cursor = await feed_cache.get_page(limit, cursor, load_page)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return posts
+    
+    # 次のページの有無を判定するため1件多く取得する
     posts = await post.get_multi(
-        db, skip=skip, limit=limit, published_only=published_only
+        db, limit=limit + 1, published_only=published_only, after=after
     )
-    return posts
+    return _paginate(posts, limit, response)
 
 @router.post("/", response_model=Post, status_code=status.HTTP_201_CREATED)
 async def create_post(
@@ -45,6 +99,53 @@ async def create_post(
     post_obj = await post.create(db, obj_in=post_in, user_id=current_user["user_id"])
     return post_obj
 
+@router.get("/search", response_model=List[Post])
+async def search_posts(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="検索語"),
+    db: AsyncSession = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    limit: int = Query(settings.POST_LIST_DEFAULT_LIMIT, ge=1, le=settings.POST_LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="前のページの X-Next-Cursor ヘッダーの値")
+):
+    """
+    投稿のタイトルと本文を全文検索する
+    
+    - **認証**: 必須
+    - **権限**: 認証されたユーザーであれば誰でも可能
+    - **注意**: 公開済みの投稿と自分の未公開の投稿のみ検索対象
+    - 検索スコアの高い順に limit 件ずつ返す
+    - 次のページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定して続きを取得する
+    """
+    after = _decode_cursor(cursor, decode_search_cursor)
+    # 次のページの有無を判定するため1件多く取得する
+    rows = await post.search(
+        db, query=q, user_id=current_user["user_id"], limit=limit + 1, after=after
+    )
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_search_cursor(rows[-1][1], rows[-1][0].id)
+    return [post_obj for post_obj, _ in rows]
+
+@router.get("/count", response_model=PostCount)
+async def count_posts(
+    db: AsyncSession = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    mode: Literal["exact", "approximate"] = Query("exact", description="exact: 正確な件数, approximate: 統計情報からの推定値")
+):
+    """
+    全ユーザーの公開済みの投稿数を取得する
+    
+    - **認証**: 必須
+    - **権限**: 認証されたユーザーであれば誰でも可能
+    - **注意**: 統計情報がまだない場合は approximate でも正確な件数を返す（exact が true になる）
+    """
+    if mode == "approximate":
+        estimate = await post.estimate_published_count(db)
+        if estimate is not None:
+            return PostCount(count=estimate, exact=False)
+    return PostCount(count=await post.count_published(db))
+
 @router.get("/{post_id}", response_model=Post)
 async def get_post(
     *,
@@ -111,10 +212,11 @@ async def delete_post(
 async def get_user_posts(
     *,
     user_id: UUID,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(settings.POST_LIST_DEFAULT_LIMIT, ge=1, le=settings.POST_LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="前のページの X-Next-Cursor ヘッダーの値"),
     published_only: bool = Query(None, description="公開済みの投稿のみを取得するかどうか")
 ):
     """
@@ -123,13 +225,37 @@ async def get_user_posts(
     - **認証**: 必須
     - **権限**: 認証されたユーザーであれば誰でも可能
     - **注意**: 自分以外のユーザーの場合は公開済みの投稿のみ取得可能
+    - (published_at DESC, id) の順で limit 件ずつ返す（未公開の投稿は末尾）
+    - 次のページがある場合は X-Next-Cursor ヘッダーのカーソルを cursor に指定して続きを取得する
     """
     # 自分の投稿を取得する場合は、published_onlyのデフォルト値をFalseにする
     # 他のユーザーの投稿を取得する場合は、published_onlyのデフォルト値をTrueにする
     if published_only is None:
         published_only = user_id != current_user["user_id"]
     
+    after = _decode_cursor(cursor)
     posts = await post.get_by_user(
-        db, user_id=user_id, skip=skip, limit=limit, published_only=published_only
+        db, user_id=user_id, limit=limit + 1, published_only=published_only, after=after
     )
-    return posts
+    return _paginate(posts, limit, response)
+
+@router.get("/user/{user_id}/count", response_model=PostCount)
+async def count_user_posts(
+    *,
+    user_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    published_only: bool = Query(None, description="公開済みの投稿のみを数えるかどうか")
+):
+    """
+    特定ユーザーの投稿数を取得する
+    
+    - **認証**: 必須
+    - **権限**: 認証されたユーザーであれば誰でも可能
+    - **注意**: published_only を省略した場合、自分以外のユーザーは公開済みの投稿のみ数える
+    """
+    if published_only is None:
+        published_only = user_id != current_user["user_id"]
+    
+    count = await post.count_by_user(db, user_id=user_id, published_only=published_only)
+    return PostCount(count=count)
@@ -1,5 +1,6 @@
 import httpx
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
+from uuid import UUID
 from fastapi import HTTPException, status
 from app.core.config import settings
 from app.core.logging import app_logger as logger
@@ -146,6 +147,50 @@ class AuthClient:
                 detail="認証サービスに接続できません",
             )
     
+    async def get_users_batch(self, user_ids: Iterable[UUID], token: str) -> Dict[UUID, Dict[str, Any]]:
+        """
+        複数のユーザーの公開情報をまとめて取得する
+        
+        重複したIDは1つにまとめ、AUTH_USER_BATCH_SIZE 件ごとに1回のリクエストで取得する。
+        
+        Args:
+            user_ids: ユーザーIDのリスト（重複可）
+            token: 呼び出し元のアクセストークン
+            
+        Returns:
+            Dict[UUID, Dict[str, Any]]: ユーザーIDをキーとした公開情報（存在しないユーザーは含まない）
+            
+        Raises:
+            HTTPException: 取得に失敗した場合
+        """
+        ids = list(dict.fromkeys(UUID(str(user_id)) for user_id in user_ids))
+        users: Dict[UUID, Dict[str, Any]] = {}
+        batch_size = settings.AUTH_USER_BATCH_SIZE
+        try:
+            for start in range(0, len(ids), batch_size):
+                response = await self.client.post(
+                    f"{self.base_url}/users/batch",
+                    json={"ids": [str(user_id) for user_id in ids[start:start + batch_size]]},
+                    headers={"Authorization": f"Bearer {token}"}
+                )
+                
+                if response.status_code != 200:
+                    logger.error(f"auth-serviceでのユーザー一括取得失敗: status={response.status_code}")
+                    raise HTTPException(
+                        status_code=status.HTTP_502_BAD_GATEWAY,
+                        detail="ユーザー情報の取得に失敗しました",
+                    )
+                
+                for user_data in response.json():
+                    users[UUID(user_data["id"])] = user_data
+        except httpx.RequestError as e:
+            logger.error(f"auth-serviceへの接続エラー: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="認証サービスに接続できません",
+            )
+        return users
+    
     async def close(self):
         """
         HTTPクライアントを閉じる
@@ -35,11 +35,48 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: list = ["*"]
     
     # JWT設定
-    ALGORITHM: str = "RS256"
+    ALGORITHM: str = "RS256"  # auth-serviceと同じアルゴリズム（RS256 / ES256 / EdDSA）
+    # JWTの検証の実装（auth-serviceの scripts/benchmark_jwt.py で比較できる。pyjwtにはPyJWTが必要）
+    JWT_BACKEND: Literal["jose", "pyjwt", "cryptography"] = "cryptography"
     
     # 公開鍵のパス
     PUBLIC_KEY_PATH: str = "keys/public.pem"
     
+    # 公開鍵ファイルの更新確認間隔（秒）
+    KEY_RELOAD_CHECK_INTERVAL: float = 5.0
+    
+    # auth-serviceのJWKSエンドポイント（空の場合はPUBLIC_KEY_PATHの公開鍵のみを使用）
+    JWKS_URL: str = "http://auth-service:8080/api/v1/auth/.well-known/jwks.json"
+    JWKS_CACHE_TTL: float = 600.0  # 取得したJWKSを使用する期間（秒）
+    JWKS_REFRESH_INTERVAL: float = 300.0  # バックグラウンドでの再取得間隔（秒）
+    JWKS_MIN_REFRESH_INTERVAL: float = 10.0  # 未知のkidによる再取得の最小間隔（秒）
+    JWKS_FETCH_TIMEOUT: float = 5.0
+    
+    # 検証済みアクセストークンのキャッシュの最大エントリ数（0で無効）
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    
+    # 投稿一覧の1ページの件数（limit）のデフォルト値と上限
+    POST_LIST_DEFAULT_LIMIT: int = 100
+    POST_LIST_MAX_LIMIT: int = 500
+    
+    # auth-serviceのユーザー情報一括取得で1回に送るIDの最大数（auth-serviceのUSER_BATCH_MAX_IDS以下にする）
+    AUTH_USER_BATCH_SIZE: int = 500
+    
+    # 無効化済みアクセストークン（jti）の確認に使用するauth-serviceのRedis
+    # （例: redis://auth_redis:6379/0。空の場合は無効化を確認しない）
+    REVOCATION_REDIS_URL: str = ""
+    REVOCATION_REDIS_SOCKET_TIMEOUT: float = 5.0
+    REVOCATION_FILTER_CAPACITY: int = 100000  # 想定する有効期限内の無効化済みトークン数
+    REVOCATION_FILTER_FALSE_POSITIVE_RATE: float = 0.001
+    REVOCATION_FILTER_REBUILD_INTERVAL: float = 300.0  # 定期的な再構築の間隔（秒、0で無効）
+    
+    # 公開済み投稿の一覧（GET /posts/）の最初のページのキャッシュに使用するRedis
+    # （例: redis://post_redis:6379/0。空の場合はキャッシュしない）
+    FEED_CACHE_REDIS_URL: str = ""
+    FEED_CACHE_REDIS_SOCKET_TIMEOUT: float = 1.0
+    FEED_CACHE_PAGES: int = 3  # キャッシュする先頭からのページ数
+    FEED_CACHE_TTL: int = 60  # キャッシュの有効期間（秒。世代番号の更新に失敗した場合に古いページを返す最大の期間）
+    
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
@@ -0,0 +1,101 @@
+from typing import Any, Dict, Union
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    PrivateFormat,
+    PublicFormat,
+    NoEncryption,
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jose import jwk
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+from jose.utils import base64url_decode, base64url_encode
+
+
+class EdDSAKey(Key):
+    """
+    Ed25519（EdDSA, RFC 8037）の署名・検証を行うjoseのKey
+
+    python-joseはEdDSAに対応していないため、cryptographyで実装して jwk.register_key で登録する。
+    登録後は jwt.encode / jwt.decode で algorithm="EdDSA" を他のアルゴリズムと同様に使用できる。
+    """
+
+    def __init__(self, key: Union[str, bytes, Dict[str, Any], Any], algorithm: str):
+        if algorithm != "EdDSA":
+            raise JWKError(f"EdDSAKeyは {algorithm} に使用できません")
+        self._algorithm = algorithm
+
+        if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+            self._key = key
+        elif isinstance(key, dict):
+            self._key = self._from_jwk(key)
+        else:
+            self._key = self._from_pem(key.encode("utf-8") if isinstance(key, str) else key)
+
+    @staticmethod
+    def _from_jwk(data: Dict[str, Any]) -> Any:
+        if data.get("kty") != "OKP" or data.get("crv") != "Ed25519":
+            raise JWKError("Ed25519のJWKではありません")
+        if "d" in data:
+            return ed25519.Ed25519PrivateKey.from_private_bytes(base64url_decode(data["d"].encode("ascii")))
+        return ed25519.Ed25519PublicKey.from_public_bytes(base64url_decode(data["x"].encode("ascii")))
+
+    @staticmethod
+    def _from_pem(pem: bytes) -> Any:
+        try:
+            if b"PRIVATE KEY" in pem:
+                key = load_pem_private_key(pem, password=None)
+            else:
+                key = load_pem_public_key(pem)
+        except ValueError as e:
+            raise JWKError(f"鍵のパースに失敗しました: {e}") from e
+        if not isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+            raise JWKError("Ed25519の鍵ではありません")
+        return key
+
+    def is_public(self) -> bool:
+        return isinstance(self._key, ed25519.Ed25519PublicKey)
+
+    def sign(self, msg: bytes) -> bytes:
+        if self.is_public():
+            raise JWKError("公開鍵では署名できません")
+        return self._key.sign(msg)
+
+    def verify(self, msg: bytes, sig: bytes) -> bool:
+        public_key = self._key if self.is_public() else self._key.public_key()
+        try:
+            public_key.verify(sig, msg)
+            return True
+        except InvalidSignature:
+            return False
+
+    def public_key(self) -> "EdDSAKey":
+        if self.is_public():
+            return self
+        return EdDSAKey(self._key.public_key(), self._algorithm)
+
+    def to_pem(self) -> bytes:
+        if self.is_public():
+            return self._key.public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+        return self._key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+
+    def to_dict(self) -> Dict[str, str]:
+        public_key = self._key if self.is_public() else self._key.public_key()
+        data = {
+            "alg": self._algorithm,
+            "kty": "OKP",
+            "crv": "Ed25519",
+            "x": base64url_encode(public_key.public_bytes(Encoding.Raw, PublicFormat.Raw)).decode("ascii"),
+        }
+        if not self.is_public():
+            raw = self._key.private_bytes(Encoding.Raw, PrivateFormat.Raw, NoEncryption())
+            data["d"] = base64url_encode(raw).decode("ascii")
+        return data
+
+
+# joseにEdDSAを登録する
+jwk.register_key("EdDSA", EdDSAKey)
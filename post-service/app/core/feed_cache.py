@@ -0,0 +1,174 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+from app.core.redis_client import feed_cache_redis
+
+# 公開済み投稿の一覧のキャッシュのRedisキー
+# feed_cache:generation -> 世代番号（公開済みの投稿が変更されるたびに1増やす）
+# feed_cache:page:{limit}:{cursor} -> ページ（JSON: generation, page, posts, next_cursor）
+# feed_cache:depth:{limit}:{cursor} -> カーソルが指すページの番号（JSON: generation, page）
+FEED_GENERATION_KEY = "feed_cache:generation"
+FEED_PAGE_PREFIX = "feed_cache:page:"
+FEED_DEPTH_PREFIX = "feed_cache:depth:"
+
+# 1ページ分の投稿（JSONに変換済み）と次のページのカーソル
+FeedPage = Tuple[List[Dict[str, Any]], Optional[str]]
+
+
+class FeedCache:
+    """
+    公開済み投稿の一覧（GET /posts/?published_only=true）の最初のページのキャッシュ
+
+    全ユーザーに同じ内容を返すため、先頭から pages ページまでをRedisで共有する。
+    各ページには取得前に読んだ世代番号を保存し、現在の世代番号と一致するものだけを使用する。
+    公開済みの投稿が変更されたら invalidate() で世代番号を上げ、すべてのページを一括で無効にする
+    （古いページはTTLで削除される）。取得中に世代番号が上がった場合、そのページは使用されない。
+
+    同じページのキャッシュミスが同時に発生した場合は、プロセス内で1回だけデータベースから取得し、
+    結果を共有する（single-flight）。Redisの障害時はキャッシュを使用しない。
+    """
+
+    def __init__(self, pages: int, ttl: int):
+        self.pages = pages
+        self.ttl = ttl
+        self._in_flight: Dict[Tuple[int, int, Optional[str]], asyncio.Future] = {}
+
+        # 統計情報
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._uncached = 0
+        self._errors = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return feed_cache_redis.enabled and self.pages > 0
+
+    @staticmethod
+    def _keys(limit: int, cursor: Optional[str]) -> Tuple[str, str]:
+        suffix = f"{limit}:{cursor or ''}"
+        return f"{FEED_PAGE_PREFIX}{suffix}", f"{FEED_DEPTH_PREFIX}{suffix}"
+
+    @staticmethod
+    def _current(value: Optional[bytes], generation: int) -> Optional[Dict[str, Any]]:
+        if value is None:
+            return None
+        entry = json.loads(value)
+        return entry if entry["generation"] == generation else None
+
+    async def get_page(
+        self, limit: int, cursor: Optional[str], loader: Callable[[], Awaitable[FeedPage]]
+    ) -> FeedPage:
+        """
+        公開済み投稿の一覧の1ページを取得する
+
+        Args:
+            limit: 1ページの件数
+            cursor: 前のページの次のページのカーソル（最初のページの場合はNone）
+            loader: データベースから1ページを取得する関数（キャッシュにない場合に呼び出す）
+
+        Returns:
+            FeedPage: (投稿のリスト, 次のページのカーソル)
+        """
+        if not self.enabled:
+            return await loader()
+
+        page_key, depth_key = self._keys(limit, cursor)
+        try:
+            generation, page, depth = await feed_cache_redis.client.mget(
+                FEED_GENERATION_KEY, page_key, depth_key
+            )
+            generation = int(generation or 0)
+            entry = self._current(page, generation)
+            marker = self._current(depth, generation) if cursor is not None else {"page": 1}
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"投稿一覧のキャッシュの読み込みに失敗しました: {e}")
+            return await loader()
+
+        if entry is not None:
+            self._hits += 1
+            return entry["posts"], entry["next_cursor"]
+
+        # キャッシュしたページのカーソルから辿れる、先頭から pages ページまでのみキャッシュする
+        if marker is None or marker["page"] > self.pages:
+            self._uncached += 1
+            return await loader()
+
+        self._misses += 1
+        key = (generation, limit, cursor)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except Exception:
+                # 先に取得を始めたリクエストが失敗した場合は自分で取得する
+                return await loader()
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await loader()
+        except BaseException as e:
+            future.set_exception(RuntimeError(f"投稿一覧の取得に失敗しました: {e!r}"))
+            # 待っているリクエストがない場合に未取得の例外として警告されないようにする
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(result)
+
+        await self._store(limit, generation, marker["page"], page_key, result)
+        return result
+
+    async def _store(self, limit: int, generation: int, page: int, page_key: str, result: FeedPage) -> None:
+        posts, next_cursor = result
+        try:
+            async with feed_cache_redis.client.pipeline(transaction=False) as pipe:
+                pipe.set(
+                    page_key,
+                    json.dumps({"generation": generation, "page": page, "posts": posts, "next_cursor": next_cursor}),
+                    ex=self.ttl,
+                )
+                if next_cursor is not None and page < self.pages:
+                    pipe.set(
+                        self._keys(limit, next_cursor)[1],
+                        json.dumps({"generation": generation, "page": page + 1}),
+                        ex=self.ttl,
+                    )
+                await pipe.execute()
+        except Exception as e:
+            self._errors += 1
+            logger.warning(f"投稿一覧のキャッシュの保存に失敗しました: {e}")
+
+    async def invalidate(self) -> None:
+        """世代番号を上げ、すべてのプロセスのキャッシュしたページを無効にする"""
+        if not self.enabled:
+            return
+        self._invalidations += 1
+        try:
+            await feed_cache_redis.client.incr(FEED_GENERATION_KEY)
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"投稿一覧のキャッシュの無効化に失敗しました: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """ヒット数、ミス数などの統計情報を返す"""
+        return {
+            "enabled": self.enabled,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "uncached": self._uncached,
+            "errors": self._errors,
+            "invalidations": self._invalidations,
+        }
+
+
+# アプリケーション全体で共有する公開済み投稿の一覧のキャッシュ
+feed_cache = FeedCache(pages=settings.FEED_CACHE_PAGES, ttl=settings.FEED_CACHE_TTL)
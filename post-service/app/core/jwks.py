@@ -0,0 +1,150 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from jose import jwk
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+# EdDSAをjoseに登録する
+from app.core import eddsa  # noqa: F401
+
+
+class JWKSClient:
+    """
+    auth-serviceが公開するJWKSを取得してキャッシュするクライアント
+
+    取得した鍵はkidごとに保持し、JWKS_CACHE_TTL 秒を過ぎたら再取得する。
+    lifespanで start() するとバックグラウンドで定期的に再取得するため、
+    リクエスト処理中にJWKSを取得することは通常ない。
+    未知のkidのトークンを受け取った場合は、JWKS_MIN_REFRESH_INTERVAL 秒に1回まで再取得を試みる。
+    取得に失敗した場合は、それまでに取得した鍵を引き続き使用する。
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._keys: Dict[str, Key] = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # 統計情報
+        self._refreshes = 0
+        self._failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    def _is_fresh(self) -> bool:
+        return self._fetched_at is not None and time.monotonic() - self._fetched_at < settings.JWKS_CACHE_TTL
+
+    async def refresh(self) -> bool:
+        """
+        JWKSを取得して鍵を更新する
+
+        Returns:
+            bool: 取得に成功した場合はTrue
+        """
+        async with self._lock:
+            self._attempted_at = time.monotonic()
+            if self._client is None:
+                self._client = httpx.AsyncClient(timeout=settings.JWKS_FETCH_TIMEOUT)
+            try:
+                response = await self._client.get(self.url)
+                response.raise_for_status()
+                keys: Dict[str, Key] = {}
+                for key_data in response.json().get("keys", []):
+                    kid = key_data.get("kid")
+                    if not kid:
+                        continue
+                    try:
+                        keys[kid] = jwk.construct(key_data, key_data.get("alg", settings.ALGORITHM))
+                    except JWKError as e:
+                        logger.warning(f"JWKSの鍵を読み込めません: kid={kid}: {e}")
+            except (httpx.HTTPError, ValueError) as e:
+                self._failures += 1
+                logger.error(f"JWKSの取得に失敗しました: {self.url}: {e}")
+                return False
+
+            if not keys:
+                self._failures += 1
+                logger.error(f"JWKSに使用できる鍵がありません: {self.url}")
+                return False
+
+            if set(keys) != set(self._keys):
+                logger.info(f"JWKSを更新しました: kids={sorted(keys)}")
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            self._refreshes += 1
+            return True
+
+    async def get_key(self, kid: str) -> Optional[Key]:
+        """
+        kidに対応する検証鍵を取得する
+
+        Args:
+            kid: トークンのヘッダーのkid
+
+        Returns:
+            Optional[Key]: 対応する鍵。見つからない場合、kidが文字列でない場合はNone
+        """
+        if not self.enabled or not isinstance(kid, str):
+            return None
+
+        key = self._keys.get(kid)
+        if key is not None and self._is_fresh():
+            return key
+
+        # キャッシュの期限切れ、または未知のkidの場合は再取得する（頻度は制限する）
+        if self._attempted_at is None or time.monotonic() - self._attempted_at >= settings.JWKS_MIN_REFRESH_INTERVAL:
+            await self.refresh()
+
+        return self._keys.get(kid)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JWKS_REFRESH_INTERVAL)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"JWKSの定期更新中にエラーが発生しました: {e}", exc_info=True)
+
+    async def start(self) -> None:
+        """JWKSを取得し、バックグラウンドでの定期更新を開始する"""
+        if not self.enabled or self._task is not None:
+            return
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """バックグラウンドでの定期更新を停止し、HTTPクライアントを閉じる"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        """保持している鍵のkidと取得の統計情報を返す"""
+        return {
+            "url": self.url,
+            "kids": sorted(self._keys),
+            "age": time.monotonic() - self._fetched_at if self._fetched_at is not None else None,
+            "refreshes": self._refreshes,
+            "failures": self._failures,
+        }
+
+
+# アプリケーション全体で共有するJWKSクライアント
+jwks_client = JWKSClient(settings.JWKS_URL)
@@ -0,0 +1,111 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+from jose import jwk
+from jose.backends.base import Key
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+# EdDSAをjoseに登録する
+from app.core import eddsa  # noqa: F401
+
+
+class KeyLoadError(RuntimeError):
+    """鍵の読み込みまたはパースに失敗した場合の例外"""
+
+
+@dataclass
+class _CachedKey:
+    """パース済みの鍵とその読み込み元の情報"""
+    path: str
+    mtime: Optional[float]
+    pem: bytes
+    key: Any
+    loaded_at: float
+    checked_at: float
+    # アルゴリズムごとのjoseのKeyオブジェクト
+    jose_keys: Dict[str, Key] = field(default_factory=dict)
+
+
+class KeyManager:
+    """
+    JWT検証用の公開鍵をキャッシュして管理するクラス
+
+    PEMファイルの読み込みとパースは初回のみ行い、以降はパース済みの鍵オブジェクトを再利用する。
+    ファイルの更新時刻(mtime)が変わった場合、または reload() が呼ばれた場合にのみ再読み込みする。
+    mtimeの確認は KEY_RELOAD_CHECK_INTERVAL 秒に1回までに抑える。
+    """
+
+    def __init__(self):
+        self._public: Optional[_CachedKey] = None
+
+    def _public_entry(self) -> _CachedKey:
+        path = settings.PUBLIC_KEY_PATH
+        cached = self._public
+        now = time.monotonic()
+
+        # パスが変わっていない場合は一定間隔でのみmtimeを確認する
+        if cached is not None and cached.path == path:
+            if now - cached.checked_at < settings.KEY_RELOAD_CHECK_INTERVAL:
+                return cached
+            try:
+                mtime = os.stat(path).st_mtime
+            except FileNotFoundError:
+                mtime = None
+            cached.checked_at = now
+            if mtime == cached.mtime:
+                return cached
+
+        try:
+            with open(path, "rb") as f:
+                mtime = os.fstat(f.fileno()).st_mtime
+                pem = f.read()
+        except FileNotFoundError:
+            logger.warning(f"公開鍵ファイルが見つかりません: {path}")
+            pem = os.environ.get("PUBLIC_KEY", "").encode("utf-8")
+            mtime = None
+
+        if not pem:
+            raise KeyLoadError(f"公開鍵が見つかりません: {path}")
+
+        try:
+            key = load_pem_public_key(pem)
+        except ValueError as e:
+            raise KeyLoadError(f"公開鍵のパースに失敗しました: {path}: {e}") from e
+
+        logger.info(f"公開鍵を読み込みました: {path}")
+        self._public = _CachedKey(path=path, mtime=mtime, pem=pem, key=key, loaded_at=time.time(), checked_at=now)
+        return self._public
+
+    @property
+    def public_key(self) -> Any:
+        """パース済みの公開鍵（cryptographyの鍵オブジェクト）"""
+        return self._public_entry().key
+
+    def get_verification_key(self, algorithm: Optional[str] = None) -> Key:
+        """検証に使用するjoseのKeyオブジェクトを取得する"""
+        entry = self._public_entry()
+        algorithm = algorithm or settings.ALGORITHM
+        jose_key = entry.jose_keys.get(algorithm)
+        if jose_key is None:
+            jose_key = jwk.construct(entry.pem, algorithm)
+            entry.jose_keys[algorithm] = jose_key
+        return jose_key
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        キャッシュを破棄して公開鍵を強制的に再読み込みする
+
+        Returns:
+            Dict[str, Any]: 読み込んだ鍵のパスと読み込み時刻
+        """
+        self._public = None
+        entry = self._public_entry()
+        return {"public_key_path": entry.path, "public_key_loaded_at": entry.loaded_at}
+
+
+# アプリケーション全体で共有する鍵マネージャー
+key_manager = KeyManager()
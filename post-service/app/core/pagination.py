@@ -0,0 +1,101 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """ページネーションのカーソルが不正な場合の例外"""
+
+
+def _encode(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _decode(cursor: str) -> List[Any]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    values = json.loads(raw)
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("カーソルの形式が不正です")
+    return values
+
+
+def _uuid(value: Any) -> UUID:
+    # UUID() は文字列以外では AttributeError などを送出するため、先に型を確認する
+    if not isinstance(value, str):
+        raise TypeError("IDが文字列ではありません")
+    return UUID(value)
+
+
+def encode_cursor(published_at: Optional[datetime], id: UUID) -> str:
+    """
+    キーセットページネーションのカーソルを作成する
+
+    Args:
+        published_at: ページの最後の投稿の公開日時（非公開の投稿の場合はNone）
+        id: ページの最後の投稿のID
+
+    Returns:
+        str: URLセーフなBase64でエンコードしたカーソル
+    """
+    return _encode([published_at.isoformat() if published_at is not None else None, str(id)])
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], UUID]:
+    """
+    キーセットページネーションのカーソルを復元する
+
+    Args:
+        cursor: encode_cursor で作成したカーソル
+
+    Returns:
+        Tuple[Optional[datetime], UUID]: 前のページの最後の投稿の (公開日時, ID)
+
+    Raises:
+        InvalidCursorError: カーソルが不正な場合
+    """
+    try:
+        published_at, id = _decode(cursor)
+        if published_at is not None and not isinstance(published_at, str):
+            raise TypeError("公開日時が文字列ではありません")
+        return (datetime.fromisoformat(published_at) if published_at is not None else None), _uuid(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"不正なカーソルです: {cursor}") from e
+
+
+def encode_search_cursor(rank: float, id: UUID) -> str:
+    """
+    検索結果のキーセットページネーションのカーソルを作成する
+
+    Args:
+        rank: ページの最後の投稿の検索スコア
+        id: ページの最後の投稿のID
+
+    Returns:
+        str: URLセーフなBase64でエンコードしたカーソル
+    """
+    return _encode([rank, str(id)])
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, UUID]:
+    """
+    検索結果のキーセットページネーションのカーソルを復元する
+
+    Args:
+        cursor: encode_search_cursor で作成したカーソル
+
+    Returns:
+        Tuple[float, UUID]: 前のページの最後の投稿の (検索スコア, ID)
+
+    Raises:
+        InvalidCursorError: カーソルが不正な場合
+    """
+    try:
+        rank, id = _decode(cursor)
+        if isinstance(rank, bool) or not isinstance(rank, (int, float)):
+            raise TypeError("検索スコアが数値ではありません")
+        return float(rank), _uuid(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"不正なカーソルです: {cursor}") from e
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+
+
+class RedisClientManager:
+    """
+    Redisへの共有クライアント（接続プール）を管理するクラス
+
+    URLが空の場合は使用しない（enabled が False になる）。
+    """
+
+    def __init__(self, url: str, socket_timeout: float, name: str):
+        self.url = url
+        self.socket_timeout = socket_timeout
+        self.name = name
+        self._client: Optional[redis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    @property
+    def client(self) -> redis.Redis:
+        """共有Redisクライアントを取得する（初回アクセス時に作成する）"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        # 接続はイベントループに紐づくため、ループが変わった場合は作り直す
+        if self._client is not None and (self._loop is None or loop is None or self._loop is loop):
+            return self._client
+
+        self._client = redis.Redis.from_url(
+            self.url,
+            socket_timeout=self.socket_timeout,
+            socket_connect_timeout=self.socket_timeout,
+        )
+        self._loop = loop
+        logger.info(f"Redis connection pool created for {self.name}")
+        return self._client
+
+    async def close(self) -> None:
+        """クライアントを閉じる"""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+
+# auth-serviceのRedis（無効化済みアクセストークンの確認にのみ使用する。読み取りと購読のみ）
+redis_manager = RedisClientManager(
+    settings.REVOCATION_REDIS_URL, settings.REVOCATION_REDIS_SOCKET_TIMEOUT, "token revocation"
+)
+
+# post-serviceのRedis（公開済み投稿の一覧のキャッシュに使用する）
+feed_cache_redis = RedisClientManager(
+    settings.FEED_CACHE_REDIS_URL, settings.FEED_CACHE_REDIS_SOCKET_TIMEOUT, "feed cache"
+)
@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import math
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import app_logger as logger
+from app.core.redis_client import redis_manager
+
+# auth-serviceが無効化したアクセストークンのRedisキーと通知チャンネル
+# （auth-serviceの app/core/revocation.py と同じ値にする）
+REVOKED_JTI_PREFIX = "revoked_jti:"
+REVOCATION_CHANNEL = "revoked_jti:events"
+
+
+class BloomFilter:
+    """
+    Bloomフィルタ
+
+    might_contain が False の要素は確実に含まれない。True の場合は含まれる可能性がある。
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def might_contain(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """
+    auth-serviceが無効化したアクセストークン（jti）の一覧
+
+    無効化したjtiをプロセス内のBloomフィルタに保持し、フィルタに含まれないjtiはRedisに問い合わせずに
+    「無効化されていない」と判定する。フィルタに含まれる可能性がある場合のみRedisで確認する。
+
+    auth-serviceからの無効化の通知をRedisのpub/subで受け取り、購読の開始時と定期的に
+    Redisの revoked_jti:* から再構築する（期限切れのjtiもここで除かれる）。
+    構築が完了するまでは毎回Redisで確認する。Redisの障害時は無効化されていないものとして扱う。
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float, rebuild_interval: float):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.rebuild_interval = rebuild_interval
+        self._filter: Optional[BloomFilter] = None
+        # 構築中に受け取ったjti（構築後のフィルタにも追加する）
+        self._added_while_building: Optional[List[str]] = None
+        self._build_lock = asyncio.Lock()
+        self._tasks: List[asyncio.Task] = []
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+        # 統計情報
+        self._local_negatives = 0
+        self._redis_checks = 0
+        self._revoked_hits = 0
+        self._errors = 0
+        self._rebuilds = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def _add_local(self, jti: str) -> None:
+        if self._filter is not None:
+            self._filter.add(jti)
+        if self._added_while_building is not None:
+            self._added_while_building.append(jti)
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        """
+        アクセストークンが無効化されているかを判定する
+
+        Args:
+            jti: トークンのjti（jtiを含まない旧形式のトークンの場合はNone）
+
+        Returns:
+            bool: 無効化されている場合はTrue（Redisを使用しない設定の場合は常にFalse）
+        """
+        if not jti or not redis_manager.enabled:
+            return False
+        if self._filter is not None and not self._filter.might_contain(jti):
+            self._local_negatives += 1
+            return False
+
+        self._redis_checks += 1
+        try:
+            revoked = await redis_manager.client.exists(f"{REVOKED_JTI_PREFIX}{jti}") > 0
+        except Exception as e:
+            self._errors += 1
+            logger.error(f"アクセストークンの無効化の確認に失敗しました: {e}")
+            return False
+        if revoked:
+            self._revoked_hits += 1
+        return revoked
+
+    async def rebuild(self) -> bool:
+        """
+        Redisの無効化済みのjtiからフィルタを構築する
+
+        Returns:
+            bool: 構築に成功した場合はTrue
+        """
+        async with self._build_lock:
+            self._added_while_building = []
+            try:
+                new_filter = BloomFilter(self.capacity, self.false_positive_rate)
+                async for key in redis_manager.client.scan_iter(match=f"{REVOKED_JTI_PREFIX}*", count=1000):
+                    new_filter.add(key.decode("utf-8")[len(REVOKED_JTI_PREFIX):])
+                for jti in self._added_while_building:
+                    new_filter.add(jti)
+            except Exception as e:
+                logger.error(f"無効化済みトークンのフィルタの構築に失敗しました: {e}")
+                return False
+            finally:
+                self._added_while_building = None
+
+            self._filter = new_filter
+            self._rebuilds += 1
+            logger.info(f"無効化済みトークンのフィルタを構築しました: 件数={new_filter.count}")
+            return True
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_manager.client.pubsub()
+            try:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                # 購読を開始する前の通知は受け取れないため、購読を開始してから構築する
+                self._rebuild_task = asyncio.create_task(self.rebuild())
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None or message["type"] != "message":
+                        continue
+                    self._add_local(message["data"].decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"アクセストークンの無効化の受信に失敗しました: {e}")
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    async def _rebuild_loop(self) -> None:
+        # 期限切れで削除されたjtiをフィルタから除く
+        while True:
+            await asyncio.sleep(self.rebuild_interval)
+            await self.rebuild()
+
+    def start(self) -> None:
+        """フィルタの構築とauth-serviceからの無効化の受信を開始する"""
+        if not redis_manager.enabled or self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._listen())]
+        if self.rebuild_interval > 0:
+            self._tasks.append(asyncio.create_task(self._rebuild_loop()))
+
+    async def stop(self) -> None:
+        """無効化の受信と定期的な再構築を停止する"""
+        tasks = self._tasks + ([self._rebuild_task] if self._rebuild_task is not None else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._rebuild_task = None
+
+    def clear(self) -> None:
+        """フィルタを破棄する（再構築するまで毎回Redisで確認する）"""
+        self._filter = None
+
+    def stats(self) -> Dict[str, Any]:
+        """件数、Redisへの問い合わせ回数などの統計情報を返す"""
+        return {
+            "enabled": redis_manager.enabled,
+            "ready": self.ready,
+            "count": self._filter.count if self._filter else 0,
+            "local_negatives": self._local_negatives,
+            "redis_checks": self._redis_checks,
+            "revoked_hits": self._revoked_hits,
+            "errors": self._errors,
+            "rebuilds": self._rebuilds,
+        }
+
+
+# アプリケーション全体で共有する無効化済みトークンの一覧
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    false_positive_rate=settings.REVOCATION_FILTER_FALSE_POSITIVE_RATE,
+    rebuild_interval=settings.REVOCATION_FILTER_REBUILD_INTERVAL,
+)
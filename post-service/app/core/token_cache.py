@@ -0,0 +1,99 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class TokenCache:
+    """
+    検証済みアクセストークンのペイロードを保持するLRUキャッシュ
+
+    キーはトークンのSHA-256ダイジェストとし、トークン本体はメモリに保持しない。
+    エントリはトークンの exp まで有効で、max_size を超えた場合は最も古く使われたものから削除する。
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # 統計情報
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        キャッシュからトークンのペイロードを取得する
+
+        Args:
+            token: JWTアクセストークン
+
+        Returns:
+            Optional[Dict[str, Any]]: 有効なエントリがある場合はペイロードのコピー、ない場合はNone
+        """
+        key = self._digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            # 有効期限切れのエントリは削除する
+            del self._entries[key]
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return dict(payload)
+
+    def set(self, token: str, payload: Dict[str, Any]) -> None:
+        """
+        検証済みのペイロードをキャッシュに保存する
+
+        exp を含まないペイロードは保存しない。
+
+        Args:
+            token: JWTアクセストークン
+            payload: 検証済みのペイロード
+        """
+        if self.max_size <= 0:
+            return
+
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+
+        key = self._digest(token)
+        self._entries[key] = (float(exp), dict(payload))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        """すべてのエントリを削除する"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """エントリ数、ヒット数、ミス数などの統計情報を返す"""
+        lookups = self._hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+
+# アプリケーション全体で共有する検証済みトークンのキャッシュ
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_MAX_SIZE)
@@ -1,14 +1,75 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from sqlalchemy.sql import func
-from typing import List, Optional, Dict, Any
+from sqlalchemy import select, update, delete, and_, or_, literal_column, text, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.sql import func, Select
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import datetime
 
-from app.models.post import Post
+from app.core.feed_cache import feed_cache
+from app.models.post import Post, PostCounter, ALL_USERS_ID, SEARCH_CONFIG
 from app.schemas.post import PostCreate, PostUpdate
 
 class PostCRUD:
+    @staticmethod
+    def _keyset(
+        query: Select, after: Optional[Tuple[Optional[datetime.datetime], UUID]], published_only: bool
+    ) -> Select:
+        """
+        (published_at DESC NULLS LAST, id) の順に並べ、前のページの最後の行より後ろの行に絞り込む
+
+        Args:
+            query: 投稿を取得するクエリ
+            after: 前のページの最後の行の (published_at, id)。最初のページの場合はNone
+            published_only: 公開済みの投稿のみを取得するかどうか（未公開の投稿は末尾に並ぶ）
+
+        Returns:
+            並び順と絞り込みを追加したクエリ
+        """
+        if after is not None:
+            published_at, id = after
+            if published_at is None:
+                # 未公開の投稿（published_atがNULL）の途中から
+                query = query.where(Post.published_at.is_(None), Post.id > id)
+            else:
+                condition = and_(
+                    Post.published_at <= published_at,
+                    or_(Post.published_at < published_at, Post.id > id),
+                )
+                if not published_only:
+                    condition = or_(condition, Post.published_at.is_(None))
+                query = query.where(condition)
+        return query.order_by(Post.published_at.desc().nulls_last(), Post.id)
+
+    @staticmethod
+    async def _adjust_counts(
+        db: AsyncSession, user_id: UUID, *, post_delta: int = 0, published_delta: int = 0
+    ) -> None:
+        """
+        投稿数を増減する（コミットは呼び出し元で行い、投稿の変更と同じトランザクションで反映する）
+
+        Args:
+            db: データベースセッション
+            user_id: 投稿者のユーザーID
+            post_delta: ユーザーの投稿数の増減
+            published_delta: ユーザーと全体の公開済みの投稿数の増減
+        """
+        # デッドロックしないように、ユーザーの行、全体の行の順に更新する
+        rows = [(user_id, post_delta, published_delta)]
+        if published_delta:
+            rows.append((ALL_USERS_ID, 0, published_delta))
+        for key, posts, published in rows:
+            stmt = pg_insert(PostCounter).values(user_id=key, post_count=posts, published_count=published)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PostCounter.user_id],
+                set_={
+                    "post_count": PostCounter.post_count + posts,
+                    "published_count": PostCounter.published_count + published,
+                    "updated_at": func.now(),
+                },
+            )
+            await db.execute(stmt)
+
     async def create(self, db: AsyncSession, *, obj_in: PostCreate, user_id: UUID) -> Post:
         """
         新しい投稿を作成する
@@ -29,7 +90,12 @@ class PostCRUD:
             published_at=datetime.datetime.now() if obj_in.is_published else None
         )
         db.add(db_obj)
+        await self._adjust_counts(
+            db, user_id, post_delta=1, published_delta=1 if obj_in.is_published else 0
+        )
         await db.commit()
+        if obj_in.is_published:
+            await feed_cache.invalidate()
         await db.refresh(db_obj)
         return db_obj
 
@@ -49,16 +115,23 @@ class PostCRUD:
         return result.scalars().first()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100, published_only: bool = True
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        published_only: bool = True,
+        after: Optional[Tuple[Optional[datetime.datetime], UUID]] = None
     ) -> List[Post]:
         """
-        複数の投稿を取得する
+        複数の投稿を (published_at DESC, id) の順で取得する
 
         Args:
             db: データベースセッション
             skip: スキップする件数
             limit: 取得する最大件数
             published_only: 公開済みの投稿のみを取得するかどうか
+            after: 前のページの最後の投稿の (published_at, id)（キーセットページネーション）
 
         Returns:
             投稿のリスト
@@ -66,15 +139,22 @@ class PostCRUD:
         query = select(Post)
         if published_only:
             query = query.where(Post.is_published == True)
-        query = query.offset(skip).limit(limit)
+        query = self._keyset(query, after, published_only).offset(skip).limit(limit)
         result = await db.execute(query)
         return result.scalars().all()
 
     async def get_by_user(
-        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100, published_only: bool = False
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+        published_only: bool = False,
+        after: Optional[Tuple[Optional[datetime.datetime], UUID]] = None
     ) -> List[Post]:
         """
-        特定ユーザーの投稿を取得する
+        特定ユーザーの投稿を (published_at DESC, id) の順で取得する
 
         Args:
             db: データベースセッション
@@ -82,6 +162,7 @@ class PostCRUD:
             skip: スキップする件数
             limit: 取得する最大件数
             published_only: 公開済みの投稿のみを取得するかどうか
+            after: 前のページの最後の投稿の (published_at, id)（キーセットページネーション）
 
         Returns:
             投稿のリスト
@@ -89,10 +170,102 @@ class PostCRUD:
         query = select(Post).where(Post.user_id == user_id)
         if published_only:
             query = query.where(Post.is_published == True)
-        query = query.offset(skip).limit(limit)
+        query = self._keyset(query, after, published_only).offset(skip).limit(limit)
         result = await db.execute(query)
         return result.scalars().all()
 
+    async def search(
+        self,
+        db: AsyncSession,
+        *,
+        query: str,
+        user_id: UUID,
+        limit: int = 100,
+        after: Optional[Tuple[float, UUID]] = None
+    ) -> List[Tuple[Post, float]]:
+        """
+        タイトルと本文を全文検索し、検索スコアの高い順に取得する
+
+        公開済みの投稿と、user_id のユーザー自身の未公開の投稿を対象とする。
+
+        Args:
+            db: データベースセッション
+            query: 検索語（websearch_to_tsquery の構文。"..." でフレーズ、-語 で除外、or で和）
+            user_id: 検索するユーザーのID
+            limit: 取得する最大件数
+            after: 前のページの最後の投稿の (検索スコア, id)（キーセットページネーション）
+
+        Returns:
+            (投稿, 検索スコア) のリスト
+        """
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), query)
+        rank = func.ts_rank_cd(Post.search_vector, tsquery, type_=Float)
+        stmt = select(Post, rank.label("rank")).where(
+            Post.search_vector.op("@@")(tsquery),
+            or_(Post.is_published == True, Post.user_id == user_id),
+        )
+        if after is not None:
+            after_rank, id = after
+            stmt = stmt.where(or_(rank < after_rank, and_(rank == after_rank, Post.id > id)))
+        stmt = stmt.order_by(rank.desc(), Post.id).limit(limit)
+        result = await db.execute(stmt)
+        return [(row[0], row[1]) for row in result.all()]
+
+    async def count_published(self, db: AsyncSession) -> int:
+        """
+        全ユーザーの公開済みの投稿数を取得する（集計せずに投稿数のテーブルから読む）
+
+        Args:
+            db: データベースセッション
+
+        Returns:
+            公開済みの投稿数
+        """
+        query = select(PostCounter.published_count).where(PostCounter.user_id == ALL_USERS_ID)
+        result = await db.execute(query)
+        return result.scalar() or 0
+
+    async def count_by_user(self, db: AsyncSession, *, user_id: UUID, published_only: bool = False) -> int:
+        """
+        特定ユーザーの投稿数を取得する（集計せずに投稿数のテーブルから読む）
+
+        Args:
+            db: データベースセッション
+            user_id: ユーザーID
+            published_only: 公開済みの投稿のみを数えるかどうか
+
+        Returns:
+            投稿数
+        """
+        column = PostCounter.published_count if published_only else PostCounter.post_count
+        result = await db.execute(select(column).where(PostCounter.user_id == user_id))
+        return result.scalar() or 0
+
+    async def estimate_published_count(self, db: AsyncSession) -> Optional[int]:
+        """
+        全ユーザーの公開済みの投稿数を統計情報から推定する
+
+        公開済みの行のみを含む部分インデックス ix_posts_published_at_id の pg_class.reltuples を、
+        プランナーと同様に現在のページ数で補正する（最後の VACUUM / ANALYZE 以降の増減は概算になる）。
+
+        Args:
+            db: データベースセッション
+
+        Returns:
+            推定した投稿数、統計情報がまだない場合はNone
+        """
+        query = text(
+            "SELECT CASE WHEN relpages > 0 "
+            "THEN reltuples / relpages * (pg_relation_size(oid) / current_setting('block_size')::int) "
+            "ELSE reltuples END "
+            "FROM pg_class WHERE oid = to_regclass('ix_posts_published_at_id')"
+        )
+        result = await db.execute(query)
+        estimate = result.scalar()
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+
     async def update(
         self, db: AsyncSession, *, db_obj: Post, obj_in: PostUpdate
     ) -> Post:
@@ -109,18 +282,29 @@ class PostCRUD:
         """
         update_data = obj_in.model_dump(exclude_unset=True)
         
+        # 同時に公開状態が変更されても投稿数がずれないように、行をロックして現在の状態を読み直す
+        if "is_published" in update_data:
+            await db.refresh(db_obj, with_for_update=True)
+        was_published = db_obj.is_published
+        
         # 公開状態が変更された場合、published_atを更新
         if "is_published" in update_data and update_data["is_published"] != db_obj.is_published:
             if update_data["is_published"]:
                 update_data["published_at"] = datetime.datetime.now()
             else:
                 update_data["published_at"] = None
+            await self._adjust_counts(
+                db, db_obj.user_id, published_delta=1 if update_data["is_published"] else -1
+            )
         
         for field in update_data:
             setattr(db_obj, field, update_data[field])
         
         db.add(db_obj)
         await db.commit()
+        # 公開済みの投稿の変更、公開、非公開は公開済み投稿の一覧に影響する
+        if was_published or db_obj.is_published:
+            await feed_cache.invalidate()
         await db.refresh(db_obj)
         return db_obj
 
@@ -135,10 +319,19 @@ class PostCRUD:
         Returns:
             削除された投稿、存在しない場合はNone
         """
-        post = await self.get(db, id=id)
+        # 同時に公開状態が変更されても投稿数がずれないように、行をロックして現在の状態を読み直す
+        query = select(Post).where(Post.id == id).with_for_update().execution_options(populate_existing=True)
+        result = await db.execute(query)
+        post = result.scalars().first()
         if post:
+            was_published = post.is_published
             await db.delete(post)
+            await self._adjust_counts(
+                db, post.user_id, post_delta=-1, published_delta=-1 if was_published else 0
+            )
             await db.commit()
+            if was_published:
+                await feed_cache.invalidate()
         return post
 
     async def publish(self, db: AsyncSession, *, db_obj: Post, publish: bool = True) -> Post:
@@ -153,10 +346,18 @@ class PostCRUD:
         Returns:
             更新された投稿
         """
+        # 同時に公開状態が変更されても投稿数がずれないように、行をロックして現在の状態を読み直す
+        await db.refresh(db_obj, with_for_update=True)
+        was_published = db_obj.is_published
+        if was_published != publish:
+            await self._adjust_counts(db, db_obj.user_id, published_delta=1 if publish else -1)
         db_obj.is_published = publish
         db_obj.published_at = datetime.datetime.now() if publish else None
         db.add(db_obj)
         await db.commit()
+        # 公開し直した場合も published_at が変わり並び順が変わる
+        if was_published or publish:
+            await feed_cache.invalidate()
         await db.refresh(db_obj)
         return db_obj
 
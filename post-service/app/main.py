@@ -7,6 +7,11 @@ from app.api.v1.api import api_router
 from app.core.config import settings
 from app.db.init import init_db
 from app.core.logging import app_logger as logger
+from app.core.token_cache import token_cache
+from app.core.jwks import jwks_client
+from app.core.revocation import revocation_list
+from app.core.redis_client import redis_manager, feed_cache_redis
+from app.core.feed_cache import feed_cache
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -19,12 +24,22 @@ async def lifespan(app: FastAPI):
     # データベースの初期化
     await init_db()
     
+    # auth-serviceのJWKSを取得し、バックグラウンドでの定期更新を開始
+    await jwks_client.start()
+    
+    # auth-serviceで無効化されたアクセストークンのフィルタの構築と、無効化の受信を開始
+    revocation_list.start()
+    
     logger.info("Post Service started successfully")
     
     yield
     
     # 終了時の処理
     logger.info("Shutting down Post Service...")
+    await jwks_client.stop()
+    await revocation_list.stop()
+    await redis_manager.close()
+    await feed_cache_redis.close()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -53,6 +68,18 @@ async def health_check():
     """
     return {"status": "ok"}
 
+@app.get("/metrics")
+async def metrics():
+    """
+    内部コンポーネントの統計情報を取得するエンドポイント
+    """
+    return {
+        "token_cache": token_cache.stats(),
+        "jwks": jwks_client.stats(),
+        "revocation": revocation_list.stats(),
+        "feed_cache": feed_cache.stats(),
+    }
+
 @app.get("/")
 async def root():
     """
@@ -1,13 +1,28 @@
-from sqlalchemy import String, Text, Boolean, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Text, Boolean, DateTime, BigInteger, Index, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 from app.db.base import Base
 import uuid
 from datetime import datetime
 
+# 全文検索のテキスト検索設定（日本語の辞書は標準で提供されないため simple を使用する）
+SEARCH_CONFIG = "simple"
+
+
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # 公開済み投稿の一覧（GET /posts/）のキーセットページネーション用（公開済みの行のみ）
+        Index(
+            "ix_posts_published_at_id", text("published_at DESC NULLS LAST"), "id",
+            postgresql_where=text("is_published")
+        ),
+        # ユーザーごとの投稿一覧（GET /posts/user/{user_id}）のキーセットページネーション用
+        Index("ix_posts_user_id_published_at_id", "user_id", text("published_at DESC NULLS LAST"), "id"),
+        # 全文検索（GET /posts/search）用
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     # 既存フィールド
     title: Mapped[str] = mapped_column(String, nullable=False)
@@ -17,3 +32,31 @@ class Post(Base):
         )
     is_published: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     published_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    
+    # 全文検索用のベクトル（title と content からデータベースが生成する。タイトルの一致を重く評価する）
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(content, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+
+# 全ユーザーの合計の行の user_id
+ALL_USERS_ID = uuid.UUID(int=0)
+
+
+class PostCounter(Base):
+    """
+    ユーザーごとの投稿数（PostCRUD の作成・更新・公開・削除と同じトランザクションで更新する）
+
+    user_id が ALL_USERS_ID の行は全ユーザーの公開済みの投稿数を保持する（post_count は使用しない）。
+    """
+    __tablename__ = "post_counts"
+    
+    user_id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), nullable=False, unique=True)
+    post_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    published_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
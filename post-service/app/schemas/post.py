@@ -33,3 +33,8 @@ class PostInDB(PostBase):
 # APIレスポンス用スキーマ
 class Post(PostInDB):
     pass
+
+# 投稿数のレスポンススキーマ
+class PostCount(BaseModel):
+    count: int
+    exact: bool = True
@@ -0,0 +1,46 @@
+"""add posts feed indexes
+
+Revision ID: 8b1e4d7c2a9f
+Revises: 5f44eab8fed6
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e4d7c2a9f'
+down_revision: Union[str, None] = '5f44eab8fed6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # テーブルをロックしないように CONCURRENTLY で作成する（トランザクション外で実行する必要がある）
+    # 並び順は一覧のクエリの ORDER BY published_at DESC NULLS LAST, id と一致させる
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_published_at_id', 'posts', [sa.text('published_at DESC NULLS LAST'), 'id'],
+            unique=False, postgresql_where=sa.text('is_published'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_posts_user_id_published_at_id', 'posts',
+            ['user_id', sa.text('published_at DESC NULLS LAST'), 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_posts_user_id_published_at_id', table_name='posts',
+            postgresql_concurrently=True, if_exists=True
+        )
+        op.drop_index(
+            'ix_posts_published_at_id', table_name='posts',
+            postgresql_concurrently=True, if_exists=True
+        )
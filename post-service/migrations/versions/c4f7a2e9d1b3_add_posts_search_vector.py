@@ -0,0 +1,48 @@
+"""add posts search vector
+
+Revision ID: c4f7a2e9d1b3
+Revises: 8b1e4d7c2a9f
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f7a2e9d1b3'
+down_revision: Union[str, None] = '8b1e4d7c2a9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 生成列の追加は既存の行の値を計算するためテーブルを書き換える（実行中は書き込みがロックされる）
+    op.add_column('posts', sa.Column(
+        'search_vector', TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(content, '')), 'B')",
+            persisted=True,
+        ),
+        nullable=False,
+    ))
+    # テーブルをロックしないように CONCURRENTLY で作成する（トランザクション外で実行する必要がある）
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_posts_search_vector', 'posts', ['search_vector'],
+            unique=False, postgresql_using='gin',
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_posts_search_vector', table_name='posts',
+            postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_column('posts', 'search_vector')
@@ -0,0 +1,49 @@
+"""add post counts
+
+Revision ID: e2a9c5f13b7d
+Revises: c4f7a2e9d1b3
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c5f13b7d'
+down_revision: Union[str, None] = 'c4f7a2e9d1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('post_counts',
+    sa.Column('user_id', UUID(as_uuid=True), nullable=False),
+    sa.Column('post_count', sa.BigInteger(), nullable=False),
+    sa.Column('published_count', sa.BigInteger(), nullable=False),
+    sa.Column('id', UUID(as_uuid=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    # 既存の投稿を集計する（集計中に投稿が変更されないように posts への書き込みをロックする）
+    op.execute("LOCK TABLE posts IN SHARE MODE")
+    op.execute(
+        "INSERT INTO post_counts (id, user_id, post_count, published_count) "
+        "SELECT gen_random_uuid(), user_id, count(*), count(*) FILTER (WHERE is_published) "
+        "FROM posts GROUP BY user_id"
+    )
+    # 全ユーザーの合計の行（user_id は app.models.post.ALL_USERS_ID）
+    op.execute(
+        "INSERT INTO post_counts (id, user_id, post_count, published_count) "
+        "SELECT gen_random_uuid(), '00000000-0000-0000-0000-000000000000', 0, count(*) "
+        "FROM posts WHERE is_published"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('post_counts')
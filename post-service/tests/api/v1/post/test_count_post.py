@@ -0,0 +1,63 @@
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+import uuid
+
+from app.main import app
+from app.crud.post import post
+from app.api.deps import get_current_user
+
+
+@pytest.mark.asyncio
+async def test_count_posts(db_session, test_post, test_unpublished_post, mock_current_user, async_client, mock_jwt_token):
+    """
+    正常系テスト：全体の公開済みの投稿数を取得できることを確認
+    """
+    # 認証をモック
+    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    
+    for mode in ["exact", "approximate"]:
+        response = await async_client.get(
+            "/api/v1/posts/count",
+            params={"mode": mode},
+            headers={"Authorization": f"Bearer {mock_jwt_token}"}
+        )
+        
+        # レスポンスの検証
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        if data["exact"]:
+            assert data["count"] == 1
+    
+    # 依存関係のオーバーライドをリセット
+    app.dependency_overrides = {}
+
+
+@pytest.mark.asyncio
+async def test_count_user_posts(db_session, test_post, test_unpublished_post, mock_current_user, async_client, mock_jwt_token):
+    """
+    正常系テスト：自分の投稿数は未公開を含み、他人からは公開済みのみ数えることを確認
+    """
+    user_id = mock_current_user["user_id"]
+    
+    # 自分の投稿数
+    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    response = await async_client.get(
+        f"/api/v1/posts/user/{user_id}/count",
+        headers={"Authorization": f"Bearer {mock_jwt_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"count": 2, "exact": True}
+    
+    # 他のユーザーから見た投稿数
+    other_user_id = uuid.uuid4()
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": other_user_id, "payload": {"sub": str(other_user_id)}}
+    response = await async_client.get(
+        f"/api/v1/posts/user/{user_id}/count",
+        headers={"Authorization": f"Bearer {mock_jwt_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"count": 1, "exact": True}
+    
+    # 依存関係のオーバーライドをリセット
+    app.dependency_overrides = {}
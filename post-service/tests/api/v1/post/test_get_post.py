@@ -2,10 +2,13 @@ import pytest
 from httpx import AsyncClient
 from fastapi import status
 import uuid
+from datetime import datetime
 
 from app.main import app
 from app.crud.post import post
 from app.api.deps import get_current_user
+from app.core.config import settings
+from app.schemas.post import PostCreate
 
 
 @pytest.mark.asyncio
@@ -225,3 +228,130 @@ async def test_get_other_user_posts(db_session, test_post, test_unpublished_post
     
     # 依存関係のオーバーライドをリセット
     app.dependency_overrides = {}
+
+
+async def _follow_cursor(async_client, url, mock_jwt_token, limit):
+    """X-Next-Cursor ヘッダーがなくなるまで次のページを取得し、ページのリストを返す"""
+    pages = []
+    params = {"limit": limit}
+    while True:
+        response = await async_client.get(
+            url,
+            params=params,
+            headers={"Authorization": f"Bearer {mock_jwt_token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            return pages
+        params = {"limit": limit, "cursor": next_cursor}
+
+
+@pytest.mark.asyncio
+async def test_get_all_posts_with_cursor(db_session, mock_current_user, async_client, mock_jwt_token):
+    """
+    正常系テスト：X-Next-Cursor をたどって公開投稿を重複・欠落なく取得でき、最後のページにはヘッダーがないことを確認
+    """
+    # 認証をモック
+    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    
+    # 投稿を作成
+    published_ids = set()
+    for i in range(5):
+        post_in = PostCreate(title=f"カーソルテスト投稿 {i+1}", content="本文", is_published=True)
+        created = await post.create(db_session, obj_in=post_in, user_id=mock_current_user["user_id"])
+        published_ids.add(str(created.id))
+    draft_in = PostCreate(title="カーソルテスト下書き", content="本文", is_published=False)
+    await post.create(db_session, obj_in=draft_in, user_id=mock_current_user["user_id"])
+    
+    pages = await _follow_cursor(async_client, "/api/v1/posts/", mock_jwt_token, limit=2)
+    
+    # レスポンスの検証 - 2件、2件、1件の3ページ
+    assert [len(page) for page in pages] == [2, 2, 1]
+    ids = [p["id"] for page in pages for p in page]
+    assert len(ids) == len(set(ids))
+    assert set(ids) == published_ids
+    # 公開日時の新しい順
+    published_at = [datetime.fromisoformat(p["published_at"]) for page in pages for p in page]
+    assert published_at == sorted(published_at, reverse=True)
+    
+    # 依存関係のオーバーライドをリセット
+    app.dependency_overrides = {}
+
+
+@pytest.mark.asyncio
+async def test_get_user_posts_with_cursor(db_session, mock_current_user, async_client, mock_jwt_token):
+    """
+    正常系テスト：自分の投稿一覧で X-Next-Cursor をたどり、未公開の投稿も末尾まで取得できることを確認
+    """
+    # 認証をモック
+    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    
+    # 投稿を作成
+    created_ids = set()
+    for i in range(5):
+        post_in = PostCreate(title=f"カーソルテスト投稿 {i+1}", content="本文", is_published=i % 2 == 0)
+        created = await post.create(db_session, obj_in=post_in, user_id=mock_current_user["user_id"])
+        created_ids.add(str(created.id))
+    
+    pages = await _follow_cursor(
+        async_client, f"/api/v1/posts/user/{mock_current_user['user_id']}", mock_jwt_token, limit=2
+    )
+    
+    # レスポンスの検証
+    posts = [p for page in pages for p in page]
+    assert len(pages) == 3
+    assert {p["id"] for p in posts} == created_ids
+    assert len(posts) == len(created_ids)
+    # 未公開の投稿は公開済みの投稿の後
+    assert [p["is_published"] for p in posts] == [True, True, True, False, False]
+    
+    # 依存関係のオーバーライドをリセット
+    app.dependency_overrides = {}
+
+
+@pytest.mark.asyncio
+async def test_get_posts_with_invalid_cursor(db_session, mock_current_user, async_client, mock_jwt_token):
+    """
+    異常系テスト：不正なカーソルを指定すると400エラーになることを確認
+    """
+    # 認証をモック
+    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    
+    for url in ["/api/v1/posts/", f"/api/v1/posts/user/{mock_current_user['user_id']}"]:
+        response = await async_client.get(
+            url,
+            params={"cursor": "garbage"},
+            headers={"Authorization": f"Bearer {mock_jwt_token}"}
+        )
+        
+        # レスポンスの検証
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "不正なカーソルです"
+    
+    # 依存関係のオーバーライドをリセット
+    app.dependency_overrides = {}
+
+
+@pytest.mark.asyncio
+async def test_get_posts_with_invalid_limit(db_session, mock_current_user, async_client, mock_jwt_token):
+    """
+    異常系テスト：limit が上限（POST_LIST_MAX_LIMIT）を超える場合や1未満の場合は422エラーになることを確認
+    """
+    # 認証をモック
+    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    
+    for url in ["/api/v1/posts/", f"/api/v1/posts/user/{mock_current_user['user_id']}"]:
+        for limit in [settings.POST_LIST_MAX_LIMIT + 1, 0]:
+            response = await async_client.get(
+                url,
+                params={"limit": limit},
+                headers={"Authorization": f"Bearer {mock_jwt_token}"}
+            )
+            
+            # レスポンスの検証
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    # 依存関係のオーバーライドをリセット
+    app.dependency_overrides = {}
@@ -0,0 +1,81 @@
+import pytest
+from httpx import AsyncClient
+from fastapi import status
+import uuid
+
+from app.main import app
+from app.crud.post import post
+from app.api.deps import get_current_user
+from app.schemas.post import PostCreate
+
+
+@pytest.mark.asyncio
+async def test_search_posts_success(db_session, mock_current_user, async_client, mock_jwt_token):
+    """
+    正常系テスト：検索結果をページごとに取得でき、他人の未公開の投稿は含まれないことを確認
+    """
+    # 認証をモック
+    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    
+    # 投稿を作成
+    other_user_id = uuid.uuid4()
+    published_ids = set()
+    for i in range(3):
+        post_in = PostCreate(title=f"search target {i}", content="検索テスト", is_published=True)
+        created = await post.create(db_session, obj_in=post_in, user_id=other_user_id)
+        published_ids.add(str(created.id))
+    draft_in = PostCreate(title="search target draft", content="検索テスト", is_published=False)
+    await post.create(db_session, obj_in=draft_in, user_id=other_user_id)
+    
+    # 1ページ目
+    response = await async_client.get(
+        "/api/v1/posts/search",
+        params={"q": "target", "limit": 2},
+        headers={"Authorization": f"Bearer {mock_jwt_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    page1 = response.json()
+    assert len(page1) == 2
+    next_cursor = response.headers["X-Next-Cursor"]
+    
+    # 2ページ目
+    response = await async_client.get(
+        "/api/v1/posts/search",
+        params={"q": "target", "limit": 2, "cursor": next_cursor},
+        headers={"Authorization": f"Bearer {mock_jwt_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    page2 = response.json()
+    assert "X-Next-Cursor" not in response.headers
+    
+    # レスポンスの検証 - 公開済みの投稿のみ
+    assert {p["id"] for p in page1 + page2} == published_ids
+    
+    # 依存関係のオーバーライドをリセット
+    app.dependency_overrides = {}
+
+
+@pytest.mark.asyncio
+async def test_search_posts_invalid_request(db_session, mock_current_user, async_client, mock_jwt_token):
+    """
+    異常系テスト：不正なカーソルと空の検索語はエラーになることを確認
+    """
+    # 認証をモック
+    app.dependency_overrides[get_current_user] = lambda: mock_current_user
+    
+    response = await async_client.get(
+        "/api/v1/posts/search",
+        params={"q": "target", "cursor": "not-a-cursor"},
+        headers={"Authorization": f"Bearer {mock_jwt_token}"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    response = await async_client.get(
+        "/api/v1/posts/search",
+        params={"q": ""},
+        headers={"Authorization": f"Bearer {mock_jwt_token}"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    
+    # 依存関係のオーバーライドをリセット
+    app.dependency_overrides = {}
@@ -16,6 +16,7 @@ from app.crud.post import post
 from app.main import app
 from app.schemas.post import PostCreate
 from app.core.config import settings
+from app.core.feed_cache import feed_cache
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -73,6 +74,8 @@ async def db_session():
                 for table in reversed(Base.metadata.sorted_tables):
                     await session.execute(table.delete())
                 await session.commit()
+                # 削除した投稿が公開済み投稿の一覧のキャッシュから返されないようにする
+                await feed_cache.invalidate()
             except Exception:
                 await session.rollback()
                 raise
@@ -0,0 +1,68 @@
+# auth-serviceクライアントのテスト
+import json
+import uuid
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from unittest.mock import patch
+
+from app.core.auth_client import AuthClient
+from app.core.config import settings
+
+
+def _client_with(handler) -> AuthClient:
+    """モックのHTTPクライアントを持つAuthClientを作成する"""
+    client = AuthClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_get_users_batch_deduplicates_and_chunks():
+    """重複したIDを1つにまとめ、AUTH_USER_BATCH_SIZE件ごとに取得することをテスト"""
+    ids = [uuid.uuid4() for _ in range(3)]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["Authorization"] == "Bearer token"
+        body = json.loads(request.content)
+        requests.append(body["ids"])
+        return httpx.Response(200, json=[{"id": i, "username": f"user-{i}"} for i in body["ids"]])
+
+    client = _client_with(handler)
+    try:
+        with patch.object(settings, "AUTH_USER_BATCH_SIZE", 2):
+            users = await client.get_users_batch([ids[0], ids[1], ids[0], str(ids[2]), ids[1]], "token")
+    finally:
+        await client.close()
+
+    assert requests == [[str(ids[0]), str(ids[1])], [str(ids[2])]]
+    assert set(users) == set(ids)
+    assert users[ids[2]]["username"] == f"user-{ids[2]}"
+
+
+@pytest.mark.asyncio
+async def test_get_users_batch_empty_makes_no_request():
+    """IDが空の場合はリクエストしないことをテスト"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("リクエストは送信されないはず")
+
+    client = _client_with(handler)
+    try:
+        assert await client.get_users_batch([], "token") == {}
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_get_users_batch_error_response():
+    """auth-serviceがエラーを返した場合に502となることをテスト"""
+    client = _client_with(lambda request: httpx.Response(401, json={"detail": "認証エラー"}))
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            await client.get_users_batch([uuid.uuid4()], "token")
+    finally:
+        await client.close()
+
+    assert exc_info.value.status_code == 502
@@ -0,0 +1,147 @@
+# 公開済み投稿の一覧のキャッシュのテスト
+import asyncio
+import pytest
+import pytest_asyncio
+import fakeredis.aioredis
+from unittest.mock import patch
+
+from app.core.feed_cache import FeedCache, FEED_GENERATION_KEY
+from app.core.redis_client import feed_cache_redis
+
+
+@pytest_asyncio.fixture
+async def mock_redis():
+    """fakeredisを投稿一覧のキャッシュのRedisとして差し替える"""
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(feed_cache_redis, "url", "redis://post_redis:6379/0"), \
+            patch.object(feed_cache_redis, "_client", fake_redis):
+        yield fake_redis
+    await fake_redis.flushall()
+
+
+class Loader:
+    """呼び出し回数を数え、ページごとに次のページのカーソルを返すローダー"""
+
+    def __init__(self, cursor=None, delay=0.0):
+        self.cursor = cursor
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        page = 1 if self.cursor is None else int(self.cursor[1:]) + 1
+        return [{"id": f"post-{page}-{self.calls}"}], f"p{page}"
+
+
+@pytest.mark.asyncio
+async def test_disabled_without_redis_url():
+    """FEED_CACHE_REDIS_URLが空の場合は毎回ローダーを呼び出すことをテスト"""
+    cache = FeedCache(pages=3, ttl=60)
+    loader = Loader()
+    with patch.object(feed_cache_redis, "url", ""):
+        await cache.get_page(10, None, loader)
+        await cache.get_page(10, None, loader)
+        await cache.invalidate()
+    assert loader.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_hit_and_invalidate(mock_redis):
+    """2回目はキャッシュから返し、世代番号を上げると再取得することをテスト"""
+    cache = FeedCache(pages=3, ttl=60)
+    loader = Loader()
+
+    first = await cache.get_page(10, None, loader)
+    assert await cache.get_page(10, None, loader) == first
+    assert loader.calls == 1
+    # limit が異なるページは別にキャッシュする
+    await cache.get_page(20, None, loader)
+    assert loader.calls == 2
+
+    await cache.invalidate()
+    assert await cache.get_page(10, None, loader) != first
+    assert loader.calls == 3
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_caches_only_first_pages(mock_redis):
+    """キャッシュしたページのカーソルから辿れる先頭の pages ページのみキャッシュすることをテスト"""
+    cache = FeedCache(pages=2, ttl=60)
+
+    cursor = None
+    for _ in range(3):
+        loader = Loader(cursor)
+        _, cursor = await cache.get_page(10, loader.cursor, loader)
+        await cache.get_page(10, loader.cursor, loader)
+        assert loader.calls == (1 if loader.cursor in (None, "p1") else 2)
+
+    # キャッシュしたページから辿っていないカーソルはキャッシュしない
+    loader = Loader("p9")
+    await cache.get_page(10, "p9", loader)
+    await cache.get_page(10, "p9", loader)
+    assert loader.calls == 2
+    assert cache.stats()["uncached"] == 4
+
+
+@pytest.mark.asyncio
+async def test_single_flight(mock_redis):
+    """同じページのキャッシュミスが同時に発生した場合、1回だけ取得して結果を共有することをテスト"""
+    cache = FeedCache(pages=3, ttl=60)
+    loader = Loader(delay=0.05)
+
+    results = await asyncio.gather(*[cache.get_page(10, None, loader) for _ in range(20)])
+
+    assert loader.calls == 1
+    assert all(result == results[0] for result in results)
+    assert cache.stats()["coalesced"] == 19
+
+
+@pytest.mark.asyncio
+async def test_single_flight_leader_failure(mock_redis):
+    """先に取得を始めたリクエストが失敗した場合、待っていたリクエストは自分で取得することをテスト"""
+    cache = FeedCache(pages=3, ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        if calls == 1:
+            raise RuntimeError("database error")
+        return [{"id": "post"}], None
+
+    results = await asyncio.gather(cache.get_page(10, None, loader), cache.get_page(10, None, loader), return_exceptions=True)
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == ([{"id": "post"}], None)
+
+
+@pytest.mark.asyncio
+async def test_page_loaded_before_invalidation_is_not_served(mock_redis):
+    """取得中に世代番号が上がった場合、取得したページは使用しないことをテスト"""
+    cache = FeedCache(pages=3, ttl=60)
+    stale = Loader()
+
+    async def invalidate_while_loading():
+        result = await stale()
+        await cache.invalidate()
+        return result
+
+    await cache.get_page(10, None, invalidate_while_loading)
+    fresh = Loader()
+    await cache.get_page(10, None, fresh)
+
+    assert fresh.calls == 1
+    assert int(await mock_redis.get(FEED_GENERATION_KEY)) == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_falls_back_to_loader(mock_redis):
+    """Redisの障害時はキャッシュを使用せずに取得することをテスト"""
+    cache = FeedCache(pages=3, ttl=60)
+    loader = Loader()
+    with patch.object(mock_redis, "mget", side_effect=ConnectionError("down")):
+        assert await cache.get_page(10, None, loader) == ([{"id": "post-1-1"}], "p1")
+    assert cache.stats()["errors"] == 1
@@ -0,0 +1,117 @@
+# JWKSクライアントのテスト
+import json
+import httpx
+import pytest
+from unittest.mock import patch
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+from jose import jwk, jwt
+from jose.utils import base64url_encode
+
+from app.api.deps import verify_token
+from app.core.config import settings
+from app.core.jwks import JWKSClient
+
+
+def _make_jwk(kid: str) -> dict:
+    """テスト用のRSA公開鍵のJWKを生成する"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+    return {**jwk.construct(pem, "RS256").to_dict(), "kid": kid, "use": "sig"}
+
+
+def _client_with(responses: list) -> JWKSClient:
+    """順番にレスポンスを返すモックのHTTPクライアントを持つJWKSClientを作成する"""
+    calls = iter(responses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status_code, body = next(calls)
+        return httpx.Response(status_code, json=body)
+
+    client = JWKSClient("http://auth-service/jwks.json")
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_get_key_fetches_once_and_caches():
+    """JWKSを一度だけ取得し、kidで鍵を返すことをテスト"""
+    keys = [_make_jwk("old"), _make_jwk("new")]
+    client = _client_with([(200, {"keys": keys})])
+    try:
+        assert await client.get_key("old") is not None
+        assert await client.get_key("new") is not None
+        assert client.stats()["refreshes"] == 1
+        assert client.stats()["kids"] == ["new", "old"]
+    finally:
+        await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_triggers_rate_limited_refresh():
+    """未知のkidで再取得し、再取得の頻度が制限されることをテスト"""
+    client = _client_with([
+        (200, {"keys": [_make_jwk("old")]}),
+        (200, {"keys": [_make_jwk("old"), _make_jwk("next")]}),
+    ])
+    try:
+        assert await client.get_key("old") is not None
+
+        with patch.object(settings, "JWKS_MIN_REFRESH_INTERVAL", 3600):
+            assert await client.get_key("next") is None
+        assert client.stats()["refreshes"] == 1
+
+        with patch.object(settings, "JWKS_MIN_REFRESH_INTERVAL", 0):
+            assert await client.get_key("next") is not None
+        assert client.stats()["refreshes"] == 2
+    finally:
+        await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_previous_keys():
+    """取得に失敗した場合にそれまでの鍵を使い続けることをテスト"""
+    client = _client_with([
+        (200, {"keys": [_make_jwk("old")]}),
+        (503, {"detail": "unavailable"}),
+    ])
+    try:
+        assert await client.refresh() is True
+        assert await client.refresh() is False
+
+        assert client.stats()["failures"] == 1
+        assert await client.get_key("old") is not None
+    finally:
+        await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_eddsa_key_from_jwks():
+    """EdDSA（Ed25519）の鍵をJWKSから読み込めることをテスト"""
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    raw = private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    key_data = {"kty": "OKP", "crv": "Ed25519", "x": base64url_encode(raw).decode("ascii"), "kid": "ed", "alg": "EdDSA"}
+    client = _client_with([(200, {"keys": [key_data]})])
+    try:
+        key = await client.get_key("ed")
+        token = jwt.encode({"sub": "user-id"}, jwk.construct(
+            private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()), "EdDSA"
+        ), algorithm="EdDSA")
+        assert jwt.decode(token, key, algorithms=["EdDSA"])["sub"] == "user-id"
+    finally:
+        await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_non_string_kid_is_rejected():
+    """文字列以外のkidでは再取得せずにNoneを返し、トークンは無効になることをテスト"""
+    client = _client_with([])
+    try:
+        assert await client.get_key(["x"]) is None
+        assert client.stats()["refreshes"] == 0
+    finally:
+        await client.stop()
+
+    header = base64url_encode(json.dumps({"alg": "RS256", "kid": ["x"]}).encode()).decode()
+    payload = base64url_encode(json.dumps({"sub": "user-id"}).encode()).decode()
+    assert await verify_token(f"{header}.{payload}.signature") is None
@@ -0,0 +1,71 @@
+# キーセットページネーションのカーソルのテスト
+import base64
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.core.pagination import (
+    encode_cursor, decode_cursor, encode_search_cursor, decode_search_cursor, InvalidCursorError
+)
+
+
+def _raw_cursor(values) -> str:
+    """任意の値のリストからカーソルと同じ形式の文字列を作成する"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+@pytest.mark.parametrize("published_at", [datetime(2025, 4, 4, 16, 7, 17, 380636), None])
+def test_cursor_round_trip(published_at):
+    """カーソルから公開日時（非公開の場合はNone）とIDを復元できることをテスト"""
+    id = uuid.uuid4()
+
+    cursor = encode_cursor(published_at, id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (published_at, id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "WyJ4IiwieSJd", "!!!"])
+def test_invalid_cursor(cursor):
+    """不正なカーソルでInvalidCursorErrorが発生することをテスト"""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("values", [
+    [None, 5],
+    [None, ["x"]],
+    [None, {"id": "x"}],
+    [None, None],
+    [5, str(uuid.uuid4())],
+    [["2025-04-04"], str(uuid.uuid4())],
+])
+def test_invalid_cursor_value_types(values):
+    """形式は正しいが値の型が不正なカーソルでInvalidCursorErrorが発生することをテスト"""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(_raw_cursor(values))
+
+
+@pytest.mark.parametrize("rank", [0.0, 0.1, 0.30000001192092896, 12.5])
+def test_search_cursor_round_trip(rank):
+    """検索結果のカーソルから検索スコアとIDを誤差なく復元できることをテスト"""
+    id = uuid.uuid4()
+
+    assert decode_search_cursor(encode_search_cursor(rank, id)) == (rank, id)
+
+
+@pytest.mark.parametrize("values", [[1.0, 5], [1.0, ["x"]], [1.0, None], [True, str(uuid.uuid4())]])
+def test_invalid_search_cursor_value_types(values):
+    """形式は正しいが値の型が不正な検索結果のカーソルでInvalidCursorErrorが発生することをテスト"""
+    with pytest.raises(InvalidCursorError):
+        decode_search_cursor(_raw_cursor(values))
+
+
+def test_search_cursor_is_not_interchangeable():
+    """投稿一覧のカーソルを検索に使用するとInvalidCursorErrorが発生することをテスト"""
+    cursor = encode_cursor(datetime(2025, 4, 4), uuid.uuid4())
+
+    with pytest.raises(InvalidCursorError):
+        decode_search_cursor(cursor)
@@ -0,0 +1,100 @@
+# 無効化済みアクセストークンの確認のテスト
+import asyncio
+import time
+import pytest
+import pytest_asyncio
+import fakeredis.aioredis
+from unittest.mock import patch, AsyncMock
+
+from app.api.deps import verify_token
+from app.core.redis_client import redis_manager
+from app.core.revocation import BloomFilter, RevocationList, revocation_list
+from app.core.token_cache import token_cache
+
+
+@pytest_asyncio.fixture
+async def mock_redis():
+    """fakeredisをauth-serviceのRedisとして差し替える"""
+    fake_redis = fakeredis.aioredis.FakeRedis()
+    with patch.object(redis_manager, "url", "redis://auth_redis:6379/0"), \
+            patch.object(redis_manager, "_client", fake_redis):
+        yield fake_redis
+    await fake_redis.flushall()
+    revocation_list.clear()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """追加した要素は必ず含まれ、偽陽性率が設定値の数倍以内であることをテスト"""
+    bloom = BloomFilter(capacity=1000, false_positive_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(bloom.might_contain(item) for item in items)
+    false_positives = sum(bloom.might_contain(f"other-{i}") for i in range(10000))
+    assert false_positives / 10000 < 0.03
+
+
+@pytest.mark.asyncio
+async def test_disabled_without_redis_url():
+    """REVOCATION_REDIS_URLが空の場合は確認しないことをテスト"""
+    revocations = RevocationList(capacity=100, false_positive_rate=0.001, rebuild_interval=0)
+    with patch.object(redis_manager, "url", ""):
+        assert await revocations.is_revoked("any") is False
+        revocations.start()
+        assert revocations._tasks == []
+
+
+@pytest.mark.asyncio
+async def test_ready_filter_skips_redis(mock_redis):
+    """構築後は無効化されていないjtiをRedisに問い合わせずに判定することをテスト"""
+    await mock_redis.setex("revoked_jti:old", 60, 1)
+    revocations = RevocationList(capacity=100, false_positive_rate=0.001, rebuild_interval=0)
+    assert await revocations.rebuild() is True
+
+    with patch.object(mock_redis, "exists", new_callable=AsyncMock) as exists:
+        for i in range(100):
+            assert await revocations.is_revoked(f"active-{i}") is False
+        assert exists.await_count < 5
+
+    assert await revocations.is_revoked("old") is True
+    assert revocations.stats()["revoked_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_receives_revocations(mock_redis):
+    """auth-serviceからの無効化の通知がフィルタに反映されることをテスト"""
+    revocations = RevocationList(capacity=100, false_positive_rate=0.001, rebuild_interval=0)
+    revocations.start()
+    try:
+        for _ in range(50):
+            if revocations.ready:
+                break
+            await asyncio.sleep(0.05)
+        # 購読の開始を待つ
+        await asyncio.sleep(0.1)
+
+        # auth-serviceと同じ手順で無効化する
+        await mock_redis.setex("revoked_jti:jti-1", 60, 1)
+        await mock_redis.publish("revoked_jti:events", "jti-1")
+        for _ in range(50):
+            if revocations._filter.might_contain("jti-1"):
+                break
+            await asyncio.sleep(0.05)
+        assert await revocations.is_revoked("jti-1") is True
+    finally:
+        await revocations.stop()
+
+
+@pytest.mark.asyncio
+async def test_cached_token_is_rejected_after_revocation(mock_redis):
+    """検証済みのキャッシュにあるトークンも、無効化後は拒否されることをテスト"""
+    payload = {"sub": "user-id", "jti": "jti-2", "exp": time.time() + 60}
+    token_cache.set("cached-token", payload)
+    try:
+        assert await verify_token("cached-token") == payload
+
+        await mock_redis.setex("revoked_jti:jti-2", 60, 1)
+        assert await verify_token("cached-token") is None
+    finally:
+        token_cache.clear()
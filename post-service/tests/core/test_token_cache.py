@@ -0,0 +1,48 @@
+# 検証済みトークンのキャッシュのテスト
+import time
+
+from app.core.token_cache import TokenCache
+
+
+def test_get_returns_cached_payload():
+    """保存したペイロードが取得でき、ヒット数が記録されることをテスト"""
+    cache = TokenCache(max_size=10)
+    payload = {"sub": "user-id", "exp": time.time() + 60}
+
+    assert cache.get("token") is None
+    cache.set("token", payload)
+    assert cache.get("token") == payload
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_expired_entry_is_not_returned():
+    """有効期限切れのエントリが返されないことをテスト"""
+    cache = TokenCache(max_size=10)
+    cache._entries[cache._digest("token")] = (time.time() - 1, {"sub": "user-id"})
+
+    assert cache.get("token") is None
+    assert cache.stats()["size"] == 0
+
+    # 期限切れやexpのないペイロードは保存されない
+    cache.set("expired", {"sub": "user-id", "exp": time.time() - 1})
+    cache.set("no-exp", {"sub": "user-id"})
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    """上限を超えた場合に最も古く使われたエントリが削除されることをテスト"""
+    cache = TokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.set("a", {"sub": "a", "exp": exp})
+    cache.set("b", {"sub": "b", "exp": exp})
+    cache.get("a")
+    cache.set("c", {"sub": "c", "exp": exp})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
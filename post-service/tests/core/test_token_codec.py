@@ -0,0 +1,53 @@
+# JWTのコーデックのテスト
+import time
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat, PublicFormat
+from jose import jwk, jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from app.core.token_codec import get_codec
+
+
+def _jose_keys():
+    """テスト用のRSAの署名鍵・検証鍵（joseのKeyオブジェクト）を作成する"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    public_pem = private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo)
+    return jwk.construct(private_pem, "RS256"), jwk.construct(public_pem, "RS256")
+
+
+@pytest.mark.parametrize("backend", ["jose", "cryptography"])
+def test_decode_token_signed_by_jose(backend):
+    """python-joseで署名したトークンを検証できることをテスト"""
+    signing_key, verification_key = _jose_keys()
+    claims = {"sub": "user-id", "jti": "jti", "exp": int(time.time()) + 60}
+    token = jwt.encode(claims, signing_key, algorithm="RS256", headers={"kid": "kid-1"})
+    codec = get_codec(backend)
+
+    assert codec.get_unverified_header(token)["kid"] == "kid-1"
+    assert codec.decode(token, verification_key, algorithms=["RS256"]) == claims
+    with pytest.raises(JWTError):
+        codec.decode(token, verification_key, algorithms=["ES256"])
+
+
+@pytest.mark.parametrize("backend", ["jose", "cryptography"])
+def test_malformed_token_is_rejected(backend):
+    """形式が不正なトークン（非ASCII文字を含むものなど）でJWTErrorが発生することをテスト"""
+    signing_key, verification_key = _jose_keys()
+    header, payload, signature = jwt.encode({"sub": "user-id"}, signing_key, algorithm="RS256").split(".")
+    codec = get_codec(backend)
+
+    for token in [f"{header}.{payload}é.{signature}", f"{header}é.{payload}.{signature}", f"{header}.{payload}", "a.b.c"]:
+        with pytest.raises(JWTError):
+            codec.decode(token, verification_key, algorithms=["RS256"])
+
+
+@pytest.mark.parametrize("backend", ["jose", "cryptography"])
+def test_expired_token_is_rejected(backend):
+    """有効期限切れのトークンを拒否することをテスト"""
+    signing_key, verification_key = _jose_keys()
+    token = jwt.encode({"sub": "user-id", "exp": int(time.time()) - 10}, signing_key, algorithm="RS256")
+
+    with pytest.raises(ExpiredSignatureError):
+        get_codec(backend).decode(token, verification_key, algorithms=["RS256"])
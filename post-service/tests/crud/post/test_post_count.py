@@ -0,0 +1,85 @@
+# 投稿数のテスト
+import uuid
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.crud.post import post
+from app.models.post import Post
+from app.schemas.post import PostCreate, PostUpdate
+
+
+async def actual_counts(db_session, user_id):
+    """集計した (全体の公開済み, ユーザーの全投稿, ユーザーの公開済み) の投稿数"""
+    published = await db_session.scalar(select(func.count()).where(Post.is_published == True))
+    user_posts = await db_session.scalar(select(func.count()).where(Post.user_id == user_id))
+    user_published = await db_session.scalar(
+        select(func.count()).where(Post.user_id == user_id, Post.is_published == True)
+    )
+    return published, user_posts, user_published
+
+
+async def counter_values(db_session, user_id):
+    """投稿数のテーブルの (全体の公開済み, ユーザーの全投稿, ユーザーの公開済み) の投稿数"""
+    return (
+        await post.count_published(db_session),
+        await post.count_by_user(db_session, user_id=user_id),
+        await post.count_by_user(db_session, user_id=user_id, published_only=True),
+    )
+
+
+@pytest.mark.asyncio
+async def test_counts_follow_writes(db_session, mock_current_user):
+    """作成・更新・公開・削除のたびに投稿数が集計した値と一致するテスト"""
+    user_id = mock_current_user["user_id"]
+    assert await counter_values(db_session, user_id) == (0, 0, 0)
+
+    published = await post.create(
+        db_session, obj_in=PostCreate(title="公開", content="本文", is_published=True), user_id=user_id
+    )
+    draft = await post.create(
+        db_session, obj_in=PostCreate(title="下書き", content="本文", is_published=False), user_id=user_id
+    )
+    await post.create(
+        db_session, obj_in=PostCreate(title="他人", content="本文", is_published=True), user_id=uuid.uuid4()
+    )
+    assert await counter_values(db_session, user_id) == (2, 2, 1)
+
+    # 公開状態が変わらない場合は変化しない
+    await post.publish(db_session, db_obj=published, publish=True)
+    await post.update(db_session, db_obj=draft, obj_in=PostUpdate(title="下書き2", is_published=False))
+    assert await counter_values(db_session, user_id) == (2, 2, 1)
+
+    await post.update(db_session, db_obj=draft, obj_in=PostUpdate(is_published=True))
+    assert await counter_values(db_session, user_id) == (3, 2, 2)
+
+    await post.publish(db_session, db_obj=published, publish=False)
+    assert await counter_values(db_session, user_id) == (2, 2, 1)
+
+    await post.delete(db_session, id=draft.id)
+    await post.delete(db_session, id=published.id)
+    assert await counter_values(db_session, user_id) == (1, 0, 0)
+    assert await counter_values(db_session, user_id) == await actual_counts(db_session, user_id)
+
+
+@pytest.mark.asyncio
+async def test_count_unknown_user(db_session):
+    """投稿のないユーザーの投稿数は0になるテスト"""
+    assert await post.count_by_user(db_session, user_id=uuid.uuid4()) == 0
+
+
+@pytest.mark.asyncio
+async def test_estimate_published_count(db_session, mock_current_user):
+    """統計情報の更新後は公開済みの投稿数を推定できるテスト"""
+    for i in range(30):
+        await post.create(
+            db_session,
+            obj_in=PostCreate(title=f"推定テスト {i}", content="本文", is_published=i % 3 != 0),
+            user_id=mock_current_user["user_id"]
+        )
+    await db_session.execute(text("ANALYZE posts"))
+
+    estimate = await post.estimate_published_count(db_session)
+
+    assert estimate is not None
+    assert abs(estimate - 20) <= 5
@@ -0,0 +1,35 @@
+# 公開済み投稿の一覧のキャッシュの無効化のテスト
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from app.crud.post import post
+from app.schemas.post import PostCreate, PostUpdate
+
+
+@pytest.mark.asyncio
+async def test_invalidates_only_when_published_posts_change(db_session, mock_current_user):
+    """公開済みの投稿が変更された場合のみ世代番号を上げるテスト"""
+    user_id = mock_current_user["user_id"]
+    with patch("app.crud.post.feed_cache.invalidate", new_callable=AsyncMock) as invalidate:
+        # 未公開の投稿の作成・更新は一覧に影響しない
+        draft = await post.create(
+            db_session, obj_in=PostCreate(title="下書き", content="本文", is_published=False), user_id=user_id
+        )
+        await post.update(db_session, db_obj=draft, obj_in=PostUpdate(title="下書き2"))
+        assert invalidate.await_count == 0
+
+        # 公開、公開済みの投稿の更新、非公開、削除
+        await post.publish(db_session, db_obj=draft, publish=True)
+        await post.update(db_session, db_obj=draft, obj_in=PostUpdate(title="公開済み"))
+        await post.update(db_session, db_obj=draft, obj_in=PostUpdate(is_published=False))
+        assert invalidate.await_count == 3
+
+        await post.publish(db_session, db_obj=draft, publish=True)
+        await post.delete(db_session, id=draft.id)
+        assert invalidate.await_count == 5
+
+        # 公開済みの投稿の作成
+        await post.create(
+            db_session, obj_in=PostCreate(title="公開", content="本文", is_published=True), user_id=user_id
+        )
+        assert invalidate.await_count == 6
@@ -0,0 +1,75 @@
+# インデックスの使用のテスト（シードしたデータでの実行計画を確認する）
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.crud.post import PostCRUD
+from app.models.post import Post
+
+# シードするユーザー数とユーザーごとの投稿数
+USER_COUNT = 50
+POSTS_PER_USER = 100
+
+
+@pytest_asyncio.fixture
+async def seeded_posts(db_session):
+    """公開済みと未公開が混在する投稿をシードし、統計情報を更新する"""
+    user_ids = [uuid.uuid4() for _ in range(USER_COUNT)]
+    base = datetime(2025, 1, 1)
+    rows = []
+    for u, user_id in enumerate(user_ids):
+        for i in range(POSTS_PER_USER):
+            published = i % 10 != 0
+            rows.append({
+                "id": uuid.uuid4(),
+                "title": f"インデックステスト投稿 {u}-{i}",
+                "content": "これはインデックステスト用の投稿です。",
+                "user_id": user_id,
+                "is_published": published,
+                "published_at": base + timedelta(minutes=u * POSTS_PER_USER + i) if published else None,
+            })
+    await db_session.execute(insert(Post), rows)
+    await db_session.commit()
+    await db_session.execute(text("ANALYZE posts"))
+    return user_ids
+
+
+async def explain(db_session, query) -> str:
+    """クエリの実行計画を文字列で返す"""
+    sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await db_session.execute(text(f"EXPLAIN {sql}"))
+    return "\n".join(row[0] for row in result)
+
+
+@pytest.mark.asyncio
+async def test_published_feed_uses_partial_index(db_session, seeded_posts):
+    """公開済み投稿の一覧が部分インデックスを使用し、ソートしないことをテスト"""
+    for after in [None, (datetime(2025, 1, 2), uuid.uuid4())]:
+        query = select(Post).where(Post.is_published == True)
+        query = PostCRUD._keyset(query, after, published_only=True).limit(101)
+
+        plan = await explain(db_session, query)
+
+        assert "ix_posts_published_at_id" in plan, plan
+        assert "Seq Scan" not in plan, plan
+        assert "Sort" not in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_user_posts_use_composite_index(db_session, seeded_posts):
+    """ユーザーごとの投稿一覧が複合インデックスを使用し、ソートしないことをテスト"""
+    user_id = seeded_posts[0]
+    for published_only in [True, False]:
+        query = select(Post).where(Post.user_id == user_id)
+        if published_only:
+            query = query.where(Post.is_published == True)
+        query = PostCRUD._keyset(query, None, published_only).limit(21)
+
+        plan = await explain(db_session, query)
+
+        assert "ix_posts_user_id_published_at_id" in plan, plan
+        assert "Sort" not in plan, plan
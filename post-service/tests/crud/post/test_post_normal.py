@@ -97,6 +97,41 @@ async def test_get_multi_posts(db_session, test_post, test_unpublished_post):
     assert any(p.id == test_post.id for p in all_posts)
     assert any(p.id == test_unpublished_post.id for p in all_posts)
 
+@pytest.mark.asyncio
+async def test_get_by_user_keyset_pagination(db_session, mock_current_user):
+    """キーセットページネーションで全投稿を重複・欠落なく (published_at DESC, id) の順に取得できるテスト"""
+    user_id = mock_current_user["user_id"]
+    created = []
+    for i in range(7):
+        post_in = PostCreate(
+            title=f"キーセットテスト投稿 {i+1}",
+            content=f"これはキーセットテスト用の投稿 {i+1} です。",
+            is_published=i % 3 != 0
+        )
+        created.append(await post.create(db_session, obj_in=post_in, user_id=user_id))
+    
+    # 2件ずつ取得
+    pages = []
+    after = None
+    while True:
+        page = await post.get_by_user(db_session, user_id=user_id, limit=2, after=after)
+        if not page:
+            break
+        pages.extend(page)
+        after = (page[-1].published_at, page[-1].id)
+    
+    # 検証 - 全件を1回ずつ、公開日時の新しい順（未公開は末尾）に取得する
+    assert sorted(p.id for p in pages) == sorted(p.id for p in created)
+    published = [p for p in pages if p.published_at is not None]
+    assert [p.published_at for p in published] == sorted((p.published_at for p in published), reverse=True)
+    assert all(p.published_at is None for p in pages[len(published):])
+    
+    # 公開済みのみの場合は未公開の投稿を含まない
+    published_page = await post.get_by_user(
+        db_session, user_id=user_id, limit=10, published_only=True, after=(published[0].published_at, published[0].id)
+    )
+    assert [p.id for p in published_page] == [p.id for p in published[1:]]
+
 @pytest.mark.asyncio
 async def test_get_posts_by_user(db_session, test_post, test_unpublished_post):
     """ユーザー別投稿取得テスト"""
@@ -0,0 +1,65 @@
+# 全文検索のテスト
+import uuid
+
+import pytest
+
+from app.crud.post import post
+from app.schemas.post import PostCreate
+
+
+async def create_post(db_session, user_id, title, content, is_published=True):
+    post_in = PostCreate(title=title, content=content, is_published=is_published)
+    return await post.create(db_session, obj_in=post_in, user_id=user_id)
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_and_filters(db_session, mock_current_user):
+    """検索語を含む投稿のみを返し、タイトルの一致を本文の一致より上位にするテスト"""
+    user_id = mock_current_user["user_id"]
+    other_user_id = uuid.uuid4()
+    in_title = await create_post(db_session, other_user_id, "postgres search", "full text")
+    in_content = await create_post(db_session, other_user_id, "notes", "how to search in postgres")
+    await create_post(db_session, other_user_id, "unrelated", "nothing to see here")
+    other_draft = await create_post(db_session, other_user_id, "postgres draft", "search", is_published=False)
+    own_draft = await create_post(db_session, user_id, "my postgres draft", "search", is_published=False)
+
+    rows = await post.search(db_session, query="postgres search", user_id=user_id)
+    ids = [p.id for p, _ in rows]
+
+    # 検証 - 他人の未公開の投稿と一致しない投稿は含まない
+    assert set(ids) == {in_title.id, in_content.id, own_draft.id}
+    assert other_draft.id not in ids
+    # 検証 - 検索スコアの高い順に並ぶ
+    ranks = [rank for _, rank in rows]
+    assert ranks == sorted(ranks, reverse=True)
+    assert ids.index(in_title.id) < ids.index(in_content.id)
+
+
+@pytest.mark.asyncio
+async def test_search_keyset_pagination(db_session, mock_current_user):
+    """キーセットページネーションで検索結果を重複・欠落なく取得できるテスト"""
+    user_id = mock_current_user["user_id"]
+    created = [
+        await create_post(db_session, user_id, f"keyset {'keyset ' * (i % 3)}{i}", "keyset content")
+        for i in range(7)
+    ]
+
+    found = []
+    after = None
+    while True:
+        rows = await post.search(db_session, query="keyset", user_id=user_id, limit=2, after=after)
+        if not rows:
+            break
+        found.extend(rows)
+        after = (rows[-1][1], rows[-1][0].id)
+
+    assert sorted(p.id for p, _ in found) == sorted(p.id for p in created)
+    assert [rank for _, rank in found] == sorted((rank for _, rank in found), reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_search_without_match(db_session, test_post, mock_current_user):
+    """一致しない検索語や記号のみの検索語では空のリストを返すテスト"""
+    for query in ["doesnotexist", "!!!"]:
+        rows = await post.search(db_session, query=query, user_id=mock_current_user["user_id"])
+        assert rows == []